@@ -8,7 +8,12 @@ Serves both the REST API and HTML documentation in a single service
 """
 import os
 import sys
+import email.utils
+import gzip
+import hashlib
+import importlib.util
 from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
 
 # Import the FastAPI app from mongodb_agent
 try:
@@ -18,52 +23,138 @@ except ImportError:
     print("   Run: pip install -e .")
     sys.exit(1)
 
+# Brotli is optional - gzip variants are always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import Request
+from fastapi.responses import Response
 
 # Directory setup
 BASE_DIR = Path(__file__).parent.absolute()
 DOCS_DIR = BASE_DIR / "docs"
 
 
-# Mount documentation as static files (serves all .html, .css, .js automatically)
+class CachedDoc(NamedTuple):
+    """An HTML page held in memory with its precompressed variants"""
+    body: bytes
+    gzip_body: bytes
+    br_body: Optional[bytes]
+    etag: str
+    last_modified: str
+    mtime: int
+
+
+# In-memory HTML cache, built once at startup
+# Maps "getting-started" -> CachedDoc so requests never touch the filesystem
+DOC_CACHE: Dict[str, CachedDoc] = {}
 if DOCS_DIR.exists():
-    app.mount("/docs-static", StaticFiles(directory=str(DOCS_DIR), html=True), name="docs")
+    for html_path in DOCS_DIR.rglob("*.html"):
+        data = html_path.read_bytes()
+        etag = hashlib.blake2b(data, digest_size=16).hexdigest()
+        mtime = int(html_path.stat().st_mtime)
+        DOC_CACHE[html_path.relative_to(DOCS_DIR).with_suffix("").as_posix()] = CachedDoc(
+            body=data,
+            gzip_body=gzip.compress(data, 9),
+            br_body=brotli.compress(data, quality=11) if brotli else None,
+            etag=f'"{etag}"',
+            last_modified=email.utils.formatdate(mtime, usegmt=True),
+            mtime=mtime,
+        )
+
+
+def _not_modified(request: Request, etag: str, mtime: int) -> bool:
+    """Check conditional request headers (If-None-Match wins over If-Modified-Since)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return mtime <= since.timestamp()
     
-    # Mount images separately for better caching
-    images_dir = DOCS_DIR / "images"
-    if images_dir.exists():
-        app.mount("/images", StaticFiles(directory=str(images_dir)), name="images")
+    return False
+
+
+def _select_variant(request: Request, entry: CachedDoc) -> Tuple[bytes, Optional[str]]:
+    """Pick the precompressed body matching the client's Accept-Encoding"""
+    accepted = {
+        token.split(";")[0].strip().lower()
+        for token in request.headers.get("accept-encoding", "").split(",")
+    }
+    if "br" in accepted and entry.br_body is not None:
+        return entry.br_body, "br"
+    if "gzip" in accepted:
+        return entry.gzip_body, "gzip"
+    return entry.body, None
+
+
+def _cached_html(request: Request, entry: CachedDoc) -> Response:
+    """Build an HTML response (or an empty 304) from a DOC_CACHE entry"""
+    body, encoding = _select_variant(request, entry)
+    # Each content-coding is a distinct representation, so it gets its own strong ETag
+    etag = f'{entry.etag[:-1]}-{encoding}"' if encoding else entry.etag
+    headers = {
+        "ETag": etag,
+        "Last-Modified": entry.last_modified,
+        "Cache-Control": "public, max-age=3600",
+        "Vary": "Accept-Encoding",
+    }
+    if _not_modified(request, etag, entry.mtime):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="text/html", headers=headers)
 
 
 # Root route - serve documentation homepage
 @app.get("/")
-async def serve_home():
+async def serve_home(request: Request):
     """Serve the documentation homepage"""
-    index_path = DOCS_DIR / "index.html"
-    if index_path.exists():
-        return FileResponse(index_path)
+    entry = DOC_CACHE.get("index")
+    if entry:
+        return _cached_html(request, entry)
     return {
         "service": "MongoDB Agent",
         "version": "1.0.0",
         "api_docs": "/docs",
-        "documentation": "/docs-static/index.html"
+        "documentation": "/index.html"
     }
 
 
-# Serve any HTML file from docs directory dynamically
-@app.get("/{filename:path}.html")
-async def serve_html(filename: str):
-    """Serve any HTML documentation file"""
-    file_path = DOCS_DIR / f"{filename}.html"
-    if file_path.exists() and file_path.is_file():
-        return FileResponse(file_path)
-    return {"error": f"Documentation file '{filename}.html' not found"}
+def _make_doc_handler(entry: CachedDoc):
+    """Create a route handler bound to one cached HTML page"""
+    async def serve_doc(request: Request):
+        return _cached_html(request, entry)
+    return serve_doc
+
+
+# One explicit route per HTML page, so page requests never stat the filesystem
+for doc_name, doc_entry in DOC_CACHE.items():
+    app.add_api_route(
+        f"/{doc_name}.html", _make_doc_handler(doc_entry), methods=["GET"], include_in_schema=False
+    )
+
+
+# Mount documentation as static files (serves .css, .js and images)
+# Registered last: app routes are matched before the catch-all mount
+if DOCS_DIR.exists():
+    app.mount("/", StaticFiles(directory=str(DOCS_DIR), html=True), name="docs")
 
 
 if __name__ == "__main__":
     import uvicorn
     
+    workers = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+    
     print("\n" + "="*70)
     print("🚀 MongoDB Agent - Unified API & Documentation Server")
     print("="*70)
@@ -71,6 +162,19 @@ if __name__ == "__main__":
     print("📡 API Endpoint:  http://127.0.0.1:8001/api/mongodb")
     print("📚 API Docs:      http://127.0.0.1:8001/docs")
     print("❤️  Health Check: http://127.0.0.1:8001/health")
+    print(f"👷 Workers:       {workers}")
     print("="*70 + "\n")
     
-    uvicorn.run(app, host="127.0.0.1", port=8001, log_level="info")
+    # Import-string form is required for workers > 1 (each worker re-imports the app)
+    uvicorn.run(
+        "server:app",
+        app_dir=str(BASE_DIR),
+        host="127.0.0.1",
+        port=8001,
+        log_level="info",
+        workers=workers,
+        # uvloop isn't available on Windows - let uvicorn pick the loop there
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "auto",
+        http="httptools",
+        access_log=False,
+    )
@@ -5,12 +5,17 @@
 MongoDB Agent AI - Setup Configuration
 """
 from setuptools import setup, find_packages
-import os
+from pathlib import Path
+import sys
 
-# Read the contents of README file
-this_directory = os.path.abspath(os.path.dirname(__file__))
-with open(os.path.join(this_directory, 'README.md'), encoding='utf-8') as f:
-    long_description = f.read()
+HERE = Path(__file__).resolve().parent
+
+# Read the contents of README file - only needed when building a distribution,
+# so editable/developer installs skip it
+if any(cmd in sys.argv for cmd in ('sdist', 'bdist_wheel', 'upload')):
+    long_description = (HERE / 'README.md').read_text(encoding='utf-8')
+else:
+    long_description = ''
 
 setup(
     name='mongodb-nl-query-ai-agent',
@@ -49,12 +54,16 @@ setup(
         'langgraph>=0.0.1',
         'python-dotenv>=1.0.0',
         'pydantic>=2.0.0',
-        'pyyaml>=6.0',
+        'pyyaml>=6.0',  # Install a libyaml-enabled build for the fast CSafeLoader
+        'uvloop>=0.17.0; sys_platform != "win32"',
+        'httptools>=0.6.0',
+        'orjson>=3.9.0',
     ],
     extras_require={
         'openai': ['langchain-openai>=0.0.1'],
         'anthropic': ['langchain-anthropic>=0.0.1'],
         'bedrock': ['langchain-aws>=0.0.1', 'boto3>=1.28.0'],
+        'fast': ['pyahocorasick>=2.0.0'],
         'dev': [
             'pytest>=7.0.0',
             'pytest-cov>=4.0.0',
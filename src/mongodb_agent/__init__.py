@@ -13,12 +13,36 @@ Public API:
 - build_graph: StateGraph builder (for advanced usage)
 """
 
-from mongodb_agent.agent import MongoDBAgent
+import importlib
+from typing import TYPE_CHECKING
+
 from mongodb_agent.config import Config
-from mongodb_agent.graph import build_graph
-from mongodb_agent.state import AgentState, InputSchema, ResponseSchema
+
+if TYPE_CHECKING:
+    from mongodb_agent.agent import MongoDBAgent
+    from mongodb_agent.graph import build_graph
+    from mongodb_agent.state import AgentState, InputSchema, ResponseSchema
 
 __version__ = "0.1.0"
+
+# Loaded on first access (PEP 562) - these pull in langgraph/langchain
+_LAZY_EXPORTS = {
+    "MongoDBAgent": "mongodb_agent.agent",
+    "build_graph": "mongodb_agent.graph",
+    "AgentState": "mongodb_agent.state",
+    "InputSchema": "mongodb_agent.state",
+    "ResponseSchema": "mongodb_agent.state",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
 __all__ = [
     "MongoDBAgent",
     "Config",
@@ -27,3 +51,7 @@ __all__ = [
     "InputSchema",
     "ResponseSchema",
 ]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,10 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2026 Cisco Systems, Inc. and its affiliates
+
+"""Python version compatibility helpers"""
+
+import sys
+
+# @dataclass keyword options: slotted instances need Python 3.10+, older
+# interpreters get regular (dict-backed) instances
+DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
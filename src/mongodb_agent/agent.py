@@ -63,7 +63,8 @@ class MongoDBAgent:
         self,
         question: str,
         yaml_file_name: str,
-        db_details: Optional[Dict[str, Any]] = None
+        db_details: Optional[Dict[str, Any]] = None,
+        bypass_cache: bool = False
     ) -> ResponseSchema:
         """
         Execute a natural language query
@@ -72,6 +73,7 @@ class MongoDBAgent:
             question: Natural language question
             yaml_file_name: Semantic model file name (e.g., "OrdersCollection.yaml")
             db_details: Database connection details (database, schema, etc.)
+            bypass_cache: Regenerate the query even if an identical prompt was answered before
         
         Returns:
             ResponseSchema with query_result, sql_query, error, etc.
@@ -83,6 +85,51 @@ class MongoDBAgent:
                 db_details={"database": "ESM", "schema": "Orders"}
             )
         """
+        input_data = self._build_input(question, yaml_file_name, db_details, bypass_cache)
+        
+        try:
+            # Execute the graph
+            result = self.compiled_graph.invoke(input_data)
+            return self._build_response(result)
+        
+        except Exception as e:
+            return self._build_error_response(e)
+    
+    async def aquery(
+        self,
+        question: str,
+        yaml_file_name: str,
+        db_details: Optional[Dict[str, Any]] = None,
+        bypass_cache: bool = False
+    ) -> ResponseSchema:
+        """
+        Execute a natural language query without blocking the event loop
+        
+        Same contract as query(), but runs the graph via LangGraph's ainvoke.
+        
+        Example:
+            result = await agent.aquery(
+                question="Show me top 5 orders from last week",
+                yaml_file_name="OrdersCollection.yaml"
+            )
+        """
+        input_data = self._build_input(question, yaml_file_name, db_details, bypass_cache)
+        
+        try:
+            result = await self.compiled_graph.ainvoke(input_data)
+            return self._build_response(result)
+        
+        except Exception as e:
+            return self._build_error_response(e)
+    
+    def _build_input(
+        self,
+        question: str,
+        yaml_file_name: str,
+        db_details: Optional[Dict[str, Any]],
+        bypass_cache: bool = False
+    ) -> InputSchema:
+        """Prepare graph input from query arguments"""
         if db_details is None:
             db_details = {}
         
@@ -90,41 +137,41 @@ class MongoDBAgent:
         input_data: InputSchema = {
             "question": question,
             "yaml_file_name": yaml_file_name,
-            "db_details": db_details
+            "db_details": db_details,
+            "bypass_cache": bypass_cache
         }
         
         self.logger.info(f"Processing query: {question[:100]}...")
+        return input_data
+    
+    def _build_response(self, result: Dict[str, Any]) -> ResponseSchema:
+        """Extract the response fields from the final graph state"""
+        response: ResponseSchema = {
+            "query_result": result.get("query_result", ""),
+            "raw_mongo_result": result.get("raw_mongo_result"),  # Include raw data
+            "sql_query": result.get("sql_query"),
+            "aggregation_pipeline": result.get("aggregation_pipeline"),
+            "collection_name": result.get("collection_name"),
+            "error": result.get("error")
+        }
         
-        try:
-            # Execute the graph
-            result = self.compiled_graph.invoke(input_data)
-            
-            # Extract response
-            response: ResponseSchema = {
-                "query_result": result.get("query_result", ""),
-                "raw_mongo_result": result.get("raw_mongo_result"),  # Include raw data
-                "sql_query": result.get("sql_query"),
-                "aggregation_pipeline": result.get("aggregation_pipeline"),
-                "collection_name": result.get("collection_name"),
-                "error": result.get("error")
-            }
-            
-            if response["error"]:
-                self.logger.error(f"Query failed: {response['error']}")
-            else:
-                self.logger.info("Query executed successfully")
-            
-            return response
+        if response["error"]:
+            self.logger.error(f"Query failed: {response['error']}")
+        else:
+            self.logger.info("Query executed successfully")
         
-        except Exception as e:
-            self.logger.exception(f"Unexpected error: {e}")
-            return {
-                "query_result": "",
-                "error": f"Unexpected error: {str(e)}",
-                "sql_query": None,
-                "aggregation_pipeline": None,
-                "collection_name": None
-            }
+        return response
+    
+    def _build_error_response(self, e: Exception) -> ResponseSchema:
+        """Build the response returned when graph execution raises"""
+        self.logger.exception(f"Unexpected error: {e}")
+        return {
+            "query_result": "",
+            "error": f"Unexpected error: {str(e)}",
+            "sql_query": None,
+            "aggregation_pipeline": None,
+            "collection_name": None
+        }
     
     def get_semantic_model(self, model_name: str) -> str:
         """
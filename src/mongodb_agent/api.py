@@ -7,36 +7,91 @@ Provides HTTP endpoints for testing and integration
 """
 import os
 import sys
+import asyncio
+import hashlib
+import importlib.util
 import logging
+import logging.handlers
+import queue
+import reprlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional, List
-from pydantic import BaseModel, Field
+from typing import Dict, Any, Optional, List, Tuple
+import orjson
+from pydantic import BaseModel, ConfigDict, Field
 
-# Load environment variables from .env file
-from dotenv import load_dotenv
-# Load .env from current working directory
-env_path = os.path.join(os.getcwd(), '.env')
-load_dotenv(dotenv_path=env_path, override=True)
+# Load environment variables from the .env file in (or above) the working directory;
+# usecwd matters for installed packages, where the search would otherwise start in site-packages
+from dotenv import find_dotenv, load_dotenv
+load_dotenv(find_dotenv(usecwd=True), override=True)
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.routing import APIRoute
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 
 # Configure logging - Write to file instead of console
 log_dir = os.path.join(os.getcwd(), 'logs')
 os.makedirs(log_dir, exist_ok=True)
 log_file = os.path.join(log_dir, 'mongodb_agent.log')
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file, mode='a'),
-        logging.StreamHandler(sys.stdout)  # Keep minimal console output
-    ]
+# Request handlers only enqueue records; a background listener thread does the file/console I/O
+log_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+file_handler = logging.FileHandler(log_file, mode='a')
+file_handler.setFormatter(log_formatter)
+stream_handler = logging.StreamHandler(sys.stdout)  # Keep minimal console output
+stream_handler.setFormatter(log_formatter)
+
+
+class _ListenerQueueHandler(logging.handlers.QueueHandler):
+    """Queue records while the listener runs; write them directly while it is stopped"""
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if _log_listener_running:
+            super().enqueue(record)
+        else:
+            log_listener.handle(record)
+
+
+log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+queue_handler = _ListenerQueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter("%(message)s"))  # Final formatting happens in the listener
+log_listener = logging.handlers.QueueListener(
+    log_queue, file_handler, stream_handler, respect_handler_level=True
 )
+_log_listener_lock = threading.Lock()
+_log_listener_running = False
+
+
+def _start_log_listener() -> None:
+    """Start the queue listener unless it is already running (restartable after a shutdown)"""
+    global _log_listener_running
+    with _log_listener_lock:
+        if not _log_listener_running:
+            log_listener.start()
+            _log_listener_running = True
+
+
+def _stop_log_listener() -> None:
+    """Flush queued records and stop the listener; a no-op when it is not running"""
+    global _log_listener_running
+    with _log_listener_lock:
+        if _log_listener_running:
+            _log_listener_running = False
+            log_listener.stop()
+            # Records that raced in behind the stop sentinel are written here, not dropped
+            while True:
+                try:
+                    log_listener.handle(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+
+_start_log_listener()
+
+logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
 logger = logging.getLogger(__name__)
 logger.info(f"📝 Logging to file: {log_file}")
 
@@ -46,38 +101,59 @@ app = FastAPI(
     description="Natural Language to MongoDB Query Converter with YAML Semantic Models",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse  # orjson encodes large query_result payloads much faster
 )
 
-# Add CORS middleware
+# Add CORS middleware - only the origins listed in CORS_ORIGINS (comma-separated) are allowed
+cors_origins = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "").split(",") if origin.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
 # ============================================================
 # Pydantic Models
 # ============================================================
 
+# OpenAPI examples, kept at module level so the model classes stay small
+_QUERY_REQUEST_EXAMPLE = {
+    "question": "Show me all shipping documents from USA to India",
+    "yaml_file_name": "SLShippingDocuments_semantic_model_convert_V4.yaml",
+    "include_debug": True,
+    "environment": "dev"
+}
+
+_QUERY_RESPONSE_EXAMPLE = {
+    "question": "Show me all shipping documents from USA to India",
+    "yaml_file_name": "SLShippingDocuments_semantic_model_convert_V4.yaml",
+    "mongodb_query": "db.collection.aggregate([{\"$match\": {...}}])",
+    "query_result": [{"deliveryId": "123", "shipFromCountry": "US"}],
+    "natural_language_response": "Found 10 shipping documents from USA to India",
+    "execution_time_ms": 1234.56,
+    "status": "success",
+    "timestamp": "2025-12-05T12:00:00",
+    "debug_info": {
+        "matched_rules": ["country_code_preprocessing"],
+        "verified_queries_used": ["template_1"],
+        "yaml_analysis": "Loaded 15 tables with 120 fields"
+    }
+}
+
+
 class MongoDBQueryRequest(BaseModel):
     """Request model for MongoDB query"""
     question: str = Field(..., description="Natural language question about the data")
     yaml_file_name: str = Field(..., description="YAML semantic model file name")
     include_debug: bool = Field(default=False, description="Include debug information in response")
+    bypass_cache: bool = Field(default=False, description="Regenerate the query instead of reusing a cached LLM answer")
     environment: Optional[str] = Field(default="dev", description="Environment (dev/stage/prod)")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "question": "Show me all shipping documents from USA to India",
-                "yaml_file_name": "SLShippingDocuments_semantic_model_convert_V4.yaml",
-                "include_debug": True,
-                "environment": "dev"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": _QUERY_REQUEST_EXAMPLE})
 
 
 class MongoDBQueryResponse(BaseModel):
@@ -94,24 +170,7 @@ class MongoDBQueryResponse(BaseModel):
     # Debug information (optional)
     debug_info: Optional[Dict[str, Any]] = Field(default=None, description="Debug information if include_debug=True")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "question": "Show me all shipping documents from USA to India",
-                "yaml_file_name": "SLShippingDocuments_semantic_model_convert_V4.yaml",
-                "mongodb_query": "db.collection.aggregate([{\"$match\": {...}}])",
-                "query_result": [{"deliveryId": "123", "shipFromCountry": "US"}],
-                "natural_language_response": "Found 10 shipping documents from USA to India",
-                "execution_time_ms": 1234.56,
-                "status": "success",
-                "timestamp": "2025-12-05T12:00:00",
-                "debug_info": {
-                    "matched_rules": ["country_code_preprocessing"],
-                    "verified_queries_used": ["template_1"],
-                    "yaml_analysis": "Loaded 15 tables with 120 fields"
-                }
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": _QUERY_RESPONSE_EXAMPLE})
 
 
 class YAMLValidationRequest(BaseModel):
@@ -137,21 +196,65 @@ class YAMLValidationResponse(BaseModel):
 from mongodb_agent.config import Config
 from mongodb_agent.agent import MongoDBAgent
 
-# Initialize MongoDB Agent (standalone, no dependencies on mongodb_structure_agent)
-mongodb_agent_instance = None
+# MongoDB Agent (standalone, no dependencies on mongodb_structure_agent)
+# Built in startup_event so importing this module stays cheap and each worker
+# builds its graph off the event loop
+mongodb_agent_instance: Optional[MongoDBAgent] = None
 mongodb_agent_available = False
 
-try:
-    config = Config.from_env()
-    mongodb_agent_instance = MongoDBAgent(config)
-    mongodb_agent_available = True
-    logger.info("✅ MongoDB Agent initialized successfully (standalone)")
-except Exception as e:
-    logger.warning(f"⚠️ Could not initialize MongoDB Agent: {e}")
-    logger.warning("Check .env file for required configuration (AZURE_OPENAI_ENDPOINT, etc.)")
+
+# Upper bound on concurrently executing queries; the default thread pool is sized to match
+MAX_INFLIGHT = int(os.getenv("MAX_INFLIGHT", "16"))
+_inflight_semaphore = asyncio.Semaphore(MAX_INFLIGHT)
+
+# Database details from environment, resolved once (.env is loaded above)
+_DB_DETAILS_BASE = {
+    "dbName": os.getenv("MONGODB_DATABASE", "CCDTOOl"),
+    "userName": os.getenv("MONGODB_USERNAME", ""),
+    "applicationName": "MongoDB-Agent-REST-API"
+}
+
+
+def _build_mongodb_agent() -> MongoDBAgent:
+    """Load configuration and build the agent graph (blocking)"""
+    return MongoDBAgent(Config.from_env())
+
+
+async def execute_mongodb_query(
+    question: str,
+    yaml_file_name: str,
+    include_debug: bool = False,
+    bypass_cache: bool = False
+) -> Dict[str, Any]:
+    """
+    Execute MongoDB query without blocking the event loop
+    
+    The agent's graph makes blocking LLM and MongoDB calls, so the work runs
+    in a worker thread and other requests keep being served meanwhile.
+    Once MAX_INFLIGHT queries are running, further requests are rejected
+    with 503 instead of queueing behind them.
+    """
+    if _inflight_semaphore.locked():
+        raise HTTPException(status_code=503, detail="Server busy, retry later")
+    async with _inflight_semaphore:
+        return await asyncio.to_thread(
+            _execute_mongodb_query_sync, question, yaml_file_name, include_debug, bypass_cache
+        )
+
+
+# Bounded repr for the debug preview - stops walking large results instead of rendering them in full
+_raw_result_repr = reprlib.Repr()
+_raw_result_repr.maxdict = 5
+_raw_result_repr.maxlist = 5
+_raw_result_repr.maxstring = 200
 
 
-def execute_mongodb_query(question: str, yaml_file_name: str, include_debug: bool = False) -> Dict[str, Any]:
+def _execute_mongodb_query_sync(
+    question: str,
+    yaml_file_name: str,
+    include_debug: bool = False,
+    bypass_cache: bool = False
+) -> Dict[str, Any]:
     """
     Execute MongoDB query using the standalone MongoDB Agent
     
@@ -162,35 +265,30 @@ def execute_mongodb_query(question: str, yaml_file_name: str, include_debug: boo
         question: Natural language question
         yaml_file_name: YAML semantic model file name
         include_debug: Whether to include debug information
+        bypass_cache: Skip the selector's cached LLM answers
         
     Returns:
         Dictionary with query results and metadata
     """
-    start_time = datetime.now()
+    start_ns = time.perf_counter_ns()
     
     try:
         if not mongodb_agent_available or mongodb_agent_instance is None:
             raise Exception("MongoDB Agent not available. Check .env configuration.")
         
-        logger.info(f"Executing MongoDB Agent query: {question}")
-        logger.info(f"Using YAML file: {yaml_file_name}")
-        
-        # Get database details from environment
-        db_details = {
-            "dbName": os.getenv("MONGODB_DATABASE", "CCDTOOl"),
-            "userName": os.getenv("MONGODB_USERNAME", ""),
-            "applicationName": "MongoDB-Agent-REST-API"
-        }
+        logger.debug(f"Executing MongoDB Agent query: {question}")
+        logger.debug(f"Using YAML file: {yaml_file_name}")
         
         # Execute query using standalone MongoDB Agent
+        # (copied per request - the graph nodes fill in collection/YAML details)
         result = mongodb_agent_instance.query(
             question=question,
             yaml_file_name=yaml_file_name,
-            db_details=db_details
+            db_details=dict(_DB_DETAILS_BASE),
+            bypass_cache=bypass_cache
         )
         
-        end_time = datetime.now()
-        execution_time = (end_time - start_time).total_seconds() * 1000
+        execution_time = (time.perf_counter_ns() - start_ns) / 1e6
         
         # Extract results
         mongodb_query = result.get("aggregation_pipeline", "") or result.get("sql_query", "")
@@ -230,7 +328,7 @@ def execute_mongodb_query(question: str, yaml_file_name: str, include_debug: boo
                 "intermediate_steps": result.get("intermediate_steps", []),
                 "collection_name": result.get("collection_name", ""),
                 "error": result.get("error", ""),
-                "raw_result": str(result)[:500]  # First 500 chars
+                "raw_result": _raw_result_repr.repr(result)[:500]  # First 500 chars
             }
         
         # If there was an error, include it in response
@@ -241,8 +339,7 @@ def execute_mongodb_query(question: str, yaml_file_name: str, include_debug: boo
         
     except FileNotFoundError as e:
         logger.error(f"YAML file not found: {e}")
-        end_time = datetime.now()
-        execution_time = (end_time - start_time).total_seconds() * 1000
+        execution_time = (time.perf_counter_ns() - start_ns) / 1e6
         
         return {
             "mongodb_query": "N/A",
@@ -260,8 +357,7 @@ def execute_mongodb_query(question: str, yaml_file_name: str, include_debug: boo
     
     except Exception as e:
         logger.error(f"Error executing MongoDB query: {e}", exc_info=True)
-        end_time = datetime.now()
-        execution_time = (end_time - start_time).total_seconds() * 1000
+        execution_time = (time.perf_counter_ns() - start_ns) / 1e6
         
         error_message = str(e)
         # Make error messages more user-friendly
@@ -288,33 +384,69 @@ def execute_mongodb_query(question: str, yaml_file_name: str, include_debug: boo
 # API Endpoints
 # ============================================================
 
-@app.get("/")
-async def root():
-    """Root endpoint with API information"""
+def _precompute_json(payload: Dict[str, Any]) -> Tuple[bytes, str]:
+    """Encode a static payload once and derive its strong ETag"""
+    body = orjson.dumps(payload)
+    return body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _static_json_response(request: Request, body: bytes, etag: str) -> Response:
+    """Serve precomputed JSON, answering a matching If-None-Match with an empty 304"""
+    # Short max-age: the payloads report mongodb_agent_available, which is settled at startup
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison, as server.py does for the docs pages
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        if "*" in candidates or etag in candidates or f"W/{etag}" in candidates:
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _root_payload(available: bool) -> Dict[str, Any]:
+    """API information returned by the root endpoint"""
     return {
         "service": "MongoDB Agent API",
         "version": "1.0.0",
         "status": "running",
-        "mongodb_agent_available": mongodb_agent_available,
+        "mongodb_agent_available": available,
         "endpoints": {
             "health": "GET /health",
             "docs": "GET /docs",
             "query": "POST /api/mongodb",
+            "query_stream": "POST /api/mongodb/stream",
             "validate": "POST /api/validate-yaml"
         },
         "description": "Natural Language to MongoDB Query Converter with YAML Semantic Models"
     }
 
 
-@app.get("/health")
+# Keyed by mongodb_agent_available
+_ROOT_JSON = {available: _precompute_json(_root_payload(available)) for available in (True, False)}
+
+
+@app.get("/", response_class=ORJSONResponse)
+async def root(request: Request):
+    """Root endpoint with API information"""
+    return _static_json_response(request, *_ROOT_JSON[mongodb_agent_available])
+
+
+# Health probes arrive several times per second, so both possible bodies are encoded once
+_HEALTH_OK = ORJSONResponse({"status": "healthy", "service": "mongodb_agent", "mongodb_agent_available": True})
+_HEALTH_AGENT_UNAVAILABLE = ORJSONResponse(
+    {"status": "healthy", "service": "mongodb_agent", "mongodb_agent_available": False}
+)
+
+
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "mongodb_agent",
-        "timestamp": datetime.now().isoformat(),
-        "mongodb_agent_available": mongodb_agent_available
-    }
+    return _HEALTH_OK if mongodb_agent_available else _HEALTH_AGENT_UNAVAILABLE
+
+
+# Registered ahead of every other route so probes match on the first comparison
+app.router.routes.insert(
+    0, APIRoute("/health", health_check, methods=["GET"], response_class=ORJSONResponse)
+)
 
 
 @app.post("/api/mongodb", response_model=MongoDBQueryResponse)
@@ -336,13 +468,14 @@ async def query_mongodb(request: MongoDBQueryRequest):
     - Debug information (if requested)
     """
     try:
-        logger.info(f"Processing MongoDB query: {request.question}")
+        logger.debug(f"Processing MongoDB query: {request.question}")
         
         # Execute the query
-        result = execute_mongodb_query(
+        result = await execute_mongodb_query(
             question=request.question,
             yaml_file_name=request.yaml_file_name,
-            include_debug=request.include_debug
+            include_debug=request.include_debug,
+            bypass_cache=request.bypass_cache
         )
         
         # Build response
@@ -358,9 +491,11 @@ async def query_mongodb(request: MongoDBQueryRequest):
             debug_info=result.get("debug_info")
         )
         
-        logger.info(f"Query processed successfully in {result['execution_time_ms']}ms")
+        logger.debug(f"Query processed successfully in {result['execution_time_ms']}ms")
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in /api/mongodb endpoint: {e}", exc_info=True)
         
@@ -374,6 +509,44 @@ async def query_mongodb(request: MongoDBQueryRequest):
             raise HTTPException(status_code=500, detail=error_detail)
 
 
+@app.post("/api/mongodb/stream")
+async def query_mongodb_stream(request: MongoDBQueryRequest):
+    """
+    Streaming MongoDB query endpoint
+    
+    Runs the same pipeline as /api/mongodb but returns newline-delimited JSON
+    (application/x-ndjson) instead of one large document:
+    - Line 1: response metadata (everything except query_result)
+    - Following lines: one query result document per line
+    
+    Rows are encoded one at a time, so large result sets are never
+    serialized into a single in-memory response body.
+    """
+    logger.debug(f"Processing streamed MongoDB query: {request.question}")
+    
+    result = await execute_mongodb_query(
+        question=request.question,
+        yaml_file_name=request.yaml_file_name,
+        include_debug=request.include_debug,
+        bypass_cache=request.bypass_cache
+    )
+    rows = result.pop("query_result")
+    metadata = {
+        "question": request.question,
+        "yaml_file_name": request.yaml_file_name,
+        **result,
+        "result_count": len(rows),
+        "timestamp": datetime.now().isoformat(),
+    }
+    
+    def generate_lines():
+        yield orjson.dumps(metadata, default=str) + b"\n"
+        for row in rows:
+            yield orjson.dumps(row, default=str) + b"\n"
+    
+    return StreamingResponse(generate_lines(), media_type="application/x-ndjson")
+
+
 @app.post("/api/validate-yaml", response_model=YAMLValidationResponse)
 async def validate_yaml(request: YAMLValidationRequest):
     """
@@ -410,9 +583,8 @@ async def validate_yaml(request: YAMLValidationRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/capabilities")
-async def get_capabilities():
-    """Get MongoDB Agent capabilities"""
+def _capabilities_payload(available: bool) -> Dict[str, Any]:
+    """MongoDB Agent capabilities returned by /api/capabilities"""
     return {
         "mongodb_agent": {
             "description": "Natural Language to MongoDB Query Converter",
@@ -425,10 +597,11 @@ async def get_capabilities():
                 "Debug mode for YAML tuning"
             ],
             "supported_databases": ["MongoDB"],
-            "available": mongodb_agent_available
+            "available": available
         },
         "endpoints": {
             "/api/mongodb": "Execute MongoDB queries from natural language",
+            "/api/mongodb/stream": "Same as /api/mongodb, streamed as NDJSON (one result document per line)",
             "/api/validate-yaml": "Validate YAML semantic models",
             "/health": "Health check",
             "/docs": "API documentation"
@@ -436,6 +609,18 @@ async def get_capabilities():
     }
 
 
+# Keyed by mongodb_agent_available
+_CAPABILITIES_JSON = {
+    available: _precompute_json(_capabilities_payload(available)) for available in (True, False)
+}
+
+
+@app.get("/api/capabilities")
+async def get_capabilities(request: Request):
+    """Get MongoDB Agent capabilities"""
+    return _static_json_response(request, *_CAPABILITIES_JSON[mongodb_agent_available])
+
+
 # ============================================================
 # Application Startup
 # ============================================================
@@ -443,7 +628,23 @@ async def get_capabilities():
 @app.on_event("startup")
 async def startup_event():
     """Application startup tasks"""
+    global mongodb_agent_instance, mongodb_agent_available
+    
+    # Running again after an earlier shutdown in this process (e.g. a second lifespan)
+    _start_log_listener()
     logger.info("🚀 MongoDB Agent API starting up")
+    
+    # asyncio.to_thread uses the default executor - keep it within the in-flight budget
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=MAX_INFLIGHT))
+    
+    try:
+        mongodb_agent_instance = await asyncio.to_thread(_build_mongodb_agent)
+        mongodb_agent_available = True
+        logger.info("✅ MongoDB Agent initialized successfully (standalone)")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not initialize MongoDB Agent: {e}")
+        logger.warning("Check .env file for required configuration (AZURE_OPENAI_ENDPOINT, etc.)")
+    
     logger.info(f"📡 MongoDB Agent available: {mongodb_agent_available}")
     if mongodb_agent_available:
         logger.info("✅ Ready to process MongoDB queries")
@@ -455,8 +656,22 @@ async def startup_event():
 async def shutdown_event():
     """Application shutdown tasks"""
     logger.info("👋 MongoDB Agent API shutting down")
+    # Release pooled MongoDB/HTTP connections held by the shared service clients
+    from mongodb_agent.services.registry import close_all
+    close_all()
+    # Flush queued log records before the process exits
+    _stop_log_listener()
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    uvicorn.run(
+        "mongodb_agent.api:app",
+        host="127.0.0.1",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1)),
+        # uvloop isn't available on Windows - let uvicorn pick the loop there
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "auto",
+        http="httptools",
+        access_log=False,
+    )
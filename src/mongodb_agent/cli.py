@@ -9,6 +9,9 @@ import sys
 import os
 from typing import Optional
 
+VERSION_STRING = "cisco-mongodb-agent 1.0.0"
+
+
 def start_server(host="127.0.0.1", port=8000, reload=False, log_level="info", mode="auto"):
     """Start the MongoDB Agent FastAPI server
     
@@ -20,12 +23,7 @@ def start_server(host="127.0.0.1", port=8000, reload=False, log_level="info", mo
         mode: Server mode - 'auto', 'rest', or 'mcp' (default: auto)
     """
     try:
-        # Import here to avoid loading dependencies during package installation
-        import uvicorn
-        
-        # Create logs directory
         log_dir = os.path.join(os.getcwd(), 'logs')
-        os.makedirs(log_dir, exist_ok=True)
         log_file = os.path.join(log_dir, 'mongodb_agent.log')
         
         print(f"🚀 Starting MongoDB Agent Server")
@@ -51,12 +49,26 @@ def start_server(host="127.0.0.1", port=8000, reload=False, log_level="info", mo
         print(f"📦 Loading module: {module_path}")
         print()
         
+        # Import and create the logs directory only now, so a failed or
+        # informational invocation never pays for them
+        import importlib.util
+        import uvicorn
+        os.makedirs(log_dir, exist_ok=True)
+        
+        # uvloop isn't available on Windows - let uvicorn pick the loop there
+        loop = "uvloop" if importlib.util.find_spec("uvloop") else "auto"
+        # --reload runs a single process; otherwise scale out (default: 2 x CPU cores + 1)
+        workers = None if reload else int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+        
         uvicorn.run(
             module_path,
             host=host,
             port=port,
             reload=reload,
+            workers=workers,
             log_level=log_level,
+            loop=loop,
+            http="httptools",
             access_log=False  # Reduce console noise
         )
     except ImportError as e:
@@ -68,8 +80,30 @@ def start_server(host="127.0.0.1", port=8000, reload=False, log_level="info", mo
         sys.exit(1)
 
 
+def _build_server_parser(subparsers):
+    """Add the `server` subcommand and its options"""
+    server_parser = subparsers.add_parser("server", help="Start the MongoDB Agent server")
+    server_parser.add_argument("--host", default="127.0.0.1", help="Host to bind to")
+    server_parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
+    server_parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
+    server_parser.add_argument("--mode", choices=["auto", "rest", "mcp"], default="auto",
+                             help="Server mode: auto (default), rest (HTTP API), mcp (MCP protocol)")
+    return server_parser
+
+
 def main():
     """Main CLI entry point"""
+    argv = sys.argv[1:]
+    
+    # Fast paths that need no argument parsing at all
+    if "--version" in argv:
+        print(VERSION_STRING)
+        return
+    if not argv:
+        # Default: start server with default settings
+        start_server()
+        return
+    
     parser = argparse.ArgumentParser(
         description="MongoDB Agent - Natural Language to MongoDB Query Converter",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -89,19 +123,12 @@ https://github.com/cisco-it-supply-chain/sc-genai-sql-mcp-agent
         """
     )
     
-    parser.add_argument("--version", action="version", version="cisco-mongodb-agent 1.0.0")
+    parser.add_argument("--version", action="version", version=VERSION_STRING)
     
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
+    _build_server_parser(subparsers)
     
-    # Server command
-    server_parser = subparsers.add_parser("server", help="Start the MongoDB Agent server")
-    server_parser.add_argument("--host", default="127.0.0.1", help="Host to bind to")
-    server_parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
-    server_parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
-    server_parser.add_argument("--mode", choices=["auto", "rest", "mcp"], default="auto",
-                             help="Server mode: auto (default), rest (HTTP API), mcp (MCP protocol)")
-    
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     if args.command == "server":
         start_server(
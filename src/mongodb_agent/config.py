@@ -13,13 +13,22 @@ Provides a flexible Config class that supports:
 """
 
 import os
-from typing import Literal, Optional
-from dataclasses import dataclass, field
+import threading
+from typing import Dict, Literal, Optional, Tuple
+from dataclasses import dataclass
 
+from mongodb_agent._compat import DATACLASS_OPTIONS
 
-@dataclass
+
+# from_env() results keyed by (class, env name)
+_CONFIG_CACHE: Dict[Tuple[type, str], "Config"] = {}
+_CONFIG_CACHE_LOCK = threading.Lock()
+
+
+# Slotted on Python 3.10+; older interpreters still get a frozen Config
+@dataclass(frozen=True, **DATACLASS_OPTIONS)
 class Config:
-    """MongoDB Agent Configuration"""
+    """MongoDB Agent Configuration (immutable - use dataclasses.replace() for variants)"""
     
     # LLM Provider Configuration
     llm_provider: Literal["azure", "openai", "anthropic", "local"] = "azure"
@@ -47,6 +56,11 @@ class Config:
     # Direct MongoDB Configuration
     mongodb_uri: Optional[str] = None
     mongodb_database: Optional[str] = None
+    mongodb_max_pool_size: int = 100
+    mongodb_server_selection_timeout_ms: int = 5000
+    mongodb_socket_timeout_ms: int = 0  # 0: no timeout, so long aggregations are not cut off
+    mongodb_compressors: Optional[str] = None  # None: zstd/snappy when installed; "" disables
+    mongodb_eager_connect: bool = False  # Ping at startup instead of on first query
     
     # Semantic Model Configuration
     semantic_model_source: Literal["weaviate", "local_files", "s3", "git"] = "local_files"
@@ -67,35 +81,65 @@ class Config:
     
     @classmethod
     def from_env(cls, env: str = "dev") -> "Config":
-        """Load configuration from environment variables"""
+        """
+        Load configuration from environment variables
+        
+        The environment doesn't change during the process lifetime, so the
+        Config is built once per (class, env) and the same instance is returned
+        afterwards. Use reset_cache() after changing os.environ (e.g. in tests).
+        """
+        key = (cls, env)
+        config = _CONFIG_CACHE.get(key)
+        if config is None:
+            with _CONFIG_CACHE_LOCK:
+                config = _CONFIG_CACHE.get(key)
+                if config is None:
+                    config = _CONFIG_CACHE[key] = cls._load_env()
+        return config
+    
+    @classmethod
+    def _load_env(cls) -> "Config":
+        """Build a Config from the current process environment"""
+        environ = os.environ
         return cls(
-            llm_provider=os.getenv("LLM_PROVIDER", "azure"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            azure_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            azure_deployment_name=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4o-mini"),
-            azure_api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
-            openai_api_key=os.getenv("OPENAI_API_KEY"),
-            openai_model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-            vector_db=os.getenv("VECTOR_DB", "local"),
-            weaviate_url=os.getenv("WEAVIATE_URL"),
-            weaviate_api_key=os.getenv("WEAVIATE_API_KEY"),
-            mongodb_connection_type=os.getenv("MONGODB_CONNECTION_TYPE", "mcp"),
-            mongodb_mcp_endpoint=os.getenv("MONGODB_MCP_ENDPOINT", "http://localhost:3000/mongodb/query"),
-            mongodb_oauth_token_url=os.getenv("MONGODB_OAUTH_TOKEN_URL"),
-            mongodb_client_id=os.getenv("MONGODB_CLIENT_ID"),
-            mongodb_client_secret=os.getenv("MONGODB_CLIENT_SECRET"),
-            mongodb_uri=os.getenv("MONGODB_URI"),
-            mongodb_database=os.getenv("MONGODB_DATABASE"),
-            semantic_model_source=os.getenv("SEMANTIC_MODEL_SOURCE", "local_files"),
-            semantic_model_path=os.getenv("SEMANTIC_MODEL_PATH", "./semantic_models"),
-            enable_token_cache=os.getenv("ENABLE_TOKEN_CACHE", "true").lower() == "true",
-            token_cache_ttl=int(os.getenv("TOKEN_CACHE_TTL", "3000")),
-            max_schema_fields=int(os.getenv("MAX_SCHEMA_FIELDS", "30")),
-            skip_conjur_auth=os.getenv("SKIP_CONJUR_AUTH", "true").lower() == "true",
-            force_local_v2_files=os.getenv("FORCE_LOCAL_V2_FILES", "false").lower() == "true",
-            log_level=os.getenv("LOG_LEVEL", "INFO"),
+            llm_provider=environ.get("LLM_PROVIDER", "azure"),
+            azure_endpoint=environ.get("AZURE_OPENAI_ENDPOINT"),
+            azure_api_key=environ.get("AZURE_OPENAI_API_KEY"),
+            azure_deployment_name=environ.get("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4o-mini"),
+            azure_api_version=environ.get("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
+            openai_api_key=environ.get("OPENAI_API_KEY"),
+            openai_model=environ.get("OPENAI_MODEL", "gpt-4o-mini"),
+            vector_db=environ.get("VECTOR_DB", "local"),
+            weaviate_url=environ.get("WEAVIATE_URL"),
+            weaviate_api_key=environ.get("WEAVIATE_API_KEY"),
+            mongodb_connection_type=environ.get("MONGODB_CONNECTION_TYPE", "mcp"),
+            mongodb_mcp_endpoint=environ.get("MONGODB_MCP_ENDPOINT", "http://localhost:3000/mongodb/query"),
+            mongodb_oauth_token_url=environ.get("MONGODB_OAUTH_TOKEN_URL"),
+            mongodb_client_id=environ.get("MONGODB_CLIENT_ID"),
+            mongodb_client_secret=environ.get("MONGODB_CLIENT_SECRET"),
+            mongodb_uri=environ.get("MONGODB_URI"),
+            mongodb_database=environ.get("MONGODB_DATABASE"),
+            mongodb_max_pool_size=int(environ.get("MONGODB_MAX_POOL_SIZE", "100")),
+            mongodb_server_selection_timeout_ms=int(environ.get("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+            mongodb_socket_timeout_ms=int(environ.get("MONGODB_SOCKET_TIMEOUT_MS", "0")),
+            mongodb_compressors=environ.get("MONGODB_COMPRESSORS"),
+            mongodb_eager_connect=environ.get("MONGODB_EAGER_CONNECT", "false").lower() == "true",
+            semantic_model_source=environ.get("SEMANTIC_MODEL_SOURCE", "local_files"),
+            semantic_model_path=environ.get("SEMANTIC_MODEL_PATH", "./semantic_models"),
+            enable_token_cache=environ.get("ENABLE_TOKEN_CACHE", "true").lower() == "true",
+            token_cache_ttl=int(environ.get("TOKEN_CACHE_TTL", "3000")),
+            max_schema_fields=int(environ.get("MAX_SCHEMA_FIELDS", "30")),
+            skip_conjur_auth=environ.get("SKIP_CONJUR_AUTH", "true").lower() == "true",
+            force_local_v2_files=environ.get("FORCE_LOCAL_V2_FILES", "false").lower() == "true",
+            log_level=environ.get("LOG_LEVEL", "INFO"),
         )
     
+    @staticmethod
+    def reset_cache() -> None:
+        """Forget cached from_env() results so the next call re-reads the environment"""
+        with _CONFIG_CACHE_LOCK:
+            _CONFIG_CACHE.clear()
+    
     @classmethod
     def from_legacy_env(cls, env: str) -> "Config":
         """
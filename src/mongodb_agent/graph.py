@@ -9,28 +9,25 @@ This is extracted from mongodb_structure_agent/utils/nodes.py for reusability.
 """
 
 import logging
-from langgraph.graph import StateGraph, START, END
-from langchain_core.messages import HumanMessage
 
 from mongodb_agent.config import Config
-from mongodb_agent.state import AgentState, InputSchema, ResponseSchema
-from mongodb_agent.services.llm import get_llm
-from mongodb_agent.services.vector_db import get_vector_client
-from mongodb_agent.services.mongodb_router import get_mongodb_client
 
-# Import node modules directly (bypass __init__.py) to set globals first
-import sys
-import mongodb_agent.nodes.selector
-import mongodb_agent.nodes.query_executor
-import mongodb_agent.nodes.query_refiner
-import mongodb_agent.nodes.output_parser  
-import mongodb_agent.nodes.router
-
-selector_module = sys.modules['mongodb_agent.nodes.selector']
-executor_module = sys.modules['mongodb_agent.nodes.query_executor']
-refiner_module = sys.modules['mongodb_agent.nodes.query_refiner']
-parser_module = sys.modules['mongodb_agent.nodes.output_parser']
-router_module = sys.modules['mongodb_agent.nodes.router']
+# Immutable defaults for every new AgentState; ingress adds the per-request fields
+_INGRESS_TEMPLATE = {
+    "yaml_content": "",
+    "iterations": 0,
+    "schema": "",
+    "raw_extracted_schema_dict": None,
+    "content_yaml": "",
+    "metrics": "",
+    "verified_queries": "",
+    "custom_instructions": "",
+    "fk_str": "",
+    "sql_query": None,
+    "query_result": None,
+    "error": "",
+    "exception_class": "",
+}
 
 
 def build_graph(config: Config):
@@ -50,6 +47,32 @@ def build_graph(config: Config):
     Returns:
         Compiled StateGraph
     """
+    # Imported here so `import mongodb_agent` doesn't pay for langgraph/langchain
+    # and the LLM/vector/MongoDB client stacks until a graph is actually built
+    import os
+    import sys
+    from langgraph.graph import StateGraph, START, END
+    from langchain_core.messages import HumanMessage
+    from langchain_core.runnables import RunnableLambda
+    
+    from mongodb_agent.state import AgentState, InputSchema, ResponseSchema
+    from mongodb_agent.services.llm import get_llm
+    from mongodb_agent.services.vector_db import get_vector_client
+    from mongodb_agent.services.mongodb_router import get_mongodb_client
+    
+    # Import node modules directly (bypass __init__.py) to set globals first
+    import mongodb_agent.nodes.selector
+    import mongodb_agent.nodes.query_executor
+    import mongodb_agent.nodes.query_refiner
+    import mongodb_agent.nodes.output_parser
+    import mongodb_agent.nodes.router
+    
+    selector_module = sys.modules['mongodb_agent.nodes.selector']
+    executor_module = sys.modules['mongodb_agent.nodes.query_executor']
+    refiner_module = sys.modules['mongodb_agent.nodes.query_refiner']
+    parser_module = sys.modules['mongodb_agent.nodes.output_parser']
+    router_module = sys.modules['mongodb_agent.nodes.router']
+    
     logger = logging.getLogger(__name__)
     logger.info(f"Building graph with config: vector_db={config.vector_db}, llm={config.llm_provider}")
     
@@ -58,11 +81,17 @@ def build_graph(config: Config):
     vector_client = get_vector_client(config)
     mongodb_client = get_mongodb_client(config)
     
-    # Set global variables in node modules
-    selector_module.llm = llm
-    selector_module.vector_client = vector_client
-    selector_module.config = config
+    # The selector gets its own context; the other nodes still read module globals
+    # The working directory is pinned here, so requests don't pay for os.getcwd()
+    selector_context = selector_module.SelectorContext(
+        llm=llm,
+        vector_client=vector_client,
+        semantic_model_path=config.semantic_model_path,
+        cwd=os.getcwd(),
+    )
+    selector_module.index_semantic_models(selector_context.semantic_model_path, selector_context.cwd)
     
+    # Set global variables in node modules
     executor_module.mongodb_client = mongodb_client
     executor_module.config = config
     
@@ -72,7 +101,7 @@ def build_graph(config: Config):
     parser_module.llm = llm
     parser_module.config = config
     
-    logger.info(f"DEBUG: Set selector_module.config.semantic_model_path = {config.semantic_model_path}")
+    logger.info(f"DEBUG: Selector semantic_model_path = {config.semantic_model_path}")
     
     # Build StateGraph
     builder = StateGraph(
@@ -85,29 +114,26 @@ def build_graph(config: Config):
     def ingress(inputs: InputSchema) -> AgentState:
         """Initialize state from user input"""
         logger.info(f"Ingress: question={inputs['question'][:50]}...")
+        yaml_file_name = inputs.get("yaml_file_name", "")
         return {
+            **_INGRESS_TEMPLATE,
             "messages": [HumanMessage(content=inputs["question"])],
-            "yaml_file_name": inputs.get("yaml_file_name", ""),
-            "file_name": inputs.get("yaml_file_name", ""),
-            "yaml_content": "",
+            "user_question": inputs["question"],
+            "yaml_file_name": yaml_file_name,
+            "file_name": yaml_file_name,
             "db_details": inputs.get("db_details", {}),
-            "iterations": 0,
-            "schema": "",
-            "raw_extracted_schema_dict": None,
-            "content_yaml": "",
-            "metrics": "",
-            "verified_queries": "",
-            "custom_instructions": "",
-            "fk_str": "",
-            "sql_query": None,
-            "query_result": None,
-            "error": "",
-            "exception_class": "",
+            "bypass_cache": inputs.get("bypass_cache", False),
         }
     
     # Add nodes
     builder.add_node("ingress", ingress)
-    builder.add_node("selector", selector_module.selector)
+    # Sync graph runs call the plain node; ainvoke/astream use the async variant,
+    # which overlaps the vector DB lookup with the local file load
+    builder.add_node("selector", RunnableLambda(
+        selector_module.make_selector(selector_context),
+        afunc=selector_module.make_async_selector(selector_context),
+        name="selector",
+    ))
     builder.add_node("query_executor", executor_module.query_executor)
     builder.add_node("query_refiner", refiner_module.query_refiner)
     builder.add_node("output_parser", parser_module.output_parser)
@@ -3,11 +3,27 @@
 
 """Nodes package initialization"""
 
-from mongodb_agent.nodes.selector import selector
-from mongodb_agent.nodes.query_executor import query_executor
-from mongodb_agent.nodes.query_refiner import query_refiner
-from mongodb_agent.nodes.output_parser import output_parser
-from mongodb_agent.nodes.router import route_to_decide
+import importlib
+import sys
+import types
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mongodb_agent.nodes.selector import selector
+    from mongodb_agent.nodes.query_executor import query_executor
+    from mongodb_agent.nodes.query_refiner import query_refiner
+    from mongodb_agent.nodes.output_parser import output_parser
+    from mongodb_agent.nodes.router import route_to_decide
+
+# Node functions are imported on first access (PEP 562), so importing one
+# node module doesn't load all the others
+_NODE_MAP = {
+    "selector": "mongodb_agent.nodes.selector:selector",
+    "query_executor": "mongodb_agent.nodes.query_executor:query_executor",
+    "query_refiner": "mongodb_agent.nodes.query_refiner:query_refiner",
+    "output_parser": "mongodb_agent.nodes.output_parser:output_parser",
+    "route_to_decide": "mongodb_agent.nodes.router:route_to_decide",
+}
 
 __all__ = [
     "selector",
@@ -16,3 +32,31 @@ __all__ = [
     "output_parser",
     "route_to_decide",
 ]
+
+
+def __getattr__(name):
+    target = _NODE_MAP.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = target.split(":")
+    value = getattr(importlib.import_module(module_name), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _NodesModule(types.ModuleType):
+    """Keeps node functions bound over their same-named submodules"""
+    
+    def __setattr__(self, name, value):
+        # Importing e.g. mongodb_agent.nodes.selector makes the import system bind
+        # the submodule as a package attribute - keep exporting the function instead
+        if name in _NODE_MAP and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _NodesModule
@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2026 Cisco Systems, Inc. and its affiliates
+
+"""Helpers shared by graph nodes"""
+
+from functools import singledispatch
+from typing import Dict, Any
+
+from langchain_core.messages import BaseMessage
+
+
+@singledispatch
+def message_content(message: Any) -> str:
+    """Text of a message: .content when present, otherwise str(message)"""
+    if hasattr(message, 'content'):
+        return message.content
+    return str(message)
+
+
+@message_content.register(BaseMessage)
+def _(message: BaseMessage) -> str:
+    return message.content
+
+
+@message_content.register(dict)
+def _(message: dict) -> str:
+    return message.get('content', '')
+
+
+def get_user_question(state: Dict[str, Any]) -> str:
+    """
+    Get the user's question from agent state
+    
+    Ingress stores it as user_question; states built elsewhere fall back
+    to the content of the first message.
+    """
+    question = state.get("user_question")
+    if question is not None:
+        return question
+    messages = state.get("messages")
+    return message_content(messages[0]) if messages else ""
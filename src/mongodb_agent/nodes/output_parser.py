@@ -14,12 +14,33 @@ import logging
 import json
 from typing import Dict, Any
 
+import orjson
+
+from mongodb_agent.nodes._common import get_user_question
+from mongodb_agent.prompts import build_output_parser_prompt
+
 # Global instances (set by build_graph)
 llm = None
 config = None
 
 logger = logging.getLogger(__name__)
 
+# Bound once - saves the attribute lookup at every log call
+_log_debug = logger.debug
+_log_info = logger.info
+_log_exc = logger.exception
+
+_ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+
+def _format_result_json(query_result: Any) -> str:
+    """Pretty-print query results as JSON (ObjectId and other BSON types become strings)"""
+    try:
+        return orjson.dumps(query_result, default=str, option=_ORJSON_OPTIONS).decode()
+    except orjson.JSONEncodeError:
+        # e.g. integers beyond 64 bits - the stdlib encoder handles anything str() can
+        return json.dumps(query_result, indent=2, default=str)
+
 
 def output_parser(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -31,44 +52,44 @@ def output_parser(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Updated state with formatted query_result (natural language)
     """
-    logger.info("📝 Output Parser: Converting results to natural language")
+    _log_info("📝 Output Parser: Converting results to natural language")
     
     try:
         # 1. Get query result - check both raw_mongo_result and query_result
         raw_mongo_result = state.get("raw_mongo_result")
         query_result_summary = state.get("query_result", "No data available")
-        user_query = state["messages"][0].content if state.get("messages") else ""
+        user_query = get_user_question(state)
         
         # Use raw MongoDB data for formatting if available, otherwise use summary
         query_result = raw_mongo_result if raw_mongo_result is not None else query_result_summary
         
-        logger.info(f"Parsing result: {str(query_result)[:100]}...")
+        _log_info("Parsing result: %.100s...", query_result)
         
         # 2. Convert query_result to JSON format for better LLM parsing
         if isinstance(query_result, (list, dict)):
             # Convert Python data structure to JSON with proper double quotes
-            query_result_formatted = json.dumps(query_result, indent=2, default=str)
+            query_result_formatted = _format_result_json(query_result)
         else:
             query_result_formatted = str(query_result)
         
         # 3. Build output parser prompt
-        from mongodb_agent.prompts import build_output_parser_prompt
-        
         prompt = build_output_parser_prompt(
             user_query=user_query,
             query_result=query_result_formatted
         )
         
         # 4. Call LLM to format response
-        logger.info("🤖 Calling LLM to format response")
-        logger.info(f"📤 LLM REQUEST PROMPT ({len(prompt)} chars):\n{prompt}")
-        logger.info("=" * 80)
-        full_response = ""
+        _log_info("🤖 Calling LLM to format response")
+        if logger.isEnabledFor(logging.DEBUG):
+            _log_debug("📤 LLM REQUEST PROMPT (%d chars):\n%s", len(prompt), prompt)
+            _log_debug("=" * 80)
+        parts = []
         for chunk in llm.stream(prompt):
-            full_response += chunk.content
+            parts.append(chunk.content)
+        full_response = "".join(parts)
         
-        logger.info(f"✅ Natural language response: {len(full_response)} chars")
-        logger.info(f"📝 NATURAL LANGUAGE RESPONSE:\n{full_response}")
+        _log_info("✅ Natural language response: %d chars", len(full_response))
+        _log_debug("📝 NATURAL LANGUAGE RESPONSE:\n%s", full_response)
         
         # 5. Return formatted response
         # Keep both the raw MongoDB data and the natural language response
@@ -78,7 +99,7 @@ def output_parser(state: Dict[str, Any]) -> Dict[str, Any]:
         }
     
     except Exception as e:
-        logger.exception(f"❌ Output parser error: {e}")
+        _log_exc("❌ Output parser error: %s", e)
         return {
             "query_result": f"Error formatting response: {str(e)}"
         }
@@ -20,6 +20,26 @@ config = None
 
 logger = logging.getLogger(__name__)
 
+# Bound once - saves the attribute lookup at every log call
+_log_info = logger.info
+_log_error = logger.error
+_log_exc = logger.exception
+
+# Shared fallback for the messages passthrough - the add_messages reducer never mutates it
+_EMPTY_MESSAGES: list = []
+
+# Large state fields cleared after execution to reduce state size.
+# Shared across calls - no node reads these fields after the executor runs.
+_CLEARED_FIELDS: Dict[str, Any] = {
+    "schema": "",
+    "verified_queries": "",
+    "custom_instructions": "",
+    "fk_str": "",
+    "content_yaml": "",
+    "metrics": "",
+    "raw_extracted_schema_dict": {},
+}
+
 
 def query_executor(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -31,7 +51,7 @@ def query_executor(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Updated state with query_result or error
     """
-    logger.info("⚡ Query Executor: Executing MongoDB query")
+    _log_info("⚡ Query Executor: Executing MongoDB query")
     
     try:
         # 1. Get query and db details
@@ -39,16 +59,18 @@ def query_executor(state: Dict[str, Any]) -> Dict[str, Any]:
         if not query:
             raise ValueError("No MongoDB query generated")
         
-        db_details = state.get("db_details", {}).copy()
+        # Borrowed read-only; copied only when the collection has to be added
+        db_details = state.get("db_details", {})
         
         # Extract collection name for direct MongoDB connection
         collection_name = state.get("collection_name")
         if collection_name and "collection" not in db_details:
-            db_details["collection"] = collection_name
+            db_details = {**db_details, "collection": collection_name}
         
         query_str = query if isinstance(query, str) else str(query)
-        logger.info(f"Executing query: {query_str[:100]}...")
-        logger.info(f"Database: {db_details.get('dbName', db_details.get('database', db_details.get('collection')))}")
+        _log_info("Executing query: %.100s...", query_str)
+        if logger.isEnabledFor(logging.INFO):
+            _log_info("Database: %s", db_details.get('dbName', db_details.get('database', db_details.get('collection'))))
         
         # 2. Execute via MongoDB client (MCP or Direct)
         response = mongodb_client.execute_query(
@@ -58,7 +80,7 @@ def query_executor(state: Dict[str, Any]) -> Dict[str, Any]:
         
         # 3. Process response
         if response.get("success"):
-            logger.info("✅ Query executed successfully")
+            _log_info("✅ Query executed successfully")
             
             # Get actual MongoDB results data
             mongo_data = response.get("data", [])
@@ -72,43 +94,30 @@ def query_executor(state: Dict[str, Any]) -> Dict[str, Any]:
             
             # Clean up large fields to reduce state size
             return {
+                **_CLEARED_FIELDS,
                 "sql_query": str(query),
                 "query_result": result_summary,  # Natural language summary
                 "raw_mongo_result": mongo_data,  # Actual data
                 "error": "",
                 "exception_class": "",
-                "messages": state.get("messages", []),
-                # Clear unnecessary fields
-                "schema": "",
-                "verified_queries": "",
-                "custom_instructions": "",
-                "fk_str": "",
-                "content_yaml": "",
-                "metrics": "",
-                "raw_extracted_schema_dict": {},
+                "messages": state.get("messages") or _EMPTY_MESSAGES,
             }
         else:
             error_msg = response.get("error", "Unknown error")
-            logger.error(f"❌ Query execution failed: {error_msg}")
+            _log_error("❌ Query execution failed: %s", error_msg)
             
+            # Clear unnecessary fields even in error case
             return {
+                **_CLEARED_FIELDS,
                 "sql_query": str(query),
                 "query_result": None,
                 "error": error_msg,
                 "exception_class": "MCPExecutionError",
-                "messages": state.get("messages", []),
-                # Clear unnecessary fields even in error case
-                "schema": "",
-                "verified_queries": "",
-                "custom_instructions": "",
-                "fk_str": "",
-                "content_yaml": "",
-                "metrics": "",
-                "raw_extracted_schema_dict": {},
+                "messages": state.get("messages") or _EMPTY_MESSAGES,
             }
     
     except Exception as e:
-        logger.exception(f"❌ Query executor error: {e}")
+        _log_exc("❌ Query executor error: %s", e)
         return {
             "error": f"Execution error: {str(e)}",
             "exception_class": type(e).__name__,
@@ -16,12 +16,20 @@ from typing import Dict, Any
 
 from langchain_core.messages import AIMessage
 
+from mongodb_agent.nodes._common import get_user_question
+from mongodb_agent.prompts import build_refiner_prompt
+from mongodb_agent.utils.parsers import parse_mongodb_query_from_string
+
 # Global instances (set by build_graph)
 llm = None
 config = None
 
 logger = logging.getLogger(__name__)
 
+# Bound once - saves the attribute lookup at every log call
+_log_info = logger.info
+_log_exc = logger.exception
+
 
 def query_refiner(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -33,21 +41,19 @@ def query_refiner(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Updated state with corrected sql_query
     """
-    logger.info("🔧 Query Refiner: Fixing MongoDB query")
+    _log_info("🔧 Query Refiner: Fixing MongoDB query")
     
     try:
         # 1. Get context
         failed_query = state.get("sql_query", "")
         error = state.get("error", "")
         exception_class = state.get("exception_class", "")
-        user_question = state["messages"][0].content if state.get("messages") else ""
+        user_question = get_user_question(state)
         
-        logger.info(f"Failed query: {failed_query[:100]}...")
-        logger.info(f"Error: {error}")
+        _log_info("Failed query: %.100s...", failed_query)
+        _log_info("Error: %s", error)
         
         # 2. Build refiner prompt
-        from mongodb_agent.prompts import build_refiner_prompt
-        
         # Get schema context from state
         schema_context = state.get("schema_context", "")
         fk_relationships = state.get("fk_relationships", "")
@@ -62,16 +68,15 @@ def query_refiner(state: Dict[str, Any]) -> Dict[str, Any]:
         )
         
         # 3. Call LLM to fix query
-        logger.info("🤖 Calling LLM to fix query")
-        full_response = ""
+        _log_info("🤖 Calling LLM to fix query")
+        parts = []
         for chunk in llm.stream(prompt):
-            full_response += chunk.content
+            parts.append(chunk.content)
+        full_response = "".join(parts)
         
-        logger.info(f"✅ LLM response: {len(full_response)} chars")
+        _log_info("✅ LLM response: %d chars", len(full_response))
         
         # 4. Parse corrected query
-        from mongodb_agent.utils.parsers import parse_mongodb_query_from_string
-        
         corrected_query = parse_mongodb_query_from_string(full_response)
         
         # 5. Return updated state
@@ -82,7 +87,7 @@ def query_refiner(state: Dict[str, Any]) -> Dict[str, Any]:
         }
     
     except Exception as e:
-        logger.exception(f"❌ Query refiner error: {e}")
+        _log_exc("❌ Query refiner error: %s", e)
         return {
             "error": f"Refiner error: {str(e)}",
             "iterations": state.get("iterations", 0) + 1
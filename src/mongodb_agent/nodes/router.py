@@ -10,11 +10,85 @@ This node decides the next step based on:
 - Iteration count (max retries)
 """
 
+import itertools
 import logging
-from typing import Dict, Any, Literal
+import re
+from typing import Dict, Any, Literal, Tuple
+
+# pyahocorasick is optional - it matches every fatal pattern in one pass over the error
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 logger = logging.getLogger(__name__)
 
+# Bound once - saves the attribute lookup at every log call
+_log_info = logger.info
+_log = logger.log
+
+# Errors meaning no query was generated (fatal)
+_NO_QUERY_ERRORS = ("No SQL found", "No MongoDB query found")
+_NO_QUERY_RE = re.compile("|".join(re.escape(pattern) for pattern in _NO_QUERY_ERRORS))
+
+# MCP connectivity errors (fatal), matched in a single pass over the error text
+_MCP_CONNECTIVITY_ERRORS = (
+    "No valid content in MCP result",
+    "Failed to connect to",
+    "Connection error",
+    "HTTP 401",
+    "HTTP 403",
+    "HTTP 500",
+    "Timeout",
+    "Authentication failed"
+)
+_MCP_FATAL_RE = re.compile("|".join(re.escape(pattern) for pattern in _MCP_CONNECTIVITY_ERRORS))
+
+# Automaton values: index into the (no_query, mcp_fatal) result of _scan_error
+_NO_QUERY, _MCP_FATAL = 0, 1
+_FATAL_AUTOMATON = None
+if ahocorasick is not None:
+    _FATAL_AUTOMATON = ahocorasick.Automaton()
+    for pattern in _NO_QUERY_ERRORS:
+        _FATAL_AUTOMATON.add_word(pattern, _NO_QUERY)
+    for pattern in _MCP_CONNECTIVITY_ERRORS:
+        _FATAL_AUTOMATON.add_word(pattern, _MCP_FATAL)
+    _FATAL_AUTOMATON.make_automaton()
+
+
+def _scan_error(error: str) -> Tuple[bool, bool]:
+    """Check the error text for fatal patterns -> (no query generated, MCP connectivity error)"""
+    if not error:
+        return False, False
+    if _FATAL_AUTOMATON is None:
+        return _NO_QUERY_RE.search(error) is not None, _MCP_FATAL_RE.search(error) is not None
+    found = [False, False]
+    for _, kind in _FATAL_AUTOMATON.iter(error):
+        found[kind] = True
+    return found[_NO_QUERY], found[_MCP_FATAL]
+
+
+def _decide(no_query: bool, has_error: bool, mcp_fatal: bool, retries_exhausted: bool) -> Tuple[str, int, str]:
+    """Routing rules in priority order -> (route, log level, log message template)"""
+    # Check for no query generated
+    if no_query:
+        return "fatal_error", logging.ERROR, "No MongoDB query was generated, terminating"
+    # No error - success path
+    if not has_error:
+        return "success", logging.INFO, "✅ Route: success → output_parser"
+    # Check for MCP connectivity errors (fatal)
+    if mcp_fatal:
+        return "fatal_error", logging.ERROR, "MCP connectivity error detected: %(error)s. Treating as fatal"
+    # Check iteration count (max 1 retry)
+    if retries_exhausted:
+        return "fatal_error", logging.ERROR, "Max retries reached (iterations=%(iterations)s), terminating"
+    # Recoverable error - try to refine
+    return "error", logging.INFO, "⚠️ Route: error → query_refiner (retry)"
+
+
+# Every combination of routing flags resolved once at import; routing is then a single lookup
+_ROUTE_TABLE = {flags: _decide(*flags) for flags in itertools.product((False, True), repeat=4)}
+
 
 def route_to_decide(state: Dict[str, Any]) -> Literal["success", "error", "fatal_error"]:
     """
@@ -36,39 +110,16 @@ def route_to_decide(state: Dict[str, Any]) -> Literal["success", "error", "fatal
     error = state.get("error", "")
     iterations = state.get("iterations", 0)
     
-    logger.info(f"🔀 Router: error='{error[:50] if error else 'none'}', iterations={iterations}")
-    
-    # Check for no query generated
-    if "No SQL found" in error or "No MongoDB query found" in error:
-        logger.error("No MongoDB query was generated, terminating")
-        return "fatal_error"
-    
-    # No error - success path
-    if error == "":
-        logger.info("✅ Route: success → output_parser")
-        return "success"
+    _log_info("🔀 Router: error='%.50s', iterations=%s", error or 'none', iterations)
     
-    # Check for MCP connectivity errors (fatal)
-    mcp_connectivity_errors = [
-        "No valid content in MCP result",
-        "Failed to connect to",
-        "Connection error",
-        "HTTP 401",
-        "HTTP 403",
-        "HTTP 500",
-        "Timeout",
-        "Authentication failed"
-    ]
-    
-    if any(mcp_error in error for mcp_error in mcp_connectivity_errors):
-        logger.error(f"MCP connectivity error detected: {error}. Treating as fatal")
-        return "fatal_error"
-    
-    # Check iteration count (max 1 retry)
-    if iterations >= 1 or "fatal_error" in error.lower():
-        logger.error(f"Max retries reached (iterations={iterations}), terminating")
-        return "fatal_error"
-    
-    # Recoverable error - try to refine
-    logger.info("⚠️ Route: error → query_refiner (retry)")
-    return "error"
+    no_query, mcp_fatal = _scan_error(error)
+    flags = (
+        no_query,
+        error != "",
+        mcp_fatal,
+        iterations >= 1 or "fatal_error" in error.lower(),
+    )
+    route, level, message = _ROUTE_TABLE[flags]
+    # Messages use %(name)s placeholders, formatted only if the record is emitted
+    _log(level, message, {"error": error, "iterations": iterations})
+    return route
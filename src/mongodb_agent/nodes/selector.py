@@ -16,287 +16,542 @@ This node:
 Extracted from mongodb_structure_agent/utils/nodes.py lines 63-400
 """
 
+import asyncio
+import hashlib
 import os
 import logging
-import yaml
-from typing import Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
 from langchain_core.messages import AIMessage
 
+from mongodb_agent._compat import DATACLASS_OPTIONS
 from mongodb_agent.state import AgentState
-from mongodb_agent.semantic_models import process_semantic_model
+from mongodb_agent.semantic_models import (
+    load_semantic_model,
+    parse_semantic_model_json,
+    parse_semantic_model_text,
+    process_semantic_model,
+)
+from mongodb_agent.nodes._common import get_user_question
 from mongodb_agent.prompts import build_selector_prompt
 from mongodb_agent.utils.parsers import parse_json, extract_array_fields
 
-# Global instances (set by build_graph)
+# Global instances used by the module-level selector() (build_graph binds a SelectorContext instead)
 llm = None
 vector_client = None
 config = None
 
 logger = logging.getLogger(__name__)
+_log_debug = logger.debug
+_log_info = logger.info
+_log_warning = logger.warning
+_log_error = logger.error
+
+
+@dataclass(frozen=True, **DATACLASS_OPTIONS)
+class SelectorContext:
+    """Services and settings one selector node runs with (built once by build_graph)"""
+    llm: Any
+    vector_client: Any = None
+    semantic_model_path: str = "semantic_models"
+    cwd: Optional[str] = None  # Pinned working directory; None follows os.getcwd() per call
+    # Prompt digest -> (stored_at, LLM response); per context so different models never share answers
+    llm_cache: "OrderedDict[bytes, Tuple[float, str]]" = field(default_factory=OrderedDict, repr=False)
+
+
+# Selector LLM response cache bounds (SELECTOR_LLM_CACHE_SIZE=0 disables it)
+SELECTOR_LLM_CACHE_SIZE = int(os.getenv("SELECTOR_LLM_CACHE_SIZE", "1024"))
+SELECTOR_LLM_CACHE_TTL_SECONDS = float(os.getenv("SELECTOR_LLM_CACHE_TTL", "3600"))
+_llm_cache_lock = threading.Lock()
+
+
+# (cwd, semantic model path) -> (directory stamps, file name -> resolved path), built by index_semantic_models()
+_YAML_PATH_INDEXES: Dict[Tuple[str, str], Tuple[Tuple[Optional[int], ...], Dict[str, str]]] = {}
+
+
+def _candidate_dirs(semantic_model_path: str, cwd: str) -> List[str]:
+    """Directories searched for semantic model files, in priority order"""
+    return [cwd, os.path.join(cwd, 'semantic_models'), semantic_model_path]
+
+
+def _dir_stamps(directories: List[str]) -> Tuple[Optional[int], ...]:
+    """Modification time of each directory (None if missing); changes when files are added or removed"""
+    stamps = []
+    for directory in directories:
+        try:
+            stamps.append(os.stat(directory).st_mtime_ns)
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def index_semantic_models(semantic_model_path: Optional[str] = None, cwd: Optional[str] = None) -> Dict[str, str]:
+    """
+    Scan the semantic model directories once and index YAML files by name
+    
+    The first directory containing a given file name wins, matching the
+    order the selector used to probe. Called from build_graph and again
+    whenever one of the directories' modification time changes.
+    """
+    if semantic_model_path is None:
+        semantic_model_path = getattr(config, 'semantic_model_path', 'semantic_models')
+    if cwd is None:
+        cwd = os.getcwd()
+    
+    directories = _candidate_dirs(semantic_model_path, cwd)
+    # Stamped before the scan so a change made during it triggers another one
+    stamps = _dir_stamps(directories)
+    index: Dict[str, str] = {}
+    for directory in directories:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(('.yaml', '.yml')) and entry.is_file():
+                        index.setdefault(entry.name, entry.path)
+        except OSError:
+            continue
+    
+    _YAML_PATH_INDEXES[(cwd, semantic_model_path)] = (stamps, index)
+    _log_info("Indexed %d semantic model files", len(index))
+    return index
+
+
+def _resolve_yaml_path(yaml_file_name: str, semantic_model_path: str, cwd: str) -> Optional[str]:
+    """Find a semantic model file - index lookup first, probing only on a miss"""
+    entry = _YAML_PATH_INDEXES.get((cwd, semantic_model_path))
+    # Files added to or removed from any candidate directory invalidate the index
+    if entry is None or entry[0] != _dir_stamps(_candidate_dirs(semantic_model_path, cwd)):
+        index = index_semantic_models(semantic_model_path, cwd)
+    else:
+        index = entry[1]
+    
+    resolved_path = index.get(yaml_file_name)
+    if resolved_path:
+        return resolved_path
+    
+    # Not indexed: absolute path or sub-directory path
+    candidates = [os.path.join(cwd, yaml_file_name)] + [
+        os.path.join(directory, yaml_file_name) for directory in _candidate_dirs(semantic_model_path, cwd)[1:]
+    ]
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+# (db_name, schema_name, app_name, db_type) when no format supplies database details
+_NO_DB_DETAILS = (None, None, None, "mongodb")
+
+
+def _extract_mongodb_format(yaml_content: Dict[str, Any]) -> Optional[tuple]:
+    """Format 1: MongoDB semantic model format"""
+    yaml_db_name = yaml_content.get("database")
+    yaml_schema_name = yaml_content.get("schema")
+    _log_debug("Detected MongoDB format: db=%s, schema=%s", yaml_db_name, yaml_schema_name)
+    return yaml_db_name, yaml_schema_name, None, "mongodb"
+
+
+def _extract_collection_info_format(yaml_content: Dict[str, Any]) -> Optional[tuple]:
+    """Format 1.5: MongoDB semantic model with collection_info"""
+    collection_info = yaml_content["collection_info"]
+    if not isinstance(collection_info, dict):
+        return _NO_DB_DETAILS
+    yaml_db_name = collection_info.get("database")
+    _log_debug("Detected MongoDB collection_info format: db=%s", yaml_db_name)
+    return yaml_db_name, collection_info.get("schema_name"), None, "mongodb"
+
+
+def _extract_oracle_format(yaml_content: Dict[str, Any]) -> Optional[tuple]:
+    """Format 2: Oracle semantic model format (None lets an empty table list fall through)"""
+    tables = yaml_content["tables"]
+    if len(tables) == 0:
+        return None
+    first_table = tables[0]
+    if "base_table" not in first_table:
+        return _NO_DB_DETAILS
+    base_table = first_table["base_table"]
+    yaml_db_name = base_table.get("database")
+    _log_debug("Detected Oracle format: db=%s", yaml_db_name)
+    return yaml_db_name, base_table.get("schema"), None, "oracle"
+
+
+def _extract_collections_format(yaml_content: Dict[str, Any]) -> Optional[tuple]:
+    """Format 3: Collections format"""
+    yaml_db_name = None
+    yaml_schema_name = None
+    if "metadata" in yaml_content:
+        metadata = yaml_content["metadata"]
+        yaml_db_name = metadata.get("database") or metadata.get("source_database")
+        yaml_schema_name = metadata.get("schema_name")
+    _log_debug("Detected Collections format: db=%s", yaml_db_name)
+    return yaml_db_name, yaml_schema_name, None, "mongodb"
+
+
+# Semantic model formats in detection order: (required top-level keys, extractor)
+_FORMAT_DISPATCH = (
+    (frozenset({"database", "schema"}), _extract_mongodb_format),
+    (frozenset({"collection_info"}), _extract_collection_info_format),
+    (frozenset({"tables"}), _extract_oracle_format),
+    (frozenset({"collections"}), _extract_collections_format),
+)
+
+
+def _detect_db_details(yaml_content: Dict[str, Any]) -> tuple:
+    """Return (db_name, schema_name, app_name, db_type) from the first matching format"""
+    keys = yaml_content.keys()
+    for signature, extract in _FORMAT_DISPATCH:
+        if signature <= keys:
+            details = extract(yaml_content)
+            if details is not None:
+                return details
+    return _NO_DB_DETAILS
+
+
+def _iter_array_field_hints(collections: Dict[str, Any]):
+    """Yield the $unwind hint lines for every array field, grouped by collection"""
+    for collection_name, collection_data in collections.items():
+        array_fields = extract_array_fields(collection_data.get("fields", {}))
+        if array_fields:
+            yield f"\n[ARRAY FIELDS IN {collection_name}]\n"
+            for field_path in array_fields:
+                yield f"  - {field_path} is an ARRAY → Use $unwind: \"${field_path}\"\n"
+
+
+def _get_cached_llm_response(ctx: SelectorContext, prompt_key: bytes) -> Optional[str]:
+    """Return a cached LLM response for this prompt, or None when missing or expired"""
+    with _llm_cache_lock:
+        entry = ctx.llm_cache.get(prompt_key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > SELECTOR_LLM_CACHE_TTL_SECONDS:
+            del ctx.llm_cache[prompt_key]
+            return None
+        ctx.llm_cache.move_to_end(prompt_key)
+        return entry[1]
+
+
+def _store_llm_response(ctx: SelectorContext, prompt_key: bytes, llm_response: str) -> None:
+    """Cache an LLM response, evicting the least recently used entries past the size bound"""
+    with _llm_cache_lock:
+        ctx.llm_cache[prompt_key] = (time.monotonic(), llm_response)
+        ctx.llm_cache.move_to_end(prompt_key)
+        while len(ctx.llm_cache) > SELECTOR_LLM_CACHE_SIZE:
+            ctx.llm_cache.popitem(last=False)
+
+
+def make_selector(ctx: SelectorContext):
+    """Create a selector node bound to ctx, so graphs with different services can run side by side"""
+    def selector(state: AgentState) -> Dict[str, Any]:
+        return _select(ctx, state)
+    return selector
+
+
+def make_async_selector(ctx: SelectorContext):
+    """Async counterpart of make_selector(), used when the graph runs via ainvoke"""
+    async def selector(state: AgentState) -> Dict[str, Any]:
+        return await _aselect(ctx, state)
+    return selector
 
 
 def selector(state: AgentState) -> Dict[str, Any]:
     """
     Retrieve semantic model and generate MongoDB query.
     
+    Uses the module-level llm, vector_client and config; graphs built by
+    build_graph use make_selector() instead.
+    
     Args:
         state: Current agent state containing messages, yaml_file_name, db_details
         
     Returns:
         Updated state with sql_query, schema, relationships, etc.
     """
-    logger.info("Executing selector node...")
+    ctx = SelectorContext(
+        llm=llm,
+        vector_client=vector_client,
+        semantic_model_path=getattr(config, 'semantic_model_path', 'semantic_models'),
+    )
+    return _select(ctx, state)
+
+
+def _selector_inputs(ctx: SelectorContext, state: AgentState) -> Tuple[str, Dict[str, Any], str]:
+    """Return (user_query, db_details, yaml_file_name) from the state"""
+    user_query = get_user_question(state)
     
-    try:
-        # Extract user query from messages
-        user_query = ""
-        messages = state.get("messages", [])
-        if messages and len(messages) > 0:
-            first_message = messages[0]
-            if hasattr(first_message, 'content'):
-                user_query = first_message.content
-            elif isinstance(first_message, dict):
-                user_query = first_message.get('content', '')
-            else:
-                user_query = str(first_message)
-        
-        logger.info(f"User query: '{user_query[:100]}...'")
-        
-        # Initialize db_details
-        db_details = state.get("db_details", {})
-        yaml_file_name = state.get("file_name", "")  # AgentState uses 'file_name'
-        
-        logger.info(f"DEBUG: yaml_file_name from state = '{yaml_file_name}'")
-        logger.info(f"DEBUG: config object = {config}")
-        logger.info(f"DEBUG: config.semantic_model_path = {getattr(config, 'semantic_model_path', 'NOT FOUND')}")
-        
-        # Step 1: Retrieve semantic model (from vector DB or local file)
-        yaml_content = None
-        text = ""
-        
-        # Try vector DB first if available
-        if vector_client and yaml_file_name:
-            try:
-                logger.info(f"Querying vector DB for: {yaml_file_name}")
-                results = vector_client.search(
-                    query=yaml_file_name,
-                    filters={"source": yaml_file_name}
-                )
-                
-                if results and len(results) > 0:
-                    text = results[0].get("text", "")
-                    
-                    # Extract db details from vector DB result
-                    db_name = results[0].get("db_name")
-                    schema_name = results[0].get("schema_name")
-                    app_name = results[0].get("app_name")
-                    db_type = results[0].get("db_type", "mongodb")
-                    
-                    if db_name or schema_name:
-                        db_details.update({
-                            "db_name": db_name,
-                            "schema_name": schema_name,
-                            "app_name": app_name or "GenAI-Agent",
-                            "db_type": db_type
-                        })
-                    
-                    logger.info(f"Retrieved {len(text)} characters from vector DB")
-                    logger.info(f"DB Details: {db_details}")
-            except Exception as e:
-                logger.warning(f"Vector DB query failed: {e}, falling back to local file")
-        
-        # Fallback to local file if no vector DB result
-        if not text or text.strip() == "":
-            if yaml_file_name:
-                logger.info(f"Loading YAML from local file: {yaml_file_name}")
-                
-                # Try multiple path resolution strategies
-                # Priority: CWD/semantic_models (for distribution users) > package semantic_models > config path
-                cwd = os.getcwd()
-                semantic_model_dir = getattr(config, 'semantic_model_path', 'semantic_models')
+    _log_info("User query: '%.100s...'", user_query)
+    
+    db_details = state.get("db_details", {})
+    yaml_file_name = state.get("file_name", "")  # AgentState uses 'file_name'
+    
+    _log_debug("yaml_file_name from state = '%s'", yaml_file_name)
+    _log_debug("semantic_model_path = %s", ctx.semantic_model_path)
+    return user_query, db_details, yaml_file_name
+
+
+def _fetch_from_vector_db(
+    ctx: SelectorContext,
+    yaml_file_name: str,
+    db_details: Dict[str, Any]
+) -> Tuple[str, Any]:
+    """
+    Look up the semantic model in the vector DB, updating db_details
+    
+    Returns (text, content): text is "" when unavailable; content is the
+    model decoded from the entry's pre-parsed "parsed_json" field, or None
+    for legacy entries that only carry YAML text.
+    """
+    text = ""
+    yaml_content = None
+    vector_client = ctx.vector_client
+    if vector_client and yaml_file_name:
+        try:
+            _log_info("Querying vector DB for: %s", yaml_file_name)
+            result = vector_client.search_semantic_model(yaml_file_name)
+            
+            if result:
+                text = result.get("text") or ""
                 
-                possible_paths = [
-                    yaml_file_name,  # Use as-is (for absolute paths)
-                    os.path.join(cwd, 'semantic_models', yaml_file_name),  # CWD/semantic_models/ (PRIORITY for distribution)
-                    os.path.join(cwd, yaml_file_name),  # Relative to CWD
-                    os.path.join(semantic_model_dir, yaml_file_name),  # From config
-                ]
+                # Entries ingested with a JSON copy of the model skip the YAML parse
+                parsed_json = result.get("parsed_json")
+                if parsed_json:
+                    try:
+                        yaml_content = parse_semantic_model_json(parsed_json)
+                    except ValueError as e:
+                        _log_warning("Ignoring unreadable parsed_json from vector DB: %s", e)
                 
-                # Find the first existing file
-                resolved_path = None
-                logger.info(f"DEBUG: Trying paths: {possible_paths}")
-                for path in possible_paths:
-                    logger.info(f"DEBUG: Checking path: {path}, exists={os.path.exists(path)}")
-                    if os.path.exists(path):
-                        resolved_path = path
-                        logger.info(f"✅ Found YAML file at: {resolved_path}")
-                        break
+                # Extract db details from vector DB result
+                db_name = result.get("db_name")
+                schema_name = result.get("schema_name")
+                app_name = result.get("app_name")
+                db_type = result.get("db_type") or "mongodb"
                 
-                if resolved_path:
-                    with open(resolved_path, 'r') as f:
-                        text = f.read()
-                    logger.info(f"Loaded {len(text)} characters from file")
-                else:
-                    raise FileNotFoundError(
-                        f"YAML file not found: {yaml_file_name}\n"
-                        f"Searched in:\n  - {cwd}/semantic_models/\n  - {cwd}/\n  - {semantic_model_dir}/"
-                    )
-            else:
-                raise ValueError("No yaml_file_name provided")
-        
-        # Parse YAML content
-        yaml_content = yaml.safe_load(text)
-        logger.info(f"Parsed YAML content type: {type(yaml_content)}")
-        
-        # Step 2: Extract database details from YAML if available
-        if isinstance(yaml_content, dict):
-            yaml_db_name = None
-            yaml_schema_name = None
-            yaml_app_name = None
-            yaml_db_type = "mongodb"
-            
-            # Format 1: MongoDB semantic model format
-            if "database" in yaml_content and "schema" in yaml_content:
-                yaml_db_name = yaml_content.get("database")
-                yaml_schema_name = yaml_content.get("schema")
-                yaml_db_type = "mongodb"
-                logger.debug(f"Detected MongoDB format: db={yaml_db_name}, schema={yaml_schema_name}")
-            
-            # Format 1.5: MongoDB semantic model with collection_info
-            elif "collection_info" in yaml_content:
-                collection_info = yaml_content["collection_info"]
-                if isinstance(collection_info, dict):
-                    yaml_db_name = collection_info.get("database")
-                    yaml_schema_name = collection_info.get("schema_name")
-                    yaml_db_type = "mongodb"
-                    logger.debug(f"Detected MongoDB collection_info format: db={yaml_db_name}")
-            
-            # Format 2: Oracle semantic model format
-            elif "tables" in yaml_content and len(yaml_content["tables"]) > 0:
-                first_table = yaml_content["tables"][0]
-                if "base_table" in first_table:
-                    base_table = first_table["base_table"]
-                    yaml_db_name = base_table.get("database")
-                    yaml_schema_name = base_table.get("schema")
-                    yaml_db_type = "oracle"
-                    logger.debug(f"Detected Oracle format: db={yaml_db_name}")
-            
-            # Format 3: Collections format
-            elif "collections" in yaml_content:
-                if "metadata" in yaml_content:
-                    metadata = yaml_content["metadata"]
-                    yaml_db_name = metadata.get("database") or metadata.get("source_database")
-                    yaml_schema_name = metadata.get("schema_name")
-                yaml_db_type = "mongodb"
-                logger.debug(f"Detected Collections format: db={yaml_db_name}")
-            
-            # Update db_details with extracted values
-            if yaml_db_name or yaml_schema_name:
-                db_details.update({
-                    "db_name": yaml_db_name or db_details.get("db_name"),
-                    "schema_name": yaml_schema_name or db_details.get("schema_name"),
-                    "app_name": yaml_app_name or db_details.get("app_name", "GenAI-Agent"),
-                    "db_type": yaml_db_type
-                })
-                # Also update the legacy keys for MCP compatibility
-                if yaml_db_name:
-                    db_details["dbName"] = yaml_db_name
-                if yaml_schema_name:
-                    db_details["userName"] = yaml_schema_name
-                if yaml_app_name:
-                    db_details["applicationName"] = yaml_app_name
-                logger.info(f"Updated db_details from YAML: {db_details}")
-        
-        # Step 3: Process semantic model with field optimization
-        logger.info("Processing semantic model with field optimization...")
-        schema, verified_queries, custom_instructions, fk_str, content_yaml, metrics = (
-            process_semantic_model(
-                yaml_content,
-                user_query=user_query,
-                optimize_fields=True,
-                max_fields=30
-            )
-        )
-        
-        logger.info(f"Schema length: {len(schema)} chars")
-        logger.info(f"Verified queries: {len(verified_queries)} chars")
-        logger.info(f"FK relationships: {len(fk_str)} chars")
-        
-        # Step 4: Extract array fields for $unwind hints
-        array_fields_info = ""
-        if content_yaml and "collections" in content_yaml:
-            for collection_name, collection_data in content_yaml.get("collections", {}).items():
-                fields = collection_data.get("fields", {})
-                array_fields = extract_array_fields(fields)
+                if db_name or schema_name:
+                    db_details.update({
+                        "db_name": db_name,
+                        "schema_name": schema_name,
+                        "app_name": app_name or "GenAI-Agent",
+                        "db_type": db_type
+                    })
                 
-                if array_fields:
-                    array_fields_info += f"\n[ARRAY FIELDS IN {collection_name}]\n"
-                    for field_path in array_fields:
-                        array_fields_info += f"  - {field_path} is an ARRAY → Use $unwind: \"${field_path}\"\n"
-        
-        if array_fields_info:
-            logger.info(f"Array fields extracted:\n{array_fields_info}")
-        
-        # Step 5: Build LLM prompt
-        logger.info("Building selector prompt...")
-        prompt = build_selector_prompt(
-            context=schema + array_fields_info,
-            fk_str=fk_str,
-            question=user_query,
-            evidence=custom_instructions,
-            metrics=metrics,
-            verified_queries=verified_queries
+                _log_info("Retrieved %d characters from vector DB", len(text))
+                _log_info("DB Details: %s", db_details)
+        except Exception as e:
+            _log_warning("Vector DB query failed: %s, falling back to local file", e)
+    return text, yaml_content
+
+
+def _load_from_file(ctx: SelectorContext, yaml_file_name: str) -> Any:
+    """Load the semantic model from a local YAML file"""
+    if not yaml_file_name:
+        raise ValueError("No yaml_file_name provided")
+    
+    _log_info("Loading YAML from local file: %s", yaml_file_name)
+    
+    # Path resolution: as-is / CWD > CWD/semantic_models > config path
+    cwd = ctx.cwd or os.getcwd()
+    resolved_path = _resolve_yaml_path(yaml_file_name, ctx.semantic_model_path, cwd)
+    if not resolved_path:
+        semantic_model_dir = ctx.semantic_model_path
+        raise FileNotFoundError(
+            f"YAML file not found: {yaml_file_name}\n"
+            f"Searched in:\n  - {cwd}/semantic_models/\n  - {cwd}/\n  - {semantic_model_dir}/"
         )
+    
+    _log_info("✅ Found YAML file at: %s", resolved_path)
+    # Re-parsed only when the file's mtime or size changes
+    yaml_content = load_semantic_model(resolved_path)
+    _log_info("Loaded semantic model from file")
+    return yaml_content
+
+
+def _select(ctx: SelectorContext, state: AgentState) -> Dict[str, Any]:
+    """Selector node body - see selector()"""
+    _log_info("Executing selector node...")
+    
+    try:
+        user_query, db_details, yaml_file_name = _selector_inputs(ctx, state)
         
-        logger.info(f"Prompt length: {len(prompt)} chars")
-        logger.debug(f"Prompt preview (first 500 chars):\n{prompt[:500]}...")
-        
-        # Step 6: Call LLM to generate MongoDB query
-        logger.info("Calling LLM to generate MongoDB query...")
-        logger.info("=" * 80)
-        logger.info("LLM CALL #1: SCHEMA SELECTOR")
-        logger.info("=" * 80)
-        logger.info(f"📤 LLM REQUEST PROMPT ({len(prompt)} chars):\n{prompt}")
-        logger.info("=" * 80)
-        
-        response = llm.invoke(prompt)
-        llm_response = response.content if hasattr(response, 'content') else str(response)
+        # Step 1: Retrieve semantic model (vector DB first, local file as fallback)
+        text, yaml_content = _fetch_from_vector_db(ctx, yaml_file_name, db_details)
+        if yaml_content is None and (not text or text.strip() == ""):
+            yaml_content = _load_from_file(ctx, yaml_file_name)
         
-        logger.info(f"LLM response length: {len(llm_response)} chars")
-        logger.info(f"📝 LLM RESPONSE:\n{llm_response}")
-        logger.info("=" * 80)
+        return _select_from_model(ctx, state, user_query, db_details, yaml_content, text)
         
-        # Step 7: Parse JSON response
-        logger.info("Parsing LLM response...")
-        parsed_response = parse_json(llm_response)
+    except Exception as e:
+        _log_error("Error in selector: %s", e, exc_info=True)
+        raise
+
+
+async def _aselect(ctx: SelectorContext, state: AgentState) -> Dict[str, Any]:
+    """
+    Async selector node body
+    
+    The local file load starts alongside the vector DB lookup and is only
+    used when the vector DB returns no model; otherwise it is cancelled.
+    """
+    _log_info("Executing selector node...")
+    
+    try:
+        user_query, db_details, yaml_file_name = _selector_inputs(ctx, state)
         
-        if parsed_response and isinstance(parsed_response, dict):
-            mongodb_query = parsed_response.get("mongodb_query", "")
-            collection_name = parsed_response.get("collection_name", "")
-            logger.info(f"MongoDB query generated for collection: {collection_name}")
-            logger.debug(f"Query: {mongodb_query[:200]}...")
+        # Step 1: Retrieve semantic model (vector DB first, local file as fallback)
+        if ctx.vector_client and yaml_file_name:
+            file_task = asyncio.ensure_future(asyncio.to_thread(_load_from_file, ctx, yaml_file_name))
+            try:
+                text, yaml_content = await asyncio.to_thread(_fetch_from_vector_db, ctx, yaml_file_name, db_details)
+                if yaml_content is None and (not text or text.strip() == ""):
+                    yaml_content = await file_task
+            finally:
+                _discard_task(file_task)
         else:
-            logger.error(f"Failed to parse MongoDB query response: {parsed_response}")
-            mongodb_query = ""
-            collection_name = ""
+            text = ""
+            yaml_content = await asyncio.to_thread(_load_from_file, ctx, yaml_file_name)
         
-        # Step 8: Return state update
-        return {
-            "raw_extracted_schema_dict": parsed_response,
-            "sql_query": mongodb_query,
-            "collection_name": collection_name,
-            "messages": [AIMessage(content=llm_response)],
-            "schema": schema,
-            "verified_queries": verified_queries,
-            "custom_instructions": custom_instructions,
-            "fk_str": fk_str,
-            "content_yaml": content_yaml,
-            "metrics": metrics,
-            "error": "",
-            "iterations": state.get("iterations", 0),
-            "db_details": db_details,
-        }
+        return await asyncio.to_thread(
+            _select_from_model, ctx, state, user_query, db_details, yaml_content, text
+        )
         
     except Exception as e:
-        logger.error(f"Error in selector: {e}", exc_info=True)
+        _log_error("Error in selector: %s", e, exc_info=True)
         raise
+
+
+def _discard_task(task: "asyncio.Future[Any]") -> None:
+    """Cancel a task whose result is no longer needed, retrieving any error it already raised"""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
+
+
+def _select_from_model(
+    ctx: SelectorContext,
+    state: AgentState,
+    user_query: str,
+    db_details: Dict[str, Any],
+    yaml_content: Any,
+    text: str
+) -> Dict[str, Any]:
+    """Process the retrieved semantic model, call the LLM and build the state update"""
+    # Parse YAML content retrieved from the vector DB (cached by text)
+    if yaml_content is None:
+        yaml_content = parse_semantic_model_text(text)
+    _log_info("Parsed YAML content type: %s", type(yaml_content))
+    
+    # Step 2: Extract database details from YAML if available
+    if isinstance(yaml_content, dict):
+        yaml_db_name, yaml_schema_name, yaml_app_name, yaml_db_type = _detect_db_details(yaml_content)
+    
+        # Update db_details with extracted values
+        if yaml_db_name or yaml_schema_name:
+            db_details.update({
+                "db_name": yaml_db_name or db_details.get("db_name"),
+                "schema_name": yaml_schema_name or db_details.get("schema_name"),
+                "app_name": yaml_app_name or db_details.get("app_name", "GenAI-Agent"),
+                "db_type": yaml_db_type
+            })
+            # Also update the legacy keys for MCP compatibility
+            if yaml_db_name:
+                db_details["dbName"] = yaml_db_name
+            if yaml_schema_name:
+                db_details["userName"] = yaml_schema_name
+            if yaml_app_name:
+                db_details["applicationName"] = yaml_app_name
+            _log_info("Updated db_details from YAML: %s", db_details)
+    
+    # Step 3: Process semantic model with field optimization
+    _log_info("Processing semantic model with field optimization...")
+    schema, verified_queries, custom_instructions, fk_str, content_yaml, metrics = (
+        process_semantic_model(
+            yaml_content,
+            user_query=user_query,
+            optimize_fields=True,
+            max_fields=30
+        )
+    )
+    
+    _log_info("Schema length: %d chars", len(schema))
+    _log_info("Verified queries: %d chars", len(verified_queries))
+    _log_info("FK relationships: %d chars", len(fk_str))
+    
+    # Step 4: Extract array fields for $unwind hints
+    array_fields_info = ""
+    if content_yaml and "collections" in content_yaml:
+        array_fields_info = "".join(_iter_array_field_hints(content_yaml.get("collections", {})))
+    
+    if array_fields_info:
+        _log_debug("Array fields extracted:\n%s", array_fields_info)
+    
+    # Step 5: Build LLM prompt
+    _log_info("Building selector prompt...")
+    prompt = build_selector_prompt(
+        context=schema + array_fields_info,
+        fk_str=fk_str,
+        question=user_query,
+        evidence=custom_instructions,
+        metrics=metrics,
+        verified_queries=verified_queries
+    )
+    
+    _log_info("Prompt length: %d chars", len(prompt))
+    
+    # Step 6: Call LLM to generate MongoDB query
+    _log_info("Calling LLM to generate MongoDB query...")
+    _log_info("LLM CALL #1: SCHEMA SELECTOR")
+    if logger.isEnabledFor(logging.DEBUG):
+        _log_debug("=" * 80)
+        _log_debug("📤 LLM REQUEST PROMPT (%d chars):\n%s", len(prompt), prompt)
+        _log_debug("=" * 80)
+    
+    # The prompt carries the schema, question and current date, so an identical
+    # prompt is the exact condition under which the LLM would see the same input
+    prompt_key = None
+    if SELECTOR_LLM_CACHE_SIZE > 0 and not state.get("bypass_cache", False):
+        prompt_key = hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+    llm_response = _get_cached_llm_response(ctx, prompt_key) if prompt_key else None
+    
+    if llm_response is not None:
+        _log_info("Reusing cached LLM response for an identical selector prompt")
+    else:
+        response = ctx.llm.invoke(prompt)
+        llm_response = response.content if hasattr(response, 'content') else str(response)
+    
+    _log_info("LLM response length: %d chars", len(llm_response))
+    _log_debug("📝 LLM RESPONSE:\n%s", llm_response)
+    
+    # Step 7: Parse JSON response
+    _log_info("Parsing LLM response...")
+    parsed_response = parse_json(llm_response)
+    
+    if parsed_response and isinstance(parsed_response, dict):
+        mongodb_query = parsed_response.get("mongodb_query", "")
+        collection_name = parsed_response.get("collection_name", "")
+        _log_info("MongoDB query generated for collection: %s", collection_name)
+        _log_debug("Query: %.200s...", mongodb_query)
+        if prompt_key:
+            _store_llm_response(ctx, prompt_key, llm_response)
+    else:
+        _log_error("Failed to parse MongoDB query response: %s", parsed_response)
+        mongodb_query = ""
+        collection_name = ""
+    
+    # Step 8: Return state update
+    return {
+        "raw_extracted_schema_dict": parsed_response,
+        "sql_query": mongodb_query,
+        "collection_name": collection_name,
+        "messages": [AIMessage(content=llm_response)],
+        "schema": schema,
+        "verified_queries": verified_queries,
+        "custom_instructions": custom_instructions,
+        "fk_str": fk_str,
+        "content_yaml": content_yaml,
+        "metrics": metrics,
+        "error": "",
+        "iterations": state.get("iterations", 0),
+        "db_details": db_details,
+    }
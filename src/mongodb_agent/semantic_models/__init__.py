@@ -10,6 +10,8 @@ semantic models defined in YAML format.
 
 from .loader import (
     load_semantic_model,
+    parse_semantic_model_json,
+    parse_semantic_model_text,
     process_semantic_model,
     optimize_schema_for_query,
     filter_relevant_collections,
@@ -17,6 +19,8 @@ from .loader import (
 
 __all__ = [
     "load_semantic_model",
+    "parse_semantic_model_json",
+    "parse_semantic_model_text",
     "process_semantic_model",
     "optimize_schema_for_query",
     "filter_relevant_collections",
@@ -8,50 +8,205 @@ Supports YAML-driven processing with intelligent field optimization,
 collection filtering, and relationship handling.
 """
 
+import functools
+import heapq
 import logging
+import os
 import re
-from typing import Dict, Any, List, Tuple, Optional, Set
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Dict, Any, FrozenSet, List, NamedTuple, Tuple, Optional
 import yaml
+import orjson
+
+from mongodb_agent._compat import DATACLASS_OPTIONS
+
+# pyahocorasick is optional - it finds every domain keyword in one pass over the query
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Prefer the libyaml C loader/dumper (5-10x faster); fall back when PyYAML was built without libyaml
+try:
+    from yaml import CSafeLoader as YAMLLoader, CSafeDumper as YAMLDumper
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader, SafeDumper as YAMLDumper
 
 logger = logging.getLogger(__name__)
 
 # Feature flag for YAML-driven filtering
 ENABLE_YAML_DRIVEN_FILTERING = True
 
+# Parsed semantic models keyed by file path -> ((st_mtime_ns, st_size), content)
+# Cached content is shared between callers and must be treated as read-only
+_semantic_model_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+# Memoized process_semantic_model results, keyed by (id(yaml_content), lowered query, options),
+# or by id(yaml_content) alone when no query-driven filtering applies.
+# Entries hold a reference to the source content so its id cannot be reused while cached.
+PROCESSED_MODEL_CACHE_SIZE = int(os.getenv("PROCESSED_MODEL_CACHE_SIZE", "256"))
+_processed_model_cache: "OrderedDict[Tuple[Any, ...], Tuple[Dict[str, Any], Tuple]]" = OrderedDict()
+_processed_model_cache_lock = threading.Lock()
+
+# Content the loader handed out itself (file cache, parsed text/JSON) and its business_rules
+# mapping, by id. Callers must treat it as read-only, so only these objects are memoized on
+# identity; a caller's own dict may be edited in place between calls. Pinned so an id cannot
+# be reused while listed.
+_OWNED_MODELS_SIZE = 128
+_owned_models: "OrderedDict[int, Any]" = OrderedDict()
+_owned_models_lock = threading.Lock()
+
+
+def _own(yaml_content: Any) -> Any:
+    """Record content produced by the loader (see _owned_models) and return it"""
+    owned = [yaml_content]
+    if isinstance(yaml_content, dict) and isinstance(yaml_content.get('business_rules'), dict):
+        owned.append(yaml_content['business_rules'])
+    with _owned_models_lock:
+        for obj in owned:
+            _owned_models[id(obj)] = obj
+            _owned_models.move_to_end(id(obj))
+        while len(_owned_models) > _OWNED_MODELS_SIZE:
+            _owned_models.popitem(last=False)
+    return yaml_content
+
+
+def _is_owned(obj: Any) -> bool:
+    """Whether obj was handed out by the loader (see _owned_models)"""
+    with _owned_models_lock:
+        return _owned_models.get(id(obj)) is obj
+
+
+class _BusinessRulesIndex:
+    """Lower-cased domain keywords and memoized query classifications for one business_rules mapping"""
+    
+    __slots__ = (
+        'business_rules', 'domain_keywords', 'query_types', 'keywords', 'automaton', 'query_matches',
+        '_core_collections',
+    )
+    
+    # Classifications remembered per mapping before the memo is reset
+    MAX_QUERY_TYPES = 1024
+    
+    def __init__(self, business_rules: Dict[str, Any]):
+        self.business_rules = business_rules
+        self.domain_keywords = [
+            (query_type, [keyword.lower() for keyword in keywords])
+            for query_type, keywords in business_rules.get('domain_keywords', {}).items()
+        ]
+        self.query_types: Dict[str, str] = {}
+        
+        # Every distinct lower-cased keyword, matched against a query in one pass
+        self.keywords = frozenset(keyword for _, keywords in self.domain_keywords for keyword in keywords)
+        self.automaton = None
+        if ahocorasick is not None and self.keywords - {''}:
+            self.automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                if keyword:
+                    self.automaton.add_word(keyword, keyword)
+            self.automaton.make_automaton()
+        self.query_matches: Dict[str, frozenset] = {}
+        self._core_collections: Optional[FrozenSet[str]] = None
+    
+    @property
+    def core_collections(self) -> FrozenSet[str]:
+        """Core collection names from business_rules['core_collections'], computed on first use"""
+        if self._core_collections is None:
+            core_collections = set()
+            business_core = self.business_rules.get('core_collections', {})
+            
+            for category in ['primary', 'bridge', 'dependent']:
+                for collection_def in business_core.get(category, []):
+                    # Include all primary and bridge collections as core
+                    if category in ['primary', 'bridge']:
+                        core_collections.add(collection_def['name'])
+                    # Include dependent collections only if critical or mandatory
+                    elif collection_def.get('mandatory', False) or collection_def.get('priority') == 'critical':
+                        core_collections.add(collection_def['name'])
+            
+            self._core_collections = frozenset(core_collections)
+        return self._core_collections
+    
+    def matched_keywords(self, query_lower: str) -> frozenset:
+        """Lower-cased domain keywords that occur as substrings of query_lower"""
+        matched = self.query_matches.get(query_lower)
+        if matched is None:
+            if self.automaton is not None:
+                matched = frozenset(keyword for _, keyword in self.automaton.iter(query_lower))
+                if '' in self.keywords:
+                    matched |= {''}
+            else:
+                matched = frozenset(keyword for keyword in self.keywords if keyword in query_lower)
+            if len(self.query_matches) >= self.MAX_QUERY_TYPES:
+                self.query_matches.clear()
+            self.query_matches[query_lower] = matched
+        return matched
+
+
+# id(business_rules) -> index for loader-owned mappings; each index pins its mapping so the id
+# cannot be reused while cached
+_RULES_INDEX_CACHE_SIZE = 64
+_rules_index_cache: "OrderedDict[int, _BusinessRulesIndex]" = OrderedDict()
+_rules_index_cache_lock = threading.Lock()
+
+
+def _get_rules_index(business_rules: Dict[str, Any]) -> _BusinessRulesIndex:
+    """Return the shared index for a business_rules mapping, building it on first use"""
+    if not _is_owned(business_rules):
+        # A caller's own mapping may be edited in place between calls, so it is indexed afresh
+        return _BusinessRulesIndex(business_rules)
+    
+    key = id(business_rules)
+    with _rules_index_cache_lock:
+        index = _rules_index_cache.get(key)
+        if index is not None and index.business_rules is business_rules:
+            _rules_index_cache.move_to_end(key)
+            return index
+        index = _BusinessRulesIndex(business_rules)
+        _rules_index_cache[key] = index
+        while len(_rules_index_cache) > _RULES_INDEX_CACHE_SIZE:
+            _rules_index_cache.popitem(last=False)
+        return index
+
 
+@dataclass(eq=False, repr=False, **DATACLASS_OPTIONS)
 class YAMLSemanticProcessor:
     """Generic YAML-driven semantic model processor - NO HARDCODING"""
     
-    def __init__(self, yaml_content: Dict[str, Any]):
-        self.yaml_content = yaml_content
-        self.business_rules = yaml_content.get('business_rules', {})
-        self.collections = yaml_content.get('collections', {})
-        
-    def get_core_collections_from_yaml(self) -> Set[str]:
-        """Extract core collections from YAML configuration"""
-        core_collections = set()
-        
-        # Get from business_rules section
-        business_core = self.business_rules.get('core_collections', {})
-        
-        for category in ['primary', 'bridge', 'dependent']:
-            for collection_def in business_core.get(category, []):
-                # Include all primary and bridge collections as core
-                if category in ['primary', 'bridge']:
-                    core_collections.add(collection_def['name'])
-                # Include dependent collections only if critical or mandatory
-                elif collection_def.get('mandatory', False) or collection_def.get('priority') == 'critical':
-                    core_collections.add(collection_def['name'])
-                    
-        return core_collections
+    yaml_content: Dict[str, Any]
+    # business_rules sub-sections, resolved once in __post_init__
+    business_rules: Dict[str, Any] = field(init=False)
+    collections: Dict[str, Any] = field(init=False)
+    domain_keywords: Dict[str, Any] = field(init=False)
+    _field_priorities: Dict[str, Any] = field(init=False)
+    _query_type_rules: Dict[str, Any] = field(init=False)
+    _join_patterns: Dict[str, Any] = field(init=False)
+    _rules_index: _BusinessRulesIndex = field(init=False)
+    
+    def __post_init__(self):
+        self.business_rules = self.yaml_content.get('business_rules', {})
+        self.collections = self.yaml_content.get('collections', {})
+        self.domain_keywords = self.business_rules.get('domain_keywords', {})
+        self._field_priorities = self.business_rules.get('field_priorities', {})
+        self._query_type_rules = self.business_rules.get('query_type_rules', {})
+        self._join_patterns = self.business_rules.get('join_patterns', {})
+        # Shared by every processor over the same loader-owned business_rules, across pipeline stages
+        self._rules_index = _get_rules_index(self.business_rules)
+        
+    def get_core_collections_from_yaml(self) -> FrozenSet[str]:
+        """Extract core collections from YAML configuration (computed once per business_rules)"""
+        return self._rules_index.core_collections
     
     def get_join_patterns_from_yaml(self) -> Dict[str, Any]:
         """Extract join patterns from YAML configuration"""
-        return self.business_rules.get('join_patterns', {})
+        return self._join_patterns
     
     def get_field_priorities_from_yaml(self, query_type: Optional[str] = None) -> Dict[str, Any]:
         """Extract field priorities based on query type"""
-        field_priorities = self.business_rules.get('field_priorities', {})
+        field_priorities = self._field_priorities
         
         if query_type and query_type in field_priorities:
             return field_priorities[query_type]
@@ -62,11 +217,21 @@ class YAMLSemanticProcessor:
     def classify_query_type(self, query_text: str) -> str:
         """Classify query type based on domain keywords"""
         query_lower = query_text.lower()
-        domain_keywords = self.business_rules.get('domain_keywords', {})
-        
+        query_types = self._rules_index.query_types
+        query_type = query_types.get(query_lower)
+        if query_type is None:
+            query_type = self._score_query_type(query_lower)
+            if len(query_types) >= _BusinessRulesIndex.MAX_QUERY_TYPES:
+                query_types.clear()
+            query_types[query_lower] = query_type
+        return query_type
+    
+    def _score_query_type(self, query_lower: str) -> str:
+        """Score each query type by how many of its domain keywords the query contains"""
+        matched = self._rules_index.matched_keywords(query_lower)
         scores = {}
-        for query_type, keywords in domain_keywords.items():
-            score = sum(1 for keyword in keywords if keyword.lower() in query_lower)
+        for query_type, keywords in self._rules_index.domain_keywords:
+            score = sum(1 for keyword in keywords if keyword in matched)
             if score > 0:
                 scores[query_type] = score
         
@@ -77,7 +242,7 @@ class YAMLSemanticProcessor:
     
     def get_query_specific_rules(self, query_text: str) -> Dict[str, Any]:
         """Determine query type and get specific rules - PURE YAML-DRIVEN"""
-        query_type_rules = self.business_rules.get('query_type_rules', {})
+        query_type_rules = self._query_type_rules
         
         # Classify by domain keywords defined in YAML
         classified_type = self.classify_query_type(query_text)
@@ -102,10 +267,16 @@ def load_semantic_model(yaml_input: Any) -> Dict[str, Any]:
         ValueError: If YAML cannot be loaded or is invalid
     """
     if isinstance(yaml_input, str):
-        # It's a file path - load the content
+        # It's a file path - load the content (re-parsed only when the file changes)
         try:
-            with open(yaml_input, 'r') as file:
-                yaml_content = yaml.safe_load(file)
+            stat = os.stat(yaml_input)
+            file_stamp = (stat.st_mtime_ns, stat.st_size)
+            cached = _semantic_model_cache.get(yaml_input)
+            if cached is not None and cached[0] == file_stamp:
+                return _own(cached[1])
+            
+            yaml_content = _own(_parse_semantic_model_file(yaml_input))
+            _semantic_model_cache[yaml_input] = (file_stamp, yaml_content)
         except Exception as e:
             raise ValueError(f"Error loading YAML file {yaml_input}: {e}")
     elif isinstance(yaml_input, dict):
@@ -117,6 +288,36 @@ def load_semantic_model(yaml_input: Any) -> Dict[str, Any]:
     return yaml_content
 
 
+def _parse_semantic_model_file(path: str) -> Any:
+    """Parse one semantic model file"""
+    # Binary stream: the loader detects the encoding and reads in chunks, so neither
+    # a decoded str nor a whole-file bytes copy is built first
+    with open(path, 'rb') as file:
+        return yaml.load(file, Loader=YAMLLoader)
+
+
+@functools.lru_cache(maxsize=32)
+def parse_semantic_model_text(text: str) -> Any:
+    """
+    Parse semantic model YAML text (e.g. retrieved from a vector DB)
+    
+    Identical texts are parsed only once; the result is shared between
+    callers and must be treated as read-only.
+    """
+    return _own(yaml.load(text, Loader=YAMLLoader))
+
+
+@functools.lru_cache(maxsize=32)
+def parse_semantic_model_json(data: Any) -> Any:
+    """
+    Decode a semantic model stored as JSON (str or bytes) alongside its YAML text
+    
+    Identical payloads are decoded only once; the result is shared between
+    callers and must be treated as read-only.
+    """
+    return _own(orjson.loads(data))
+
+
 def filter_relevant_collections(
     yaml_content: Dict[str, Any],
     user_query: str,
@@ -151,6 +352,10 @@ def filter_relevant_collections(
     all_collections = yaml_content.get('collections', {})
     scored_collections = []
     
+    # Loop invariants: the query's keyword signature and the threshold
+    signature = _query_signature(user_query)
+    relevance_threshold = query_rules.get('relevance_threshold', 0.7)
+    
     for collection_name, collection_data in all_collections.items():
         # Always include core collections with high score
         if collection_name in core_collections:
@@ -164,73 +369,123 @@ def filter_relevant_collections(
             
         # Score other collections based on relevance
         relevance_score = _calculate_collection_relevance(
-            collection_name, collection_data, user_query, processor
+            collection_name, collection_data, signature, processor, relevance_threshold
         )
         
-        relevance_threshold = query_rules.get('relevance_threshold', 0.7)
         if relevance_score >= relevance_threshold:
             scored_collections.append((collection_name, relevance_score, "RELEVANT"))
     
-    # Sort by score and limit
-    scored_collections.sort(key=lambda x: x[1], reverse=True)
-    selected_collections = [item[0] for item in scored_collections[:max_collections]]
+    # Top max_collections by score (partial sort; ties keep collection order like a stable sort)
+    top_collections = heapq.nlargest(max_collections, scored_collections, key=lambda x: x[1])
+    selected_collections = [item[0] for item in top_collections]
     
     logger.info(
         f"YAML-Based Collection Selection: {len(selected_collections)}/{len(all_collections)} collections"
     )
-    for name, score, reason in scored_collections[:max_collections]:
+    for name, score, reason in top_collections:
         logger.debug(f"   Selected {name} (score: {score:.2f}, reason: {reason})")
     
-    # Filter YAML content
-    filtered_yaml = yaml_content.copy()
-    filtered_yaml['collections'] = {
-        name: data for name, data in all_collections.items() 
-        if name in selected_collections
+    # Filter YAML content: share everything but the rebuilt 'collections' mapping
+    selected_names = set(selected_collections)
+    return {
+        **yaml_content,
+        'collections': {
+            name: data for name, data in all_collections.items()
+            if name in selected_names
+        },
     }
-    
-    return filtered_yaml
+
+
+class QuerySignature(NamedTuple):
+    """Query-derived keyword data shared by every relevance check for one query"""
+    lower: str
+    words: Tuple[str, ...]
+    long_words: Tuple[str, ...]
+    specific_terms: Tuple[str, ...]
+
+
+@functools.lru_cache(maxsize=512)
+def _query_signature(user_query: str) -> QuerySignature:
+    """Lower-case and tokenize a query once instead of once per collection/field"""
+    query_lower = user_query.lower()
+    words = tuple(query_lower.split())
+    long_words = tuple(word for word in words if len(word) > 3)
+    specific_terms = tuple(word for word in long_words if word not in ('details', 'information', 'data'))
+    return QuerySignature(query_lower, words, long_words, specific_terms)
+
+
+# Splits lower-cased names and descriptions into word tokens (customer_name -> customer, name)
+_TOKEN_SPLIT_RE = re.compile(r'[_\W]+')
+
+
+@functools.lru_cache(maxsize=8192)
+def _text_tokens(text: str) -> Tuple[str, FrozenSet[str]]:
+    """Lower-case a schema name or description once and tokenize it for exact-word lookups"""
+    text_lower = text.lower()
+    return text_lower, frozenset(_TOKEN_SPLIT_RE.split(text_lower))
+
+
+# Relevance weights for the YAML business_importance / query_frequency levels
+_IMPORTANCE_WEIGHTS = {'critical': 0.3, 'high': 0.2, 'normal': 0.1, 'low': 0.05}
+_FREQUENCY_WEIGHTS = {'very_high': 0.3, 'high': 0.2, 'medium': 0.1, 'low': 0.05}
 
 
 def _calculate_collection_relevance(
     collection_name: str,
     collection_data: Dict[str, Any],
-    user_query: str,
-    processor: YAMLSemanticProcessor
+    signature: QuerySignature,
+    processor: YAMLSemanticProcessor,
+    threshold: Optional[float] = None
 ) -> float:
     """
     Calculate collection relevance using YAML configuration - PURE YAML-DRIVEN
+    
+    Every component only adds to the score, so scoring stops as soon as the
+    1.0 cap is reached. With a threshold, it also stops once the remaining
+    components can no longer lift the score to it; the partial score
+    returned then is still below the threshold.
     """
     score = 0.0
-    query_lower = user_query.lower()
+    query_lower = signature.lower
     
     # Business importance from YAML
     business_importance = collection_data.get('business_importance', 'normal')
-    importance_weights = {'critical': 0.3, 'high': 0.2, 'normal': 0.1, 'low': 0.05}
-    score += importance_weights.get(business_importance, 0.1)
+    score += _IMPORTANCE_WEIGHTS.get(business_importance, 0.1)
     
     # Query frequency from YAML
     query_frequency = collection_data.get('query_frequency', 'medium')
-    frequency_weights = {'very_high': 0.3, 'high': 0.2, 'medium': 0.1, 'low': 0.05}
-    score += frequency_weights.get(query_frequency, 0.1)
+    score += _FREQUENCY_WEIGHTS.get(query_frequency, 0.1)
     
     # Domain-specific keyword matching from YAML - no hardcoded collection names
-    domain_keywords = processor.business_rules.get('domain_keywords', {})
+    domain_keywords = processor.domain_keywords
     collection_categories = collection_data.get('categories', [])
     
+    # Keywords with upper-case letters can never occur in the lower-cased query
+    matched = processor._rules_index.matched_keywords(query_lower)
     for category, keywords in domain_keywords.items():
-        if any(keyword in query_lower for keyword in keywords):
-            # Check if this collection belongs to this category (from YAML)
-            if category in collection_categories:
-                score += 0.4
+        # Check if this collection belongs to this category (from YAML) before scanning its keywords
+        if category in collection_categories and any(keyword in matched for keyword in keywords):
+            score += 0.4
+            if score >= 1.0:
+                return 1.0
+    
+    # Description and name can add at most 0.2 each
+    if threshold is not None and score + 0.2 + 0.2 < threshold:
+        return score
     
     # Description relevance (reduced weight to avoid false positives)
-    description = collection_data.get('description', '')
-    if any(keyword in description.lower() for keyword in query_lower.split() if len(keyword) > 3):
+    description_lower = _text_tokens(collection_data.get('description', ''))[0]
+    if any(keyword in description_lower for keyword in signature.long_words):
         score += 0.2
+        if score >= 1.0:
+            return 1.0
+    
+    if threshold is not None and score + 0.2 < threshold:
+        return score
     
     # Collection name relevance (more selective)
-    specific_terms = [word for word in query_lower.split() if len(word) > 3 and word not in ['details', 'information', 'data']]
-    if any(term in collection_name.lower() for term in specific_terms):
+    collection_name_lower = _text_tokens(collection_name)[0]
+    if any(term in collection_name_lower for term in signature.specific_terms):
         score += 0.2
         
     return min(score, 1.0)
@@ -261,8 +516,14 @@ def optimize_schema_for_query(
     query_type = processor.classify_query_type(user_query)
     field_priorities = processor.get_field_priorities_from_yaml(query_type)
     
-    optimized_yaml = yaml_content.copy()
-    collections = optimized_yaml.get('collections', {})
+    collections = yaml_content.get('collections', {})
+    # Copied on the first collection that actually changes; untouched collections stay shared
+    optimized_collections = None
+    
+    # Loop invariants: essential and high priority fields for this query type, and the query words
+    essential_fields = set(field_priorities.get('essential_fields', []))
+    high_priority_fields = set(field_priorities.get('high_priority_fields', []))
+    query_words = _query_signature(user_query).words
     
     for collection_name, collection_data in collections.items():
         fields = collection_data.get('fields', {})
@@ -270,10 +531,6 @@ def optimize_schema_for_query(
         if len(fields) <= max_fields:
             logger.debug(f"{collection_name}: No optimization needed ({len(fields)} fields <= {max_fields})")
             continue  # No optimization needed
-            
-        # Get essential and high priority fields for this query type
-        essential_fields = set(field_priorities.get('essential_fields', []))
-        high_priority_fields = set(field_priorities.get('high_priority_fields', []))
         
         # Always include essential fields
         selected_fields = {}
@@ -296,39 +553,43 @@ def optimize_schema_for_query(
             scored_fields = []
             
             for field_name, field_data in remaining_fields.items():
-                relevance_score = _calculate_field_relevance(field_name, field_data, user_query)
+                relevance_score = _calculate_field_relevance(field_name, field_data, query_words)
                 scored_fields.append((field_name, relevance_score))
             
-            # Sort by relevance and take top remaining fields
-            scored_fields.sort(key=lambda x: x[1], reverse=True)
-            for field_name, score in scored_fields[:remaining_slots]:
+            # Take the top remaining fields by relevance (partial sort, stable for ties)
+            for field_name, score in heapq.nlargest(remaining_slots, scored_fields, key=lambda x: x[1]):
                 selected_fields[field_name] = fields[field_name]
         
-        # Update collection with optimized fields
-        optimized_yaml['collections'][collection_name]['fields'] = selected_fields
+        # Update collection with optimized fields (copy so the caller's YAML is not mutated)
+        if optimized_collections is None:
+            optimized_collections = dict(collections)
+        optimized_collections[collection_name] = {**collection_data, 'fields': selected_fields}
         
         logger.info(f"{collection_name}: Optimized {len(fields)} → {len(selected_fields)} fields")
     
-    return optimized_yaml
+    if optimized_collections is None:
+        return yaml_content
+    return {**yaml_content, 'collections': optimized_collections}
 
 
 def _calculate_field_relevance(
     field_name: str,
     field_data: Dict[str, Any],
-    user_query: str
+    query_words: Tuple[str, ...]
 ) -> float:
-    """Calculate field relevance for YAML-driven optimization"""
+    """Calculate field relevance for YAML-driven optimization (query_words: the lower-cased query split once)"""
     score = 0.0
-    query_lower = user_query.lower()
-    field_name_lower = field_name.lower()
+    
+    # Whole-word token overlap implies a substring match; scan substrings only when there is none
+    field_name_lower, name_tokens = _text_tokens(field_name)
     
     # Field name relevance
-    if any(keyword in field_name_lower for keyword in query_lower.split()):
+    if not name_tokens.isdisjoint(query_words) or any(keyword in field_name_lower for keyword in query_words):
         score += 0.4
     
     # Description relevance
-    description = field_data.get('description', '').lower()
-    if any(keyword in description for keyword in query_lower.split()):
+    description, description_tokens = _text_tokens(field_data.get('description', ''))
+    if not description_tokens.isdisjoint(query_words) or any(keyword in description for keyword in query_words):
         score += 0.3
     
     # Data type preference (strings and dates often more useful)
@@ -357,10 +618,155 @@ def process_semantic_model(
         
     Returns:
         Tuple of (llm_format, verified_queries, custom_instructions, relationships, yaml_content, metrics)
+        
+    Results for content the loader returned (a file path input, or content from
+    load_semantic_model / parse_semantic_model_text / parse_semantic_model_json)
+    are memoized per content and query; the returned content is then shared
+    between callers and must be treated as read-only. Other dicts are processed
+    on every call.
     """
     # Load YAML content
     yaml_content = load_semantic_model(yaml_input)
     
+    owned = _is_owned(yaml_content)
+    if not owned or PROCESSED_MODEL_CACHE_SIZE <= 0:
+        return _process_loaded_semantic_model(yaml_content, user_query, optimize_fields, max_fields, owned)
+    
+    if ENABLE_YAML_DRIVEN_FILTERING and 'business_rules' in yaml_content and user_query:
+        # Every relevance check lower-cases the query, so case variants share an entry
+        cache_key = (id(yaml_content), user_query.lower(), optimize_fields, max_fields)
+    else:
+        # Nothing is filtered, so the output depends on the content alone: one entry for all queries
+        cache_key = (id(yaml_content),)
+    with _processed_model_cache_lock:
+        cached = _processed_model_cache.get(cache_key)
+        if cached is not None and cached[0] is yaml_content:
+            _processed_model_cache.move_to_end(cache_key)
+            return cached[1]
+    
+    result = _process_loaded_semantic_model(yaml_content, user_query, optimize_fields, max_fields, owned)
+    
+    with _processed_model_cache_lock:
+        _processed_model_cache[cache_key] = (yaml_content, result)
+        _processed_model_cache.move_to_end(cache_key)
+        while len(_processed_model_cache) > PROCESSED_MODEL_CACHE_SIZE:
+            _processed_model_cache.popitem(last=False)
+    return result
+
+
+# Formatted field entries keyed by the ordered field names; each entry pins the field info
+# objects it was built from and is reused only while every one of them is identical.
+# Only used for loader-owned content, whose field infos are never edited in place.
+_FIELD_ENTRIES_CACHE_SIZE = 512
+_field_entries_cache: "OrderedDict[Tuple[str, ...], Tuple[Tuple[Any, ...], str]]" = OrderedDict()
+_field_entries_cache_lock = threading.Lock()
+
+
+def _format_field_entries(fields: Dict[str, Any]) -> str:
+    """Schema entries for one collection's (possibly query-filtered) fields, reused across queries"""
+    cache_key = tuple(fields)
+    field_infos = tuple(fields.values())
+    with _field_entries_cache_lock:
+        cached = _field_entries_cache.get(cache_key)
+        if cached is not None and len(cached[0]) == len(field_infos) and all(
+            a is b for a, b in zip(cached[0], field_infos)
+        ):
+            _field_entries_cache.move_to_end(cache_key)
+            return cached[1]
+    
+    text = _build_field_entries(fields)
+    
+    with _field_entries_cache_lock:
+        _field_entries_cache[cache_key] = (field_infos, text)
+        _field_entries_cache.move_to_end(cache_key)
+        while len(_field_entries_cache) > _FIELD_ENTRIES_CACHE_SIZE:
+            _field_entries_cache.popitem(last=False)
+    return text
+
+
+def _build_field_entries(fields: Dict[str, Any]) -> str:
+    """Format fields as '(path, name: ..., type: ..., ...)' entries grouped by base path"""
+    # Group fields by their base path (headers, lines, documents, etc.): one pass builds
+    # (base_path, field, field_info) rows, and a stable sort on base_path groups them
+    # while keeping YAML order within each group
+    field_rows = []
+    for field_name, field_info in fields.items():
+        # Safety check: ensure field_info is a dictionary
+        if not isinstance(field_info, dict):
+            logger.warning(f"field_info for {field_name} is not a dict: {type(field_info)}")
+            field_info = {"nested_path": str(field_info), "data_type": "String", "description": ""}
+        
+        # Use nested_path if available, otherwise use the field name
+        path = field_info.get("nested_path", field_info.get("path", field_name))
+        base_path = path.split('.')[0] if '.' in path else 'root'
+        
+        field_entry = {
+            "name": field_name,
+            "path": path,
+            "type": field_info.get("data_type", field_info.get("type", "Unknown")),
+            "description": field_info.get("description", "")
+        }
+        field_rows.append((base_path, field_entry, field_info))
+    field_rows.sort(key=itemgetter(0))
+    
+    # Format grouped fields
+    entries = []
+    for base_path, field, field_info in field_rows:
+        # Extract sample values from the YAML structure
+        description = field["description"]
+        sample_values_list = field_info.get("sample_values", [])
+        sample_values = ""
+        
+        # Handle sample values from YAML with quote safety
+        if sample_values_list and isinstance(sample_values_list, list):
+            # Ensure all sample values are properly quoted and escaped
+            safe_samples = []
+            for v in sample_values_list[:3]:
+                str_v = str(v).replace('"', "'")  # Replace double quotes with single quotes to avoid JSON issues
+                safe_samples.append(str_v)
+            sample_values = f"Value examples: {', '.join(safe_samples)}..."
+        elif "sample values:" in description.lower():
+            # Fallback for legacy format
+            parts = description.split("sample values:")
+            if len(parts) > 1:
+                safe_sample_text = parts[1].strip()[:100].replace('"', "'")  # Replace quotes
+                sample_values = f"Value examples: {safe_sample_text}..."
+                description = parts[0].strip()
+        
+        parts = []
+        try:
+            parts.append(f"{field['path']}")
+            parts.append(f"name: {field['name']}")
+            parts.append(f"type: {field['type']}")
+            if description and description != "Data field":
+                parts.append(description)
+            if sample_values:
+                parts.append(sample_values)
+            
+            entry = "(" + ", ".join(parts) + ")"
+            entries.append(entry)
+        except Exception as e:
+            logger.error(f"Error processing field {field['name']}: {e}")
+            # Add a safe fallback entry
+            safe_entry = f"({field['path']}, name: {field['name']}, type: {field['type']})"
+            entries.append(safe_entry)
+    
+    return ",\n".join(entries)
+
+
+def _process_loaded_semantic_model(
+    yaml_content: Dict[str, Any],
+    user_query: Optional[str],
+    optimize_fields: bool,
+    max_fields: int,
+    owned: bool
+) -> Tuple[str, str, str, str, Dict[str, Any], str]:
+    """
+    Build the process_semantic_model result for already-loaded YAML content
+    
+    owned: the content came from the loader (read-only), so formatted field
+    entries cached from it may be reused
+    """
     # Check if YAML has business_rules section (indicates YAML-driven support)
     has_business_rules = 'business_rules' in yaml_content
     
@@ -388,20 +794,22 @@ def process_semantic_model(
     if not collections:
         raise ValueError("No collections found in the semantic model YAML content.")
     
-    llm_format = ""
+    # The first collection backs the query/instruction fallbacks below
+    first_collection_name, first_collection = next(iter(collections.items()))
+    
+    # Schema text pieces, joined once after the collection loop
+    llm_parts: List[str] = []
     
     # Process verified queries from YAML - check both root level and collection level
     queries = yaml_content.get("verified_queries", [])
     
     # If no queries at root level, check the first collection for verified_queries
-    if not queries and collections:
-        first_collection = next(iter(collections.values()))
-        if isinstance(first_collection, dict):
-            queries = first_collection.get("verified_queries", [])
+    if not queries and isinstance(first_collection, dict):
+        queries = first_collection.get("verified_queries", [])
     
-    verified_queries = "Queries:\n"
+    query_parts = ["Queries:\n"]
     if not queries:
-        verified_queries += "# No predefined queries in semantic model\n"
+        query_parts.append("# No predefined queries in semantic model\n")
     else:
         for query in queries:
             if isinstance(query, dict):
@@ -409,24 +817,25 @@ def process_semantic_model(
                 name = query.get('name', 'Unknown')
                 description = query.get('question', query.get('description', 'Unknown'))
                 mongodb_query = query.get('mongodb_query', query.get('query', 'No query provided'))
-                verified_queries += f"- Name: {name}\n"
-                verified_queries += f"  Question: {description}\n"
-                verified_queries += f"  MongoDB Query: {mongodb_query}\n\n"
+                query_parts.append(
+                    f"- Name: {name}\n"
+                    f"  Question: {description}\n"
+                    f"  MongoDB Query: {mongodb_query}\n\n"
+                )
             elif isinstance(query, str):
-                verified_queries += f"- {query}\n"
+                query_parts.append(f"- {query}\n")
+    verified_queries = "".join(query_parts)
     
     # Process custom instructions - check both root level and collection level
     custom_instructions = yaml_content.get("custom_instructions", "")
     
     # If no custom instructions at root level, check the first collection
-    if not custom_instructions and collections:
-        first_collection = next(iter(collections.values()))
-        if isinstance(first_collection, dict):
-            collection_instructions = first_collection.get("custom_instructions", [])
-            if isinstance(collection_instructions, list):
-                custom_instructions = "\n".join(collection_instructions)
-            elif isinstance(collection_instructions, str):
-                custom_instructions = collection_instructions
+    if not custom_instructions and isinstance(first_collection, dict):
+        collection_instructions = first_collection.get("custom_instructions", [])
+        if isinstance(collection_instructions, list):
+            custom_instructions = "\n".join(collection_instructions)
+        elif isinstance(collection_instructions, str):
+            custom_instructions = collection_instructions
     
     # Extract relationships (equivalent to fk_str for MongoDB)
     relationships = yaml_content.get("relationships", [])
@@ -520,98 +929,30 @@ def process_semantic_model(
             fields = {}
         
         # Build collection description - use collection_info.database (from root level)
-        llm_format += f"# MongoDB Collection: {collection_name}\n"
-        llm_format += f"Database: {collection_info.get('database', 'unknown')}\n"
-        llm_format += f"Business Flow: {collection_info.get('business_flow', 'unknown')}\n\n"
+        llm_parts.append(
+            f"# MongoDB Collection: {collection_name}\n"
+            f"Database: {collection_info.get('database', 'unknown')}\n"
+            f"Business Flow: {collection_info.get('business_flow', 'unknown')}\n\n"
+        )
         
         # Build field structure grouped by path type
-        llm_format += f"## Collection: {collection_name}\n[\n"
-        
-        # Group fields by their base path (headers, lines, documents, etc.)
-        path_groups = {}
-        for field_name, field_info in fields.items():
-            # Safety check: ensure field_info is a dictionary
-            if not isinstance(field_info, dict):
-                logger.warning(f"field_info for {field_name} is not a dict: {type(field_info)}")
-                field_info = {"nested_path": str(field_info), "data_type": "String", "description": ""}
-            
-            # Use nested_path if available, otherwise use the field name
-            path = field_info.get("nested_path", field_info.get("path", field_name))
-            base_path = path.split('.')[0] if '.' in path else 'root'
-            
-            if base_path not in path_groups:
-                path_groups[base_path] = []
-            
-            field_entry = {
-                "name": field_name,
-                "path": path,
-                "type": field_info.get("data_type", field_info.get("type", "Unknown")),
-                "description": field_info.get("description", "")
-            }
-            path_groups[base_path].append(field_entry)
-        
-        # Format grouped fields
-        entries = []
-        for base_path, fields_list in sorted(path_groups.items()):
-            for field in fields_list:
-                # Get field information from the original field_info
-                field_name = field["name"]
-                field_info = fields.get(field_name, {})
-                
-                # Extract sample values from the YAML structure
-                description = field["description"]
-                sample_values_list = field_info.get("sample_values", [])
-                sample_values = ""
-                
-                # Handle sample values from YAML with quote safety
-                if sample_values_list and isinstance(sample_values_list, list):
-                    # Ensure all sample values are properly quoted and escaped
-                    safe_samples = []
-                    for v in sample_values_list[:3]:
-                        str_v = str(v).replace('"', "'")  # Replace double quotes with single quotes to avoid JSON issues
-                        safe_samples.append(str_v)
-                    sample_values = f"Value examples: {', '.join(safe_samples)}..."
-                elif "sample values:" in description.lower():
-                    # Fallback for legacy format
-                    parts = description.split("sample values:")
-                    if len(parts) > 1:
-                        safe_sample_text = parts[1].strip()[:100].replace('"', "'")  # Replace quotes
-                        sample_values = f"Value examples: {safe_sample_text}..."
-                        description = parts[0].strip()
-                
-                parts = []
-                try:
-                    parts.append(f"{field['path']}")
-                    parts.append(f"name: {field['name']}")
-                    parts.append(f"type: {field['type']}")
-                    if description and description != "Data field":
-                        parts.append(description)
-                    if sample_values:
-                        parts.append(sample_values)
-                    
-                    entry = "(" + ", ".join(parts) + ")"
-                    entries.append(entry)
-                except Exception as e:
-                    logger.error(f"Error processing field {field['name']}: {e}")
-                    # Add a safe fallback entry
-                    safe_entry = f"({field['path']}, name: {field['name']}, type: {field['type']})"
-                    entries.append(safe_entry)
-        
-        llm_format += ",\n".join(entries) + "\n]\n\n"
+        llm_parts.append(f"## Collection: {collection_name}\n[\n")
+        
+        llm_parts.append(_format_field_entries(fields) if owned else _build_field_entries(fields))
+        llm_parts.append("\n]\n\n")
+    
+    llm_format = "".join(llm_parts)
     
     # Use custom instructions from YAML if available, otherwise provide generic fallback
     if not custom_instructions:
         # Extract actual values from YAML instead of hardcoding
-        first_collection_name = list(collections.keys())[0] if collections else 'Unknown'
         database_name = collection_info.get('database', 'Unknown')
         business_flow_name = collection_info.get('business_flow', 'Unknown')
         
         # Try to get document count from first collection
         doc_count = 'Unknown'
-        if collections:
-            first_collection_data = list(collections.values())[0]
-            if isinstance(first_collection_data, dict):
-                doc_count = first_collection_data.get('metadata', {}).get('document_count', 'Unknown')
+        if isinstance(first_collection, dict):
+            doc_count = first_collection.get('metadata', {}).get('document_count', 'Unknown')
         
         custom_instructions = f"""
 MongoDB Semantic Model Instructions:
@@ -7,34 +7,56 @@ Provides both MCP protocol and REST API endpoints
 """
 import sys
 import os
+from importlib.util import find_spec
+
+# Add parent directory to path (once, even if this module is re-imported)
+_PARENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PARENT_DIR not in sys.path:
+    sys.path.insert(0, _PARENT_DIR)
+
+
+def _module_available(name: str) -> bool:
+    """Check that a module can be found without executing its body"""
+    try:
+        return find_spec(name) is not None
+    except (ImportError, ValueError):
+        # A missing parent package raises instead of returning None
+        return False
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Try to import full structured_agent_server first (for complete application)
-# Fall back to standalone API if not available (for distribution package)
-try:
-    from scripts.servers.structured_agent_server import app
-    print("✅ Using full structured_agent_server with all agents")
-except ImportError:
+# Fall back to standalone API if not available (for distribution package).
+# find_spec checks first so an absent server does not cost a failed import chain.
+app = None
+if _module_available("scripts.servers.structured_agent_server"):
+    try:
+        from scripts.servers.structured_agent_server import app
+        print("✅ Using full structured_agent_server with all agents")
+    except ImportError:
+        app = None
+
+if app is None and _module_available("mongodb_agent.api"):
     # Use standalone MongoDB Agent API
     try:
         from mongodb_agent.api import app
         print("✅ Using standalone MongoDB Agent API")
     except ImportError:
-        # Final fallback: minimal server
-        from fastapi import FastAPI
-        
-        app = FastAPI(
-            title="MongoDB Agent API",
-            description="Natural Language to MongoDB Query Converter",
-            version="1.0.0"
-        )
-        
-        @app.get("/health")
-        def health_check():
-            return {"status": "healthy", "service": "mongodb_agent"}
-        
-        print("⚠️ Using minimal fallback server")
+        app = None
+
+if app is None:
+    # Final fallback: minimal server
+    from fastapi import FastAPI
+    
+    app = FastAPI(
+        title="MongoDB Agent API",
+        description="Natural Language to MongoDB Query Converter",
+        version="1.0.0"
+    )
+    
+    @app.get("/health")
+    def health_check():
+        return {"status": "healthy", "service": "mongodb_agent"}
+    
+    print("⚠️ Using minimal fallback server")
 
 __all__ = ["app"]
@@ -6,5 +6,6 @@
 from mongodb_agent.services.llm import get_llm
 from mongodb_agent.services.vector_db import get_vector_client
 from mongodb_agent.services.mcp_client import get_mcp_client
+from mongodb_agent.services.registry import close_all
 
-__all__ = ["get_llm", "get_vector_client", "get_mcp_client"]
+__all__ = ["get_llm", "get_vector_client", "get_mcp_client", "close_all"]
@@ -11,24 +11,122 @@ Handles:
 - Error handling
 """
 
+import functools
 import logging
+import re
+import warnings
+from datetime import datetime
 from typing import Dict, Any, Optional
 import json
 
+import orjson
+
 from mongodb_agent.config import Config
+from mongodb_agent.services.registry import get_shared_instance
 
 logger = logging.getLogger(__name__)
 
+_BANNER = "=" * 80
+
+# ISODate("...") literals in LLM-generated pipelines, swapped for placeholders before JSON parsing
+_ISODATE_RE = re.compile(r'ISODate\("([^"]+)"\)')
+
+# MongoDB Extended JSON wrappers that only bson.json_util decodes ({"$date": ...}, {"$oid": ...}, ...)
+_EXTENDED_JSON_MARKERS = (
+    '"$date"', '"$oid"', '"$numberLong"', '"$numberInt"', '"$numberDouble"', '"$numberDecimal"',
+    '"$binary"', '"$uuid"', '"$timestamp"', '"$regularExpression"', '"$minKey"', '"$maxKey"',
+)
+
 # PyMongo is optional - only imported if direct connection is used
 try:
     from pymongo import MongoClient
     from pymongo.errors import PyMongoError
+    from pymongo.compression_support import validate_compressors
+    from bson import json_util
     PYMONGO_AVAILABLE = True
 except ImportError:
+    json_util = None
     PYMONGO_AVAILABLE = False
     logger.warning("PyMongo not installed. Direct MongoDB connection unavailable.")
 
 
+def _installed_compressors() -> str:
+    """Default wire compressors (zstd, snappy) whose modules this pymongo can load"""
+    # validate_compressors drops unavailable ones, warning for each - expected here.
+    # zlib is left out: it is always installed and would turn compression on everywhere.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return ",".join(validate_compressors(None, "zstd,snappy"))
+
+
+def _replace_dates(pipeline: Any, isodate_values: Dict[str, str]) -> Any:
+    """Replace ISODate placeholders in a freshly parsed pipeline with datetime objects, in place"""
+    if isinstance(pipeline, str):
+        if pipeline in isodate_values:
+            return datetime.fromisoformat(isodate_values[pipeline].replace('Z', '+00:00'))
+        return pipeline
+    
+    # Iterative walk: only the placeholder leaves are reassigned, no container is rebuilt.
+    # JSON decoders only produce exact dict/list/str, so exact type checks are safe here.
+    stack = [pipeline]
+    while stack:
+        node = stack.pop()
+        items = node.items() if type(node) is dict else enumerate(node)
+        for key, value in items:
+            value_type = type(value)
+            if value_type is str:
+                if value in isodate_values:
+                    node[key] = datetime.fromisoformat(isodate_values[value].replace('Z', '+00:00'))
+            elif value_type is dict or value_type is list:
+                stack.append(value)
+    return pipeline
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_pipeline(pipeline_str: str) -> Any:
+    """
+    Parse an aggregation pipeline string (bare JSON or db.collection.aggregate([...]))
+    
+    Results are memoized per string and shared between callers - treat them as read-only.
+    """
+    # Extract pipeline from db.collection.aggregate([...]) format
+    if "aggregate(" in pipeline_str:
+        start = pipeline_str.find("[")
+        end = pipeline_str.rfind("]") + 1
+        if start != -1 and end > start:
+            pipeline_str = pipeline_str[start:end]
+    
+    # Convert ISODate("...") to temporary placeholders
+    isodate_values = {}
+    def store_isodate(match):
+        date_str = match.group(1)
+        key = f"__ISODATE_{len(isodate_values)}__"
+        isodate_values[key] = date_str
+        return f'"{key}"'
+    
+    pipeline_str = _ISODATE_RE.sub(store_isodate, pipeline_str)
+    
+    try:
+        if json_util is not None and any(marker in pipeline_str for marker in _EXTENDED_JSON_MARKERS):
+            # Extended JSON needs bson's object hook; plain pipelines keep the faster orjson path
+            pipeline = json_util.loads(pipeline_str)
+        else:
+            try:
+                pipeline = orjson.loads(pipeline_str)
+            except orjson.JSONDecodeError:
+                # orjson rejects NaN and >64-bit ints; json accepts them or raises the usual error
+                pipeline = json.loads(pipeline_str)
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON in aggregation pipeline: {e}")
+        logger.error(f"Pipeline string: {pipeline_str[:500]}")
+        raise ValueError(f"Invalid JSON in aggregation pipeline: {e}")
+    
+    # Replace placeholders with datetime objects (nothing to walk without ISODate literals)
+    if isodate_values:
+        pipeline = _replace_dates(pipeline, isodate_values)
+    return pipeline
+
+
 class DirectMongoClient:
     """Direct MongoDB client using PyMongo"""
     
@@ -41,8 +139,19 @@ class DirectMongoClient:
         
         self.uri = config.mongodb_uri
         self.database_name = config.mongodb_database
+        self.max_pool_size = config.mongodb_max_pool_size
+        self.server_selection_timeout_ms = config.mongodb_server_selection_timeout_ms
+        self.socket_timeout_ms = config.mongodb_socket_timeout_ms
+        self.compressors = (
+            _installed_compressors() if config.mongodb_compressors is None else config.mongodb_compressors
+        )
+        self.eager_connect = config.mongodb_eager_connect
         self.client = None
         self.db = None
+        # Set by close(); the service registry then stops handing this client out
+        self.closed = False
+        # Collection handles by name, so each query skips Database.__getitem__
+        self._collections: Dict[str, Any] = {}
         
         if not self.uri:
             raise ValueError("MONGODB_URI is required for direct connection")
@@ -55,11 +164,26 @@ class DirectMongoClient:
     def _connect(self):
         """Establish MongoDB connection"""
         try:
-            self.client = MongoClient(self.uri)
+            options = {
+                "maxPoolSize": self.max_pool_size,
+                "minPoolSize": 0,
+                "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+                "socketTimeoutMS": self.socket_timeout_ms,
+                "retryReads": True,
+            }
+            if self.compressors:
+                # Negotiated with the server; wire traffic is compressed only if both sides support it
+                options["compressors"] = self.compressors
+            # MongoClient connects in the background - the first query waits for server selection
+            self.client = MongoClient(self.uri, **options)
             self.db = self.client[self.database_name]
-            # Test connection
-            self.client.admin.command('ping')
-            logger.info(f"✅ Connected to MongoDB: {self.database_name}")
+            self._collections.clear()
+            if self.eager_connect:
+                # Test connection
+                self.client.admin.command('ping')
+                logger.info(f"✅ Connected to MongoDB: {self.database_name}")
+            else:
+                logger.info(f"✅ MongoDB client configured: {self.database_name} (connects on first query)")
         except Exception as e:
             logger.error(f"❌ Failed to connect to MongoDB: {e}")
             raise
@@ -67,7 +191,9 @@ class DirectMongoClient:
     def execute_query(
         self,
         aggregation_pipeline: str,
-        db_details: Dict[str, Any]
+        db_details: Dict[str, Any],
+        batch_size: Optional[int] = None,
+        stream: bool = False
     ) -> Dict[str, Any]:
         """
         Execute MongoDB aggregation pipeline directly
@@ -75,6 +201,9 @@ class DirectMongoClient:
         Args:
             aggregation_pipeline: MongoDB aggregation pipeline (JSON string or list)
             db_details: Database details (must include 'collection' name)
+            batch_size: Documents per cursor batch (default: server default)
+            stream: Return the open cursor as data instead of a list, so callers can
+                consume results batch by batch without holding the full result set
         
         Returns:
             Dict with keys: success, data, error
@@ -96,51 +225,15 @@ class DirectMongoClient:
                     "error": error_msg
                 }
             
-            collection = self.db[collection_name]
+            collection = self._collections.get(collection_name)
+            if collection is None:
+                collection = self._collections[collection_name] = self.db[collection_name]
             
-            # Parse pipeline
+            # Parse pipeline (identical strings are parsed once; the stages are shared, read-only)
             if isinstance(aggregation_pipeline, str):
-                import re
-                from datetime import datetime
-                
-                pipeline_str = aggregation_pipeline.strip()
-                
-                # Extract pipeline from db.collection.aggregate([...]) format
-                if "aggregate(" in pipeline_str:
-                    start = pipeline_str.find("[")
-                    end = pipeline_str.rfind("]") + 1
-                    if start != -1 and end > start:
-                        pipeline_str = pipeline_str[start:end]
-                
-                # Convert ISODate("...") to temporary placeholders
-                isodate_values = {}
-                def store_isodate(match):
-                    date_str = match.group(1)
-                    key = f"__ISODATE_{len(isodate_values)}__"
-                    isodate_values[key] = date_str
-                    return f'"{key}"'
-                
-                pipeline_str = re.sub(r'ISODate\("([^"]+)"\)', store_isodate, pipeline_str)
-                
-                try:
-                    pipeline = json.loads(pipeline_str)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Invalid JSON in aggregation pipeline: {e}")
-                    logger.error(f"Pipeline string: {pipeline_str[:500]}")
-                    raise ValueError(f"Invalid JSON in aggregation pipeline: {e}")
-                
-                # Replace placeholders with datetime objects
-                def replace_dates(obj):
-                    if isinstance(obj, dict):
-                        return {k: replace_dates(v) for k, v in obj.items()}
-                    elif isinstance(obj, list):
-                        return [replace_dates(item) for item in obj]
-                    elif isinstance(obj, str) and obj in isodate_values:
-                        date_str = isodate_values[obj]
-                        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                    return obj
-                
-                pipeline = replace_dates(pipeline)
+                pipeline = _parse_pipeline(aggregation_pipeline.strip())
+                if isinstance(pipeline, list):
+                    pipeline = list(pipeline)
             else:
                 pipeline = aggregation_pipeline
             
@@ -153,23 +246,38 @@ class DirectMongoClient:
                     "error": error_msg
                 }
             
-            logger.info("="*80)
-            logger.info("📤 DIRECT MONGODB QUERY")
-            logger.info(f"Database: {self.database_name}")
-            logger.info(f"Collection: {collection_name}")
-            logger.info(f"Pipeline: {str(pipeline)[:1000]}")  # Use str() instead of json.dumps()
-            logger.info("="*80)
+            # str(pipeline) and the result summaries are only built when INFO is on
+            info_enabled = logger.isEnabledFor(logging.INFO)
+            if info_enabled:
+                # One record per block: a single pass through the handler chain
+                logger.info("\n".join((
+                    _BANNER,
+                    "📤 DIRECT MONGODB QUERY",
+                    f"Database: {self.database_name}",
+                    f"Collection: {collection_name}",
+                    f"Pipeline: {str(pipeline)[:1000]}",  # Use str() instead of json.dumps()
+                    _BANNER,
+                )))
             
             # Execute aggregation
-            result = list(collection.aggregate(pipeline))
+            aggregate_options = {} if batch_size is None else {"batchSize": batch_size}
+            cursor = collection.aggregate(pipeline, **aggregate_options)
+            if stream:
+                if info_enabled:
+                    logger.info("📥 MONGODB RESPONSE: streaming cursor (batch size: %s)", batch_size or "default")
+                return {
+                    "success": True,
+                    "data": cursor,
+                    "error": None
+                }
+            result = list(cursor)
             
-            logger.info("="*80)
-            logger.info("📥 MONGODB RESPONSE")
-            logger.info(f"Success: True")
-            logger.info(f"Documents Returned: {len(result)}")
-            if len(result) > 0:
-                logger.info(f"Sample Document Keys: {list(result[0].keys()) if result else []}")
-            logger.info("="*80)
+            if info_enabled:
+                lines = [_BANNER, "📥 MONGODB RESPONSE", "Success: True", f"Documents Returned: {len(result)}"]
+                if len(result) > 0:
+                    lines.append(f"Sample Document Keys: {list(result[0].keys())}")
+                lines.append(_BANNER)
+                logger.info("\n".join(lines))
             
             return {
                 "success": True,
@@ -198,11 +306,12 @@ class DirectMongoClient:
     
     def close(self):
         """Close MongoDB connection"""
+        self.closed = True
         if self.client:
             self.client.close()
             logger.info("MongoDB connection closed")
 
 
 def get_direct_client(config: Config) -> DirectMongoClient:
-    """Get direct MongoDB client instance"""
-    return DirectMongoClient(config)
+    """Get the shared direct MongoDB client instance for this config"""
+    return get_shared_instance("direct_client", config, lambda: DirectMongoClient(config))
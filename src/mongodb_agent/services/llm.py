@@ -13,10 +13,11 @@ Provides a unified interface for different LLM providers:
 
 import logging
 import os
-import requests
 from typing import Optional
 
 from mongodb_agent.config import Config
+from mongodb_agent.services.registry import get_shared_instance
+from mongodb_agent.utils.token_cache import get_shared_token_cache
 
 # Global LLM instance (will be set by build_graph)
 llm = None
@@ -27,6 +28,8 @@ def get_cisco_oauth_token() -> str:
     """
     Get OAuth token for Cisco chat-ai.cisco.com using CLIENT_ID/CLIENT_SECRET
     
+    Tokens are cached per (OAUTH_URL, CLIENT_ID) until shortly before they expire.
+    
     Returns:
         OAuth access token
     """
@@ -38,18 +41,10 @@ def get_cisco_oauth_token() -> str:
     if not client_id or not client_secret:
         raise ValueError("CLIENT_ID and CLIENT_SECRET must be set for Cisco OAuth")
     
-    logger.info(f"Fetching OAuth token from: {oauth_url}")
-    
-    data = {
-        "grant_type": "client_credentials",
-        "client_id": client_id,
-        "client_secret": client_secret,
-    }
+    token_cache = get_shared_token_cache(oauth_url, client_id, client_secret, timeout=30)
     
     try:
-        response = requests.post(oauth_url, data=data, timeout=30)
-        response.raise_for_status()
-        token = response.json()["access_token"]
+        token = token_cache.get_token()
         logger.info("✅ OAuth token obtained successfully")
         return token
     except Exception as e:
@@ -61,6 +56,9 @@ def get_llm(config: Config):
     """
     Get LLM instance based on configuration
     
+    The instance is shared by every caller with the same config. An Azure LLM
+    authenticated via OAuth is rebuilt once the cached token has been refreshed.
+    
     Args:
         config: Configuration object
     
@@ -69,21 +67,29 @@ def get_llm(config: Config):
     """
     global llm
     
+    api_key = None
     if config.llm_provider == "azure":
-        from langchain_openai import AzureChatOpenAI
-        
-        logger.info(f"Initializing Azure OpenAI: {config.azure_deployment_name}")
-        
         # Get OAuth token if using Cisco endpoint
         api_key = config.azure_api_key
         if not api_key or api_key == "will-be-obtained-via-oauth":
             logger.info("Getting OAuth token for Cisco chat-ai.cisco.com...")
             api_key = get_cisco_oauth_token()
+    
+    llm = get_shared_instance("llm", config, lambda: _create_llm(config, api_key), version=api_key)
+    return llm
+
+
+def _create_llm(config: Config, api_key: Optional[str]):
+    """Build a new LLM instance (api_key is the resolved Azure key or OAuth token)"""
+    if config.llm_provider == "azure":
+        from langchain_openai import AzureChatOpenAI
+        
+        logger.info(f"Initializing Azure OpenAI: {config.azure_deployment_name}")
         
         # Get APP_KEY for Cisco chat-ai.cisco.com
         app_key = os.getenv("APP_KEY", "mongodb-agent")
         
-        llm = AzureChatOpenAI(
+        return AzureChatOpenAI(
             azure_endpoint=config.azure_endpoint,
             api_key=api_key,
             deployment_name=config.azure_deployment_name,
@@ -97,7 +103,7 @@ def get_llm(config: Config):
         from langchain_openai import ChatOpenAI
         
         logger.info(f"Initializing OpenAI: {config.openai_model}")
-        llm = ChatOpenAI(
+        return ChatOpenAI(
             api_key=config.openai_api_key,
             model=config.openai_model,
             temperature=0,
@@ -108,12 +114,10 @@ def get_llm(config: Config):
         from langchain_anthropic import ChatAnthropic
         
         logger.info("Initializing Anthropic Claude")
-        llm = ChatAnthropic(
+        return ChatAnthropic(
             model="claude-3-5-sonnet-20241022",
             temperature=0,
         )
     
     else:
         raise ValueError(f"Unsupported LLM provider: {config.llm_provider}")
-    
-    return llm
@@ -10,15 +10,57 @@ Handles:
 - Connection pooling
 """
 
+import json
 import logging
-import requests
+import uuid
 from typing import Dict, Any, Optional
 
+import orjson
+
 from mongodb_agent.config import Config
+from mongodb_agent.services.registry import get_shared_instance
+from mongodb_agent.utils.http import create_session
 from mongodb_agent.utils.token_cache import TokenCache
 
 logger = logging.getLogger(__name__)
 
+_ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+_BANNER = "=" * 80
+
+
+def _format_json(obj: Any) -> str:
+    """Pretty-print a payload or response for the logs (non-JSON values become strings)"""
+    try:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS).decode()
+    except orjson.JSONEncodeError:
+        # e.g. integers beyond 64 bits - the stdlib encoder handles anything str() can
+        return json.dumps(obj, indent=2, default=str)
+
+
+def _format_json_preview(result: Any, limit: int) -> str:
+    """
+    Return _format_json(result)[:limit] without pretty-printing every document
+    
+    Only the leading documents of result["result"] are formatted, doubling the count
+    until the text before the cut point is known to match the full output.
+    """
+    documents = result.get("result") if isinstance(result, dict) else None
+    if not isinstance(documents, list):
+        return _format_json(result)[:limit]
+    
+    # A marker placed after the included documents shows where the prefix ends
+    marker = f"mcp-preview-{uuid.uuid4().hex}"
+    count = 8
+    while count < len(documents):
+        text = _format_json({**result, "result": documents[:count] + [marker]})
+        end = text.find(f'"{marker}"')
+        if end >= limit:
+            return text[:limit]
+        count *= 2
+    
+    return _format_json(result)[:limit]
+
 
 class MCPClient:
     """MongoDB MCP protocol client"""
@@ -26,6 +68,10 @@ class MCPClient:
     def __init__(self, config: Config):
         self.endpoint = config.mongodb_mcp_endpoint
         self.token_cache = None
+        # Set by close(); the service registry then stops handing this client out
+        self.closed = False
+        # Pooled keep-alive connections: no new TCP/TLS handshake per query
+        self._session = create_session()
         
         if config.enable_token_cache and config.mongodb_oauth_token_url:
             logger.info(f"Initializing token cache (TTL: {config.token_cache_ttl}s)")
@@ -81,53 +127,63 @@ class MCPClient:
                 }
             }
             
-            logger.info(f"Executing MCP query: {aggregation_pipeline[:100]}...")
+            # Request/response logging formats whole payloads - skip all of it unless INFO is on
+            info_enabled = logger.isEnabledFor(logging.INFO)
             
-            # Log MCP Request
-            logger.info("="*80)
-            logger.info("📤 MCP REQUEST")
-            logger.info(f"Endpoint: {self.endpoint}")
-            logger.info(f"Database: {payload['params']['dbName']}")
-            logger.info(f"Schema: {payload['params']['userName']}")
-            logger.info(f"Application: {payload['params']['applicationName']}")
-            logger.info(f"Query: {aggregation_pipeline}")
-            logger.info("")
-            logger.info("Complete MCP Payload:")
-            import json
-            logger.info(json.dumps(payload, indent=2))
-            logger.info("="*80)
+            if info_enabled:
+                logger.info(f"Executing MCP query: {aggregation_pipeline[:100]}...")
+                
+                # Log MCP Request (one record per block: a single pass through the handler chain)
+                logger.info("\n".join((
+                    _BANNER,
+                    "📤 MCP REQUEST",
+                    f"Endpoint: {self.endpoint}",
+                    f"Database: {payload['params']['dbName']}",
+                    f"Schema: {payload['params']['userName']}",
+                    f"Application: {payload['params']['applicationName']}",
+                    f"Query: {aggregation_pipeline}",
+                    "",
+                    "Complete MCP Payload:",
+                    _format_json(payload),
+                    _BANNER,
+                )))
             
-            # Execute request
-            response = requests.post(
+            # Execute request (serialized once with orjson; Content-Type is already set above)
+            response = self._session.post(
                 self.endpoint,
-                json=payload,
+                data=orjson.dumps(payload),
                 headers=headers,
                 timeout=30
             )
             
-            # Log MCP Response
-            logger.info("="*80)
-            logger.info("📥 MCP RESPONSE")
-            logger.info(f"Status Code: {response.status_code}")
+            # Log MCP Response (collected and emitted as one record)
+            if info_enabled:
+                response_lines = [_BANNER, "📥 MCP RESPONSE", f"Status Code: {response.status_code}"]
             
             if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Success: True")
-                logger.info(f"Result Keys: {list(result.keys())}")
-                if 'result' in result:
-                    result_data = result.get('result', [])
-                    if isinstance(result_data, list):
-                        logger.info(f"Documents Returned: {len(result_data)}")
-                        if len(result_data) > 0:
-                            logger.info(f"Sample Document Keys: {list(result_data[0].keys()) if result_data else []}")
-                    else:
-                        logger.info(f"Result Type: {type(result_data)}")
-                
-                # Log complete response for debugging
-                logger.info("")
-                logger.info("Complete MCP Response:")
-                logger.info(json.dumps(result, indent=2, default=str)[:2000])  # First 2000 chars
-                logger.info("="*80)
+                try:
+                    result = orjson.loads(response.content)
+                except orjson.JSONDecodeError:
+                    # NaN / >64-bit ints, or a genuinely invalid body (raises as before)
+                    result = response.json()
+                if info_enabled:
+                    response_lines.append("Success: True")
+                    response_lines.append(f"Result Keys: {list(result.keys())}")
+                    if 'result' in result:
+                        result_data = result.get('result', [])
+                        if isinstance(result_data, list):
+                            response_lines.append(f"Documents Returned: {len(result_data)}")
+                            if len(result_data) > 0:
+                                response_lines.append(f"Sample Document Keys: {list(result_data[0].keys())}")
+                        else:
+                            response_lines.append(f"Result Type: {type(result_data)}")
+                    
+                    # Log complete response for debugging
+                    response_lines.append("")
+                    response_lines.append("Complete MCP Response:")
+                    response_lines.append(_format_json_preview(result, 2000))  # First 2000 chars
+                    response_lines.append(_BANNER)
+                    logger.info("\n".join(response_lines))
                 return {
                     "success": True,
                     "data": result.get("result", result),
@@ -135,9 +191,11 @@ class MCPClient:
                 }
             else:
                 error_msg = f"MCP request failed: HTTP {response.status_code}"
+                if info_enabled:
+                    logger.info("\n".join(response_lines))
                 logger.error(f"Error: {error_msg}")
                 logger.error(f"Response: {response.text[:500]}")
-                logger.info("="*80)
+                logger.info(_BANNER)
                 return {
                     "success": False,
                     "data": None,
@@ -153,6 +211,14 @@ class MCPClient:
             }
 
 
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.closed = True
+        self._session.close()
+        if self.token_cache:
+            self.token_cache.close()
+
+
 def get_mcp_client(config: Config) -> MCPClient:
-    """Get MCP client instance"""
-    return MCPClient(config)
+    """Get the shared MCP client instance for this config"""
+    return get_shared_instance("mcp_client", config, lambda: MCPClient(config))
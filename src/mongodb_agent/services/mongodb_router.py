@@ -9,9 +9,10 @@ Automatically selects the appropriate client based on configuration.
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from mongodb_agent.config import Config
+from mongodb_agent.services.registry import get_shared_instance
 
 logger = logging.getLogger(__name__)
 
@@ -23,22 +24,28 @@ class MongoDBRouter:
         self.config = config
         self.connection_type = config.mongodb_connection_type
         self.client = None
+        # Set by close(); the service registry then stops handing this router out
+        self.closed = False
         
         logger.info(f"🔧 Initializing MongoDB Router: {self.connection_type.upper()} mode")
         
+        # The router owns its client (not the registry-shared one), so closing the
+        # router never closes a client other callers still use
         if self.connection_type == "direct":
-            from mongodb_agent.services.direct_client import get_direct_client
-            self.client = get_direct_client(config)
+            from mongodb_agent.services.direct_client import DirectMongoClient
+            self.client = DirectMongoClient(config)
             logger.info("✅ Using Direct MongoDB connection (PyMongo)")
         else:
-            from mongodb_agent.services.mcp_client import get_mcp_client
-            self.client = get_mcp_client(config)
+            from mongodb_agent.services.mcp_client import MCPClient
+            self.client = MCPClient(config)
             logger.info("✅ Using MCP protocol connection")
     
     def execute_query(
         self,
         aggregation_pipeline: str,
-        db_details: Dict[str, Any]
+        db_details: Dict[str, Any],
+        batch_size: Optional[int] = None,
+        stream: bool = False
     ) -> Dict[str, Any]:
         """
         Execute MongoDB query via configured client
@@ -48,6 +55,9 @@ class MongoDBRouter:
             db_details: Database/collection connection details
                 For MCP: dbName, userName, applicationName
                 For Direct: collection (collection name)
+            batch_size: Direct only - documents per cursor batch
+            stream: Direct only - return the cursor as data instead of a list
+                (MCP always returns the complete result list)
         
         Returns:
             Dict with keys:
@@ -62,10 +72,18 @@ class MongoDBRouter:
                 "error": "MongoDB client not initialized"
             }
         
-        return self.client.execute_query(aggregation_pipeline, db_details)
+        if batch_size is None and not stream:
+            return self.client.execute_query(aggregation_pipeline, db_details)
+        if self.connection_type != "direct":
+            logger.debug("batch_size/stream apply to direct connections only; MCP returns the full result")
+            return self.client.execute_query(aggregation_pipeline, db_details)
+        return self.client.execute_query(
+            aggregation_pipeline, db_details, batch_size=batch_size, stream=stream
+        )
     
     def close(self):
         """Close MongoDB connection if applicable"""
+        self.closed = True
         if self.client and hasattr(self.client, 'close'):
             self.client.close()
             logger.info("MongoDB connection closed")
@@ -84,6 +102,10 @@ def get_mongodb_client(config: Config) -> MongoDBRouter:
     """
     Get MongoDB client (MCP or Direct based on config)
     
+    The instance is shared by every caller with the same config. Closing it closes
+    it for all of them (the next call then builds a new one); use
+    MongoDBRouter(config) directly for a private client to close independently.
+    
     Args:
         config: MongoDB Agent configuration
     
@@ -98,4 +120,4 @@ def get_mongodb_client(config: Config) -> MongoDBRouter:
         ...     {"collection": "users"}
         ... )
     """
-    return MongoDBRouter(config)
+    return get_shared_instance("mongodb_router", config, lambda: MongoDBRouter(config))
@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2026 Cisco Systems, Inc. and its affiliates
+
+"""
+Shared service instances
+
+The get_*() service factories hand out one instance per (service, config), so
+rebuilding a graph or agent with the same configuration reuses the LLM, vector
+DB and MongoDB clients instead of reconnecting and re-authenticating.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from mongodb_agent.config import Config
+
+logger = logging.getLogger(__name__)
+
+# (service name, config) -> (version, instance)
+_INSTANCES: Dict[Tuple[str, Config], Tuple[Optional[Hashable], Any]] = {}
+# Re-entrant: a factory may itself ask for another shared service (router -> direct client)
+_INSTANCES_LOCK = threading.RLock()
+
+
+def get_shared_instance(
+    name: str,
+    config: Config,
+    factory: Callable[[], Any],
+    version: Optional[Hashable] = None
+) -> Any:
+    """
+    Get the shared instance of a service for a configuration, creating it on first use
+    
+    Args:
+        name: Service name (part of the cache key)
+        config: Configuration the instance is built from (part of the cache key)
+        factory: Builds the instance when none is cached
+        version: Optional value the instance depends on beyond the config (e.g. an
+            access token); a different version replaces the cached instance
+    
+    An instance whose ``closed`` attribute is true (it was closed by some caller)
+    is dropped and replaced by a new one.
+    
+    Returns:
+        Shared service instance
+    """
+    key = (name, config)
+    with _INSTANCES_LOCK:
+        cached = _INSTANCES.get(key)
+        if cached is not None and cached[0] == version and not getattr(cached[1], "closed", False):
+            return cached[1]
+        
+        instance = factory()
+        _INSTANCES[key] = (version, instance)
+        return instance
+
+
+def close_all() -> None:
+    """Close every shared service instance that supports it and forget them all"""
+    with _INSTANCES_LOCK:
+        instances = [instance for _, instance in _INSTANCES.values()]
+        _INSTANCES.clear()
+    
+    for instance in instances:
+        close = getattr(instance, "close", None)
+        if close is None:
+            continue
+        try:
+            close()
+        except Exception as e:
+            logger.warning(f"Error closing {type(instance).__name__}: {e}")
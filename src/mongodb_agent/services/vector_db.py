@@ -12,9 +12,10 @@ Supports:
 """
 
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 from mongodb_agent.config import Config
+from mongodb_agent.services.registry import get_shared_instance
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +28,8 @@ class VectorClient:
         Search for semantic model by file name
         
         Returns:
-            Dict with keys: text, db_name, schema_name, app_name, db_type
+            Dict with keys: text, db_name, schema_name, app_name, db_type, and
+            optionally parsed_json (the model as JSON, which skips the YAML parse)
         """
         raise NotImplementedError
 
@@ -54,31 +56,61 @@ class WeaviateClient(VectorClient):
                 port=int(config.weaviate_url.split(":")[-1]) if ":" in config.weaviate_url else 8080
             )
         
+        # Semantic models are indexed once and rarely change, so successful lookups
+        # are kept per file name for the lifetime of the client
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        # Properties fetched per lookup, read from the collection schema on first use
+        self._return_properties: Optional[List[str]] = None
+        # Set by close(); the service registry then stops handing this client out
+        self.closed = False
+        
         logger.info("Weaviate connected successfully")
     
     def search_semantic_model(self, file_name: str) -> Optional[Dict[str, Any]]:
         """Search SemanticLayerCollection for semantic model"""
+        cached = self._cache.get(file_name)
+        if cached is not None:
+            return cached
+        
         from weaviate.classes.query import Filter
         
         collection = self.client.collections.get("SemanticLayerCollection")
         filter_condition = Filter.by_property("source").equal(file_name)
         
+        if self._return_properties is None:
+            # Legacy collections have no parsed_json property, and asking for it would fail the query
+            defined = {prop.name for prop in collection.config.get().properties}
+            self._return_properties = ["text", "db_name", "schema_name", "app_name", "db_type"]
+            if "parsed_json" in defined:
+                self._return_properties.append("parsed_json")
+        
+        # Only the first match is used, so let the server stop after one object
         response = collection.query.fetch_objects(
             filters=filter_condition,
-            return_properties=["text", "db_name", "schema_name", "app_name", "db_type"],
+            limit=1,
+            return_properties=self._return_properties,
         )
         
         if response.objects and len(response.objects) > 0:
             item = response.objects[0]
-            return {
+            result = {
                 "text": item.properties.get("text"),
+                "parsed_json": item.properties.get("parsed_json"),
                 "db_name": item.properties.get("db_name"),
                 "schema_name": item.properties.get("schema_name"),
                 "app_name": item.properties.get("app_name"),
                 "db_type": item.properties.get("db_type"),
             }
+            # Misses are not cached so a model indexed later is still picked up
+            self._cache[file_name] = result
+            return result
         
         return None
+    
+    def close(self):
+        """Close the Weaviate connection"""
+        self.closed = True
+        self.client.close()
 
 
 class LocalFileClient(VectorClient):
@@ -87,28 +119,66 @@ class LocalFileClient(VectorClient):
     def __init__(self, config: Config):
         import os
         self.semantic_model_path = config.semantic_model_path
+        # File path -> (parsed content, YAML text dumped from it)
+        self._text_cache: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        # File name -> full path for the model directory, rebuilt when the directory changes
+        self._index: Dict[str, str] = {}
+        self._index_stamp: Optional[int] = None
         logger.info(f"Using local semantic models from: {self.semantic_model_path}")
         
         if not os.path.exists(self.semantic_model_path):
             logger.warning(f"Semantic model path does not exist: {self.semantic_model_path}")
+        else:
+            self._refresh_index()
+    
+    def _refresh_index(self) -> None:
+        """Re-list the model directory if it changed since the last scan"""
+        import os
+        
+        try:
+            stamp = os.stat(self.semantic_model_path).st_mtime_ns
+        except OSError:
+            self._index, self._index_stamp = {}, None
+            return
+        
+        if stamp == self._index_stamp:
+            return
+        
+        index = {}
+        with os.scandir(self.semantic_model_path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    index[entry.name] = entry.path
+        self._index, self._index_stamp = index, stamp
     
     def search_semantic_model(self, file_name: str) -> Optional[Dict[str, Any]]:
         """Load semantic model from local file"""
         import os
         import yaml
+        from mongodb_agent.semantic_models import load_semantic_model
+        from mongodb_agent.semantic_models.loader import YAMLDumper
         
-        # Try multiple file paths
-        possible_paths = [
-            os.path.join(self.semantic_model_path, file_name),
-            os.path.join(self.semantic_model_path, f"{file_name}.yaml"),
-            os.path.join("mongodb_structure_agent", "semantic_models", file_name),
-        ]
+        # Look the name up in the directory index; only probe the filesystem for
+        # names the index cannot hold (sub-paths) and the legacy location
+        self._refresh_index()
+        file_path = self._index.get(file_name) or self._index.get(f"{file_name}.yaml")
+        if file_path is not None:
+            possible_paths = [file_path]
+        else:
+            possible_paths = [
+                os.path.join("mongodb_structure_agent", "semantic_models", file_name),
+            ]
+            if os.path.basename(file_name) != file_name:
+                possible_paths[:0] = [
+                    os.path.join(self.semantic_model_path, file_name),
+                    os.path.join(self.semantic_model_path, f"{file_name}.yaml"),
+                ]
         
         for file_path in possible_paths:
             if os.path.exists(file_path):
                 logger.info(f"Loading semantic model from: {file_path}")
-                with open(file_path, "r") as f:
-                    yaml_content = yaml.safe_load(f)
+                # C-accelerated parse, cached until the file's mtime or size changes
+                yaml_content = load_semantic_model(file_path)
                 
                 # Extract metadata
                 db_name = None
@@ -119,8 +189,16 @@ class LocalFileClient(VectorClient):
                     db_name = yaml_content["collection_info"].get("database")
                     schema_name = yaml_content["collection_info"].get("schema_name")
                 
+                # Re-dump only when the loader returned freshly parsed content
+                cached = self._text_cache.get(file_path)
+                if cached is not None and cached[0] is yaml_content:
+                    text = cached[1]
+                else:
+                    text = yaml.dump(yaml_content, Dumper=YAMLDumper)
+                    self._text_cache[file_path] = (yaml_content, text)
+                
                 return {
-                    "text": yaml.dump(yaml_content),
+                    "text": text,
                     "db_name": db_name,
                     "schema_name": schema_name,
                     "app_name": "GenAI-Agent",
@@ -133,7 +211,7 @@ class LocalFileClient(VectorClient):
 
 def get_vector_client(config: Config) -> VectorClient:
     """
-    Get vector database client
+    Get vector database client (shared by every caller with the same config)
     
     Args:
         config: Configuration object
@@ -142,8 +220,8 @@ def get_vector_client(config: Config) -> VectorClient:
         VectorClient instance
     """
     if config.vector_db == "weaviate":
-        return WeaviateClient(config)
+        return get_shared_instance("vector_client", config, lambda: WeaviateClient(config))
     elif config.vector_db == "local":
-        return LocalFileClient(config)
+        return get_shared_instance("vector_client", config, lambda: LocalFileClient(config))
     else:
         raise ValueError(f"Unsupported vector DB: {config.vector_db}")
@@ -11,7 +11,7 @@ Defines the TypedDict schemas for:
 """
 
 from typing import Optional, TypedDict
-from typing_extensions import Annotated
+from typing_extensions import Annotated, NotRequired
 from langchain_core.messages import AIMessage
 from langgraph.graph.message import add_messages
 
@@ -20,6 +20,7 @@ class AgentState(TypedDict):
     """Internal state for MongoDB Agent graph"""
     file_name: str
     messages: Annotated[list[AIMessage], add_messages]
+    user_question: str  # Text of the first message, stored once by ingress
     iterations: int
     raw_extracted_schema_dict: Optional[dict]
     schema: str
@@ -38,6 +39,7 @@ class AgentState(TypedDict):
     raw_mongo_result: Optional[list]  # Actual MongoDB results data
     error: Optional[str]
     exception_class: Optional[str]
+    bypass_cache: bool  # Skip the selector's LLM response cache for this run
 
 
 class InputSchema(TypedDict):
@@ -45,6 +47,7 @@ class InputSchema(TypedDict):
     question: str
     yaml_file_name: str
     db_details: dict
+    bypass_cache: NotRequired[bool]
 
 
 class ResponseSchema(TypedDict, total=False):
@@ -3,7 +3,7 @@
 
 """Utils package initialization"""
 
-from mongodb_agent.utils.token_cache import TokenCache
+from mongodb_agent.utils.token_cache import TokenCache, get_shared_token_cache
 from mongodb_agent.utils.parsers import (
     parse_json,
     parse_mongodb_query_from_string,
@@ -14,6 +14,7 @@ from mongodb_agent.utils.parsers import (
 
 __all__ = [
     "TokenCache",
+    "get_shared_token_cache",
     "parse_json",
     "parse_mongodb_query_from_string",
     "extract_array_fields",
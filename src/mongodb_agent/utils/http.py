@@ -0,0 +1,35 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2026 Cisco Systems, Inc. and its affiliates
+
+"""
+Pooled HTTP sessions
+
+Keeps TCP/TLS connections alive across requests to the same host instead of
+opening a new connection for every requests.post() call.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(pool_connections: int = 4, pool_maxsize: int = 16) -> requests.Session:
+    """
+    Create a requests.Session with a connection pool and connection retries
+    
+    Args:
+        pool_connections: Number of per-host pools to keep
+        pool_maxsize: Connections kept alive per host (roughly the expected concurrency)
+    
+    Returns:
+        Session to reuse for every request to the same service
+    """
+    # Status retries only apply to idempotent methods (urllib3 default), so POSTs are
+    # retried on connection failures but never re-sent after the server answered
+    retries = Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retries)
+    
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
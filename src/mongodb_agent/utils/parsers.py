@@ -10,9 +10,12 @@ and handling various query formats.
 
 import json
 import logging
+import math
 import re
 from typing import Dict, Any, List, Optional
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 # Constants for MongoDB operators
@@ -20,6 +23,48 @@ COUNT_OPERATOR = "$count"
 LIMIT_OPERATOR = "$limit"
 MATCH_OPERATOR = "$match"
 
+# Legacy db.collection.method(...) query strings
+_COLLECTION_RE = re.compile(r"db\.([^.]+)\.")
+_FIND_RE = re.compile(r"\.find\(({.*?})\)", re.DOTALL)
+_LIMIT_RE = re.compile(r"\.limit\((\d+)\)")
+_AGGREGATE_RE = re.compile(r"\.aggregate\(([^\]]*)\]", re.DOTALL)
+_MONGODB_CALL_RE = re.compile(r"db\.[^.]+\.(find|aggregate|updateOne|deleteOne|insertOne)\([^)]*\)")
+_FULL_QUERY_RE = re.compile(r"(db\.[^.]+\.[^;]+)")
+
+# data_type spelling -> is an array type; schemas use only a handful of spellings
+_ARRAY_TYPE_MEMO: Dict[str, bool] = {}
+_ARRAY_TYPE_MEMO_SIZE = 1024
+
+
+def _extract_last_json_block(text: str) -> Optional[str]:
+    """
+    Return the stripped body of the last ```json ... ``` fenced block, or None
+    
+    Same blocks as re.finditer(r"```json(.*?)```", text, re.DOTALL), found with
+    plain substring searches.
+    """
+    body = None
+    pos = 0
+    while True:
+        start = text.find("```json", pos)
+        if start < 0:
+            break
+        end = text.find("```", start + 7)
+        if end < 0:
+            break
+        body = (start + 7, end)
+        pos = end + 3
+    
+    return text[body[0]:body[1]].strip() if body is not None else None
+
+
+def _loads(text: str) -> Any:
+    """json.loads via orjson, deferring to json for what orjson rejects (NaN, >64-bit ints) and for the error"""
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return json.loads(text)
+
 
 def parse_json(input_string: str) -> Optional[Dict[str, Any]]:
     """
@@ -31,23 +76,18 @@ def parse_json(input_string: str) -> Optional[Dict[str, Any]]:
     Returns:
         Parsed JSON dictionary or None if parsing fails
     """
-    # Try to find JSON code block first
-    json_pattern = r"```json(.*?)```"
-    json_matches = []
-    
-    for match in re.finditer(json_pattern, input_string, re.DOTALL):
-        json_matches.append(match.group(1).strip())
+    # Try to find JSON code block first - only the last (most recent) one is parsed
+    json_block = _extract_last_json_block(input_string)
     
-    if json_matches:
+    if json_block is not None:
         try:
-            # Parse the last JSON match (most recent)
-            return json.loads(json_matches[-1])
+            return _loads(json_block)
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing JSON from code block: {e}")
     
     # Fallback: try parsing the whole string
     try:
-        return json.loads(input_string)
+        return _loads(input_string)
     except json.JSONDecodeError:
         logger.debug("Could not parse input as JSON")
         return None
@@ -70,16 +110,12 @@ def parse_mongodb_query_from_string(
         Dictionary with query components
     """
     # Try to find JSON code block first
-    json_pattern = r"```json(.*?)```"
-    json_matches = []
+    json_block = _extract_last_json_block(input_string)
     
-    for match in re.finditer(json_pattern, input_string, re.DOTALL):
-        json_matches.append(match.group(1).strip())
-    
-    if json_matches:
+    if json_block is not None:
         try:
             # Parse the last JSON match
-            mongodb_response = json.loads(json_matches[-1])
+            mongodb_response = _loads(json_block)
             
             # Extract MongoDB query components
             mongodb_query = mongodb_response.get("mongodb_query", "")
@@ -91,6 +127,7 @@ def parse_mongodb_query_from_string(
             aggregation_pipeline = []
             collection_name = "default_collection"
             database_name = "default_database"
+            entities = mongodb_response.get("entities", [])
             
             # NEW FORMAT: mongodb_query directly contains aggregation pipeline array
             if isinstance(mongodb_query, list):
@@ -98,7 +135,6 @@ def parse_mongodb_query_from_string(
                 aggregation_pipeline = mongodb_query
                 
                 # Extract collection name from entities
-                entities = mongodb_response.get("entities", [])
                 for entity in entities:
                     if entity.get("type") == "collection":
                         collection_name = entity.get("name", "default_collection")
@@ -111,7 +147,7 @@ def parse_mongodb_query_from_string(
                 # Extract collection name from query
                 if "db." in mongodb_query:
                     # Pattern: db.collection.method(...)
-                    collection_match = re.search(r"db\.([^.]+)\.", mongodb_query)
+                    collection_match = _COLLECTION_RE.search(mongodb_query)
                     if collection_match:
                         collection_name = collection_match.group(1)
                 
@@ -119,32 +155,32 @@ def parse_mongodb_query_from_string(
                 if ".countDocuments()" in mongodb_query:
                     # Convert countDocuments() to aggregation pipeline
                     aggregation_pipeline = [{COUNT_OPERATOR: "total"}]
-                    logger.debug(f"Converted countDocuments() to: {aggregation_pipeline}")
+                    logger.debug("Converted countDocuments() to: %s", aggregation_pipeline)
                     
                 elif ".find(" in mongodb_query and ".limit(" in mongodb_query:
                     # Convert find().limit() to aggregation pipeline
                     # Extract filter from find()
-                    find_match = re.search(r"\.find\(({.*?})\)", mongodb_query, re.DOTALL)
-                    limit_match = re.search(r"\.limit\((\d+)\)", mongodb_query)
+                    find_match = _FIND_RE.search(mongodb_query)
+                    limit_match = _LIMIT_RE.search(mongodb_query)
                     
                     if find_match and limit_match:
                         try:
-                            filter_obj = json.loads(find_match.group(1))
+                            filter_obj = _loads(find_match.group(1))
                             limit_num = int(limit_match.group(1))
                             aggregation_pipeline = [{MATCH_OPERATOR: filter_obj}, {LIMIT_OPERATOR: limit_num}]
-                            logger.debug(f"Converted find().limit() to: {aggregation_pipeline}")
+                            logger.debug("Converted find().limit() to: %s", aggregation_pipeline)
                         except (ValueError, json.JSONDecodeError):
                             aggregation_pipeline = [{LIMIT_OPERATOR: 100}]
                     
                 elif ".aggregate(" in mongodb_query:
                     # Extract the pipeline array from the query
-                    pipeline_match = re.search(r"\.aggregate\(([^\]]*)\]", mongodb_query, re.DOTALL)
+                    pipeline_match = _AGGREGATE_RE.search(mongodb_query)
                     if pipeline_match:
                         try:
                             # Extract just the array content
                             pipeline_text = "[" + pipeline_match.group(1) + "]"
-                            aggregation_pipeline = json.loads(pipeline_text)
-                            logger.debug(f"Extracted aggregation pipeline: {aggregation_pipeline}")
+                            aggregation_pipeline = _loads(pipeline_text)
+                            logger.debug("Extracted aggregation pipeline: %s", aggregation_pipeline)
                         except json.JSONDecodeError:
                             logger.warning("Could not parse aggregation pipeline from query")
                             aggregation_pipeline = [{LIMIT_OPERATOR: 100}]
@@ -163,7 +199,7 @@ def parse_mongodb_query_from_string(
                 "collection_name": collection_name,
                 "database_name": database_name,
                 "parameters": mongodb_response.get("parameters", {}),
-                "entities": mongodb_response.get("entities", []),
+                "entities": entities,
                 "query_type": mongodb_response.get("query_type", "aggregate")
             }
             
@@ -180,12 +216,9 @@ def parse_mongodb_query_from_string(
             }
     else:
         # Fallback: try to extract raw MongoDB query without JSON wrapper
-        mongodb_pattern = r"db\.[^.]+\.(find|aggregate|updateOne|deleteOne|insertOne)\([^)]*\)"
-        mongodb_matches = re.findall(mongodb_pattern, input_string)
-        
-        if mongodb_matches:
+        if _MONGODB_CALL_RE.search(input_string):
             # Extract the full query
-            full_query_match = re.search(r"(db\.[^.]+\.[^;]+)", input_string)
+            full_query_match = _FULL_QUERY_RE.search(input_string)
             if full_query_match:
                 return {
                     "mongodb_query": full_query_match.group(1),
@@ -225,17 +258,34 @@ def extract_array_fields(fields: Dict[str, Any]) -> List[str]:
         if not isinstance(field_info, dict):
             continue
             
-        # Check data type
-        data_type = field_info.get("data_type", "").lower()
-        if "array" in data_type or data_type == "list":
+        # Check data type (lowercased once per distinct spelling, not once per field)
+        data_type = field_info.get("data_type", "")
+        is_array = _ARRAY_TYPE_MEMO.get(data_type)
+        if is_array is None:
+            lowered = data_type.lower()
+            is_array = "array" in lowered or lowered == "list"
+            if len(_ARRAY_TYPE_MEMO) < _ARRAY_TYPE_MEMO_SIZE:
+                _ARRAY_TYPE_MEMO[data_type] = is_array
+        if is_array:
             # Use nested_path if available, otherwise field name
             path = field_info.get("nested_path", field_info.get("path", field_name))
             array_fields.append(path)
     
-    logger.debug(f"Identified {len(array_fields)} array fields: {array_fields}")
+    logger.debug("Identified %d array fields: %s", len(array_fields), array_fields)
     return array_fields
 
 
+def _has_non_finite_float(value: Any) -> bool:
+    """Whether a JSON-like structure holds NaN or an infinity anywhere"""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite_float(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite_float(item) for item in value)
+    return False
+
+
 def format_query_for_display(aggregation_pipeline: List[Dict[str, Any]]) -> str:
     """
     Format aggregation pipeline for user-friendly display.
@@ -246,6 +296,16 @@ def format_query_for_display(aggregation_pipeline: List[Dict[str, Any]]) -> str:
     Returns:
         Formatted string representation
     """
+    try:
+        formatted = orjson.dumps(aggregation_pipeline, option=orjson.OPT_INDENT_2)
+    except orjson.JSONEncodeError:
+        formatted = None
+    
+    # orjson writes NaN/Infinity as null, which would display a different query
+    if formatted is not None and (b"null" not in formatted or not _has_non_finite_float(aggregation_pipeline)):
+        return formatted.decode()
+    
+    # Non-finite floats, non-string keys or >64-bit ints: the stdlib encoder handles those or gives up as before
     try:
         return json.dumps(aggregation_pipeline, indent=2)
     except (TypeError, ValueError):
@@ -11,18 +11,25 @@ Reused from mongodb_structure_agent/utils/token_cache.py
 import time
 import threading
 import logging
-import requests
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+import orjson
+
+from mongodb_agent.utils.http import create_session
 
 logger = logging.getLogger(__name__)
 
+# Refresh tokens this long before the server-reported expiry
+EXPIRY_MARGIN_SECONDS = 60
+
 
 class TokenCache:
     """
     Thread-safe OAuth2 token cache with TTL
     
     Features:
-    - Automatic token refresh before expiration
+    - Automatic token refresh before expiration (in the background, so callers
+      keep using the still-valid token meanwhile)
     - Thread-safe access
     - Configurable TTL
     """
@@ -32,7 +39,9 @@ class TokenCache:
         token_url: str,
         client_id: str,
         client_secret: str,
-        ttl_seconds: int = 3000
+        ttl_seconds: int = 3000,
+        timeout: float = 10,
+        refresh_margin: float = 60
     ):
         """
         Initialize token cache
@@ -41,18 +50,29 @@ class TokenCache:
             token_url: OAuth2 token endpoint
             client_id: OAuth2 client ID
             client_secret: OAuth2 client secret
-            ttl_seconds: Token TTL in seconds (default: 3000 = 50 minutes)
+            ttl_seconds: Token TTL in seconds (default: 3000 = 50 minutes); capped by the
+                server's expires_in minus a safety margin
+            timeout: Token request timeout in seconds
+            refresh_margin: Start a background refresh when the cached token has
+                less than this many seconds left (at most half its TTL, so a fresh
+                token never triggers one)
         """
         self.token_url = token_url
         self.client_id = client_id
         self.client_secret = client_secret
         self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self.refresh_margin = refresh_margin
         
-        self._token: Optional[str] = None
-        self._token_expiry: float = 0
+        # (token, expiry, refresh_at) swapped as one tuple, so lock-free readers never see a torn entry
+        self._cached: Tuple[Optional[str], float, float] = (None, 0, 0)
         self._lock = threading.Lock()
+        # Held while a background refresh is pending, so at most one runs at a time
+        self._refresh_lock = threading.Lock()
+        # Token fetches are serialized by _lock, so one pooled connection is enough
+        self._session = create_session(pool_connections=1, pool_maxsize=1)
         
-        logger.info(f"[TokenCache] Initialized with TTL: {ttl_seconds}s")
+        logger.info("[TokenCache] Initialized with TTL: %ss", ttl_seconds)
     
     def get_token(self) -> str:
         """
@@ -61,26 +81,67 @@ class TokenCache:
         Returns:
             Valid access token
         """
+        # Fast path: a valid token is returned without taking the lock
+        token, expiry, refresh_at = self._cached
+        current_time = time.time()
+        if token and current_time < expiry:
+            if current_time >= refresh_at:
+                self._start_background_refresh()
+            logger.debug("[TokenCache] Using cached token")
+            return token
+        
         with self._lock:
             current_time = time.time()
             
-            # Check if token is still valid
-            if self._token and current_time < self._token_expiry:
+            # Check again: another thread may have refreshed it while we waited
+            token, expiry, _ = self._cached
+            if token and current_time < expiry:
                 logger.debug("[TokenCache] Using cached token")
-                return self._token
+                return token
             
             # Token expired or not present, fetch new one
             logger.info("[TokenCache] Fetching new token...")
-            self._token = self._fetch_token()
-            self._token_expiry = current_time + self.ttl_seconds
-            logger.info(f"[TokenCache] New token cached (expires in {self.ttl_seconds}s)")
+            token, ttl = self._fetch_token()
+            self._store(token, current_time, ttl)
+            logger.info("[TokenCache] New token cached (expires in %ss)", ttl)
             
-            return self._token
+            return token
+    
+    def _store(self, token: str, fetched_at: float, ttl: float):
+        """Cache a token, scheduling its background refresh no earlier than halfway through its TTL"""
+        margin = min(self.refresh_margin, ttl / 2)
+        self._cached = (token, fetched_at + ttl, fetched_at + ttl - margin)
     
-    def _fetch_token(self) -> str:
-        """Fetch new access token from OAuth2 server"""
+    def _start_background_refresh(self):
+        """Fetch the next token on a daemon thread unless a refresh is already pending"""
+        if not self._refresh_lock.acquire(blocking=False):
+            return
         try:
-            response = requests.post(
+            threading.Thread(
+                target=self._background_refresh, name="token-cache-refresh", daemon=True
+            ).start()
+        except Exception:
+            self._refresh_lock.release()
+            raise
+    
+    def _background_refresh(self):
+        """Replace the expiring token; on failure the next caller after expiry fetches as usual"""
+        try:
+            with self._lock:
+                current_time = time.time()
+                token, ttl = self._fetch_token()
+                self._store(token, current_time, ttl)
+                logger.info("[TokenCache] Token refreshed in background (expires in %ss)", ttl)
+        except Exception:
+            # _fetch_token already logged the failure
+            pass
+        finally:
+            self._refresh_lock.release()
+    
+    def _fetch_token(self) -> Tuple[str, float]:
+        """Fetch new access token from OAuth2 server, returning it with its cache TTL"""
+        try:
+            response = self._session.post(
                 self.token_url,
                 data={
                     "grant_type": "client_credentials",
@@ -88,18 +149,27 @@ class TokenCache:
                     "client_secret": self.client_secret
                 },
                 headers={"Content-Type": "application/x-www-form-urlencoded"},
-                timeout=10
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
-                token_data = response.json()
+                try:
+                    token_data = orjson.loads(response.content)
+                except orjson.JSONDecodeError:
+                    # Defer to requests for the odd body orjson rejects (and for the error)
+                    token_data = response.json()
                 access_token = token_data.get("access_token")
                 
                 if not access_token:
                     raise ValueError("No access_token in response")
                 
+                ttl = self.ttl_seconds
+                expires_in = token_data.get("expires_in")
+                if expires_in:
+                    ttl = max(0, min(ttl, float(expires_in) - EXPIRY_MARGIN_SECONDS))
+                
                 logger.info("[TokenCache] Token fetched successfully")
-                return access_token
+                return access_token, ttl
             else:
                 raise Exception(f"Token request failed: HTTP {response.status_code}")
         
@@ -110,6 +180,45 @@ class TokenCache:
     def invalidate(self):
         """Invalidate cached token (force refresh on next get_token)"""
         with self._lock:
-            self._token = None
-            self._token_expiry = 0
+            self._cached = (None, 0, 0)
             logger.info("[TokenCache] Token cache invalidated")
+    
+    def close(self):
+        """Close the pooled HTTP connection to the token endpoint"""
+        self._session.close()
+
+
+_shared_caches: Dict[Tuple[str, str], TokenCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_shared_token_cache(
+    token_url: str,
+    client_id: str,
+    client_secret: str,
+    ttl_seconds: int = 3000,
+    timeout: float = 10
+) -> TokenCache:
+    """
+    Get the process-wide token cache for an OAuth2 endpoint and client
+    
+    Callers that authenticate with the same credentials share one cache, so a
+    warm process does not repeat the token round-trip.
+    
+    Args:
+        token_url: OAuth2 token endpoint
+        client_id: OAuth2 client ID
+        client_secret: OAuth2 client secret
+        ttl_seconds: Token TTL in seconds, used when the cache is first created
+        timeout: Token request timeout in seconds, used when the cache is first created
+    
+    Returns:
+        Shared TokenCache instance
+    """
+    key = (token_url, client_id)
+    with _shared_caches_lock:
+        cache = _shared_caches.get(key)
+        if cache is None or cache.client_secret != client_secret:
+            cache = TokenCache(token_url, client_id, client_secret, ttl_seconds, timeout)
+            _shared_caches[key] = cache
+        return cache
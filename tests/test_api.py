@@ -0,0 +1,146 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2026 Cisco Systems, Inc. and its affiliates
+
+"""Tests for the REST API and documentation server."""
+import pytest
+from fastapi.testclient import TestClient
+
+from mongodb_agent import api
+
+
+@pytest.fixture
+def client():
+    """Test client without the startup event, so no agent is built."""
+    return TestClient(api.app)
+
+
+class TestStaticJsonCaching:
+    """Test cases for ETag handling on the precomputed JSON endpoints."""
+    
+    @pytest.mark.parametrize("path", ["/", "/api/capabilities"])
+    def test_etag_and_cache_headers(self, client, path):
+        """Test that static JSON responses carry a strong ETag and Cache-Control."""
+        response = client.get(path)
+        
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["cache-control"] == "public, max-age=60"
+        assert response.json()
+    
+    @pytest.mark.parametrize("path", ["/", "/api/capabilities"])
+    def test_matching_if_none_match_returns_304(self, client, path):
+        """Test that a matching (strong, weak or wildcard) If-None-Match gets an empty 304."""
+        etag = client.get(path).headers["etag"]
+        
+        for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            response = client.get(path, headers={"If-None-Match": if_none_match})
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == etag
+    
+    def test_stale_if_none_match_returns_body(self, client):
+        """Test that a non-matching If-None-Match gets the full response."""
+        response = client.get("/api/capabilities", headers={"If-None-Match": '"stale"'})
+        
+        assert response.status_code == 200
+        assert "mongodb_agent" in response.json()
+    
+    def test_etag_follows_agent_availability(self, client, monkeypatch):
+        """Test that the payload and ETag change when agent availability changes."""
+        monkeypatch.setattr(api, "mongodb_agent_available", False)
+        unavailable = client.get("/api/capabilities")
+        monkeypatch.setattr(api, "mongodb_agent_available", True)
+        available = client.get("/api/capabilities")
+        
+        assert unavailable.json()["mongodb_agent"]["available"] is False
+        assert available.json()["mongodb_agent"]["available"] is True
+        assert unavailable.headers["etag"] != available.headers["etag"]
+
+
+class TestDocsCaching:
+    """Test cases for conditional requests on the documentation pages."""
+    
+    @pytest.fixture
+    def docs_client(self):
+        """Test client for the app with the documentation routes registered."""
+        server = pytest.importorskip("server")
+        if "getting-started" not in server.DOC_CACHE:
+            pytest.skip("documentation pages not available")
+        return TestClient(api.app)
+    
+    def test_matching_etag_returns_304(self, docs_client):
+        """Test that a repeated page request with its ETag gets an empty 304."""
+        response = docs_client.get("/getting-started.html", headers={"Accept-Encoding": "identity"})
+        etag = response.headers["etag"]
+        
+        assert response.status_code == 200
+        assert response.headers["last-modified"]
+        
+        cached = docs_client.get(
+            "/getting-started.html", headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+        )
+        assert cached.status_code == 304
+        assert cached.content == b""
+    
+    def test_etag_differs_per_content_coding(self, docs_client):
+        """Test that the gzip variant has its own ETag and does not match the identity one."""
+        identity = docs_client.get("/getting-started.html", headers={"Accept-Encoding": "identity"})
+        gzipped = docs_client.get("/getting-started.html", headers={"Accept-Encoding": "gzip"})
+        
+        assert gzipped.headers["etag"] != identity.headers["etag"]
+        assert "Accept-Encoding" in gzipped.headers["vary"]
+        
+        response = docs_client.get(
+            "/getting-started.html",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": identity.headers["etag"]},
+        )
+        assert response.status_code == 200
+    
+    def test_if_modified_since(self, docs_client):
+        """Test that If-Modified-Since at the page's Last-Modified gets a 304."""
+        last_modified = docs_client.get("/getting-started.html").headers["last-modified"]
+        
+        response = docs_client.get("/getting-started.html", headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 304
+
+
+class TestLoadShedding:
+    """Test cases for the MAX_INFLIGHT limit on query execution."""
+    
+    REQUEST = {"question": "How many documents?", "yaml_file_name": "TestCollection.yaml"}
+    
+    def test_busy_server_returns_503(self, client, monkeypatch):
+        """Test that requests beyond the in-flight limit are rejected with 503."""
+        executed = []
+        monkeypatch.setattr(api, "_execute_mongodb_query_sync", lambda *args: executed.append(args))
+        # No free slots: every query is already in flight
+        monkeypatch.setattr(api, "_inflight_semaphore", api.asyncio.Semaphore(0))
+        
+        response = client.post("/api/mongodb", json=self.REQUEST)
+        
+        assert response.status_code == 503
+        assert response.json()["detail"] == "Server busy, retry later"
+        assert executed == []
+    
+    def test_query_runs_within_limit(self, client, monkeypatch):
+        """Test that a request is executed, with its options, while slots are free."""
+        calls = []
+        
+        def execute(question, yaml_file_name, include_debug, bypass_cache):
+            calls.append((question, yaml_file_name, include_debug, bypass_cache))
+            return {
+                "mongodb_query": "db.TestCollection.aggregate([])",
+                "query_result": [],
+                "natural_language_response": "No documents",
+                "execution_time_ms": 1,
+                "status": "success",
+            }
+        
+        monkeypatch.setattr(api, "_execute_mongodb_query_sync", execute)
+        monkeypatch.setattr(api, "_inflight_semaphore", api.asyncio.Semaphore(1))
+        
+        response = client.post("/api/mongodb", json={**self.REQUEST, "bypass_cache": True})
+        
+        assert response.status_code == 200
+        assert response.json()["natural_language_response"] == "No documents"
+        assert calls == [("How many documents?", "TestCollection.yaml", False, True)]
@@ -0,0 +1,50 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2026 Cisco Systems, Inc. and its affiliates
+
+"""Tests for configuration loading."""
+import pytest
+
+from mongodb_agent.config import Config
+
+
+@pytest.fixture(autouse=True)
+def fresh_config_cache():
+    """Start and end every test with an empty from_env() cache."""
+    Config.reset_cache()
+    yield
+    Config.reset_cache()
+
+
+class TestConfigFromEnv:
+    """Test cases for the cached Config.from_env()."""
+    
+    def test_returns_same_instance(self):
+        """Test that repeated calls return the cached Config."""
+        assert Config.from_env() is Config.from_env()
+    
+    def test_cached_per_env(self):
+        """Test that each env name gets its own cache entry."""
+        assert Config.from_env("dev") is not Config.from_env("prod")
+        assert Config.from_env("prod") is Config.from_env("prod")
+    
+    def test_environment_changes_need_reset(self, monkeypatch):
+        """Test that os.environ changes are only picked up after reset_cache()."""
+        monkeypatch.setenv("MAX_SCHEMA_FIELDS", "12")
+        config = Config.from_env()
+        assert config.max_schema_fields == 12
+        
+        monkeypatch.setenv("MAX_SCHEMA_FIELDS", "40")
+        assert Config.from_env() is config
+        assert Config.from_env().max_schema_fields == 12
+        
+        Config.reset_cache()
+        reloaded = Config.from_env()
+        assert reloaded is not config
+        assert reloaded.max_schema_fields == 40
+    
+    def test_config_is_frozen(self):
+        """Test that the shared Config cannot be modified by one of its holders."""
+        config = Config.from_env()
+        
+        with pytest.raises(AttributeError):
+            config.max_schema_fields = 1
@@ -2,9 +2,15 @@
 # Copyright (c) 2026 Cisco Systems, Inc. and its affiliates
 
 """Tests for routing logic."""
+import importlib
+import itertools
+
 import pytest
 from unittest.mock import Mock, MagicMock
 
+# Imported by module path: mongodb_agent.nodes re-exports route_to_decide under the package
+router = importlib.import_module("mongodb_agent.nodes.router")
+
 
 class TestRouter:
     """Test cases for the Router node."""
@@ -28,3 +34,55 @@ class TestRouter:
         """Test that routing decisions are made correctly."""
         # Placeholder for routing logic tests
         assert True
+
+
+def _if_chain_route(error, iterations):
+    """The original if-chain route_to_decide, kept as the reference for the route table."""
+    if "No SQL found" in error or "No MongoDB query found" in error:
+        return "fatal_error"
+    if error == "":
+        return "success"
+    if any(mcp_error in error for mcp_error in router._MCP_CONNECTIVITY_ERRORS):
+        return "fatal_error"
+    if iterations >= 1 or "fatal_error" in error.lower():
+        return "fatal_error"
+    return "error"
+
+
+ERRORS = [
+    "",
+    "No SQL found in response",
+    "No MongoDB query found",
+    "Failed to connect to localhost:3000",
+    "HTTP 401 Unauthorized",
+    "Request Timeout after 30s",
+    "FATAL_ERROR: bad state",
+    "Unrecognized pipeline stage name: '$matchh'",
+    "No MongoDB query found; Connection error",
+]
+
+
+class TestRouteTable:
+    """Test cases for the precomputed route table."""
+    
+    @pytest.mark.parametrize("error,iterations", list(itertools.product(ERRORS, [0, 1, 2])))
+    def test_matches_if_chain(self, error, iterations):
+        """Test that table routing gives the same route as the original if-chain."""
+        state = {"error": error, "iterations": iterations}
+        
+        assert router.route_to_decide(state) == _if_chain_route(error, iterations)
+    
+    @pytest.mark.parametrize("error", ERRORS)
+    def test_regex_fallback_matches_automaton(self, error, monkeypatch):
+        """Test that the regex scan used without pyahocorasick finds the same fatal patterns."""
+        expected = router._scan_error(error)
+        monkeypatch.setattr(router, "_FATAL_AUTOMATON", None)
+        
+        assert router._scan_error(error) == expected
+        assert router.route_to_decide({"error": error}) == _if_chain_route(error, 0)
+    
+    def test_table_covers_every_flag_combination(self):
+        """Test that every combination of the four routing flags has an entry."""
+        assert len(router._ROUTE_TABLE) == 16
+        assert router._ROUTE_TABLE[(False, False, False, False)][0] == "success"
+        assert router._ROUTE_TABLE[(False, True, False, False)][0] == "error"
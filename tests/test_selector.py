@@ -2,9 +2,19 @@
 # Copyright (c) 2026 Cisco Systems, Inc. and its affiliates
 
 """Tests for semantic model selector."""
+import importlib
+import shutil
+from pathlib import Path
+
 import pytest
 from unittest.mock import Mock, MagicMock
 
+# Imported by module path: mongodb_agent.nodes re-exports the selector function under the same name
+selector_module = importlib.import_module("mongodb_agent.nodes.selector")
+
+MODEL_FILE = Path(selector_module.__file__).parent.parent / "semantic_models" / "TestCollection.yaml"
+LLM_ANSWER = '{"mongodb_query": "db.TestCollection.aggregate([{\\"$limit\\": 5}])", "collection_name": "TestCollection"}'
+
 
 class TestSelector:
     """Test cases for semantic model selector."""
@@ -27,3 +37,107 @@ class TestSelector:
         """Test semantic model similarity scoring."""
         # Placeholder for similarity tests
         assert True
+
+
+@pytest.fixture
+def selector_context(tmp_path, mock_llm):
+    """Selector context reading a copy of the test model, with an LLM that answers with a query."""
+    shutil.copy(MODEL_FILE, tmp_path / MODEL_FILE.name)
+    mock_llm.invoke.return_value = MagicMock(content=LLM_ANSWER)
+    return selector_module.SelectorContext(llm=mock_llm, semantic_model_path=str(tmp_path), cwd=str(tmp_path))
+
+
+def _state(question, **extra):
+    """Selector input state for a question about the test model."""
+    return {"user_question": question, "file_name": MODEL_FILE.name, **extra}
+
+
+class TestSelectorLLMCache:
+    """Test cases for reuse of selector LLM answers."""
+    
+    def test_identical_prompt_reuses_answer(self, selector_context):
+        """Test that a repeated question is answered from the cache."""
+        select = selector_module.make_selector(selector_context)
+        
+        first = select(_state("How many documents?"))
+        second = select(_state("How many documents?"))
+        
+        assert selector_context.llm.invoke.call_count == 1
+        assert second["sql_query"] == first["sql_query"]
+        assert second["collection_name"] == "TestCollection"
+    
+    def test_different_question_calls_llm(self, selector_context):
+        """Test that a different prompt is not answered from the cache."""
+        select = selector_module.make_selector(selector_context)
+        
+        select(_state("How many documents?"))
+        select(_state("List the newest documents"))
+        
+        assert selector_context.llm.invoke.call_count == 2
+    
+    def test_bypass_cache_calls_llm(self, selector_context):
+        """Test that bypass_cache regenerates the query even for a cached prompt."""
+        select = selector_module.make_selector(selector_context)
+        
+        select(_state("How many documents?"))
+        select(_state("How many documents?", bypass_cache=True))
+        
+        assert selector_context.llm.invoke.call_count == 2
+    
+    def test_unparseable_answer_not_cached(self, selector_context):
+        """Test that an answer without a query is not reused."""
+        selector_context.llm.invoke.return_value = MagicMock(content="I cannot answer that")
+        select = selector_module.make_selector(selector_context)
+        
+        assert select(_state("How many documents?"))["sql_query"] == ""
+        select(_state("How many documents?"))
+        
+        assert selector_context.llm.invoke.call_count == 2
+        assert len(selector_context.llm_cache) == 0
+    
+    def test_expired_answer_not_reused(self, selector_context, monkeypatch):
+        """Test that answers older than the TTL are dropped."""
+        monkeypatch.setattr(selector_module, "SELECTOR_LLM_CACHE_TTL_SECONDS", -1)
+        select = selector_module.make_selector(selector_context)
+        
+        select(_state("How many documents?"))
+        select(_state("How many documents?"))
+        
+        assert selector_context.llm.invoke.call_count == 2
+    
+    def test_cache_disabled(self, selector_context, monkeypatch):
+        """Test that SELECTOR_LLM_CACHE_SIZE=0 turns the cache off."""
+        monkeypatch.setattr(selector_module, "SELECTOR_LLM_CACHE_SIZE", 0)
+        select = selector_module.make_selector(selector_context)
+        
+        select(_state("How many documents?"))
+        select(_state("How many documents?"))
+        
+        assert selector_context.llm.invoke.call_count == 2
+        assert len(selector_context.llm_cache) == 0
+    
+    def test_contexts_do_not_share_answers(self, selector_context, tmp_path):
+        """Test that each selector context (e.g. another model) has its own cache."""
+        other_llm = MagicMock()
+        other_llm.invoke.return_value = MagicMock(content=LLM_ANSWER)
+        other_context = selector_module.SelectorContext(
+            llm=other_llm, semantic_model_path=str(tmp_path), cwd=str(tmp_path)
+        )
+        
+        selector_module.make_selector(selector_context)(_state("How many documents?"))
+        selector_module.make_selector(other_context)(_state("How many documents?"))
+        
+        assert selector_context.llm.invoke.call_count == 1
+        assert other_llm.invoke.call_count == 1
+    
+    def test_cache_size_bound(self, selector_context, monkeypatch):
+        """Test that the least recently used answers are evicted past the size bound."""
+        monkeypatch.setattr(selector_module, "SELECTOR_LLM_CACHE_SIZE", 2)
+        select = selector_module.make_selector(selector_context)
+        
+        for question in ("first question", "second question", "third question"):
+            select(_state(question))
+        select(_state("first question"))
+        
+        assert len(selector_context.llm_cache) == 2
+        assert selector_context.llm.invoke.call_count == 4
@@ -0,0 +1,132 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2026 Cisco Systems, Inc. and its affiliates
+
+"""Tests for semantic model loading and processing."""
+import copy
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+import yaml
+
+from mongodb_agent.semantic_models import loader
+from mongodb_agent.semantic_models import (
+    load_semantic_model,
+    parse_semantic_model_text,
+    process_semantic_model,
+)
+
+MODEL_FILE = Path(loader.__file__).parent / "b2btransaction_semantic_model_template.yaml"
+QUESTION = "list b2b transactions with errors for partner ACME"
+
+
+def _reference_field(content):
+    """A field of the model that survives field optimization for QUESTION."""
+    return next(iter(content["collections"].values()))["fields"]["ciscoReferenceId"]
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    """Path to a private copy of a semantic model with business rules."""
+    path = tmp_path / MODEL_FILE.name
+    shutil.copy(MODEL_FILE, path)
+    return str(path)
+
+
+class TestProcessedModelCache:
+    """Test cases for memoized process_semantic_model results."""
+    
+    def test_path_input_is_memoized(self, model_path):
+        """Test that loader-owned content returns the cached result for the same query."""
+        first = process_semantic_model(model_path, user_query=QUESTION)
+        
+        assert process_semantic_model(model_path, user_query=QUESTION) is first
+        assert process_semantic_model(load_semantic_model(model_path), user_query=QUESTION) is first
+    
+    def test_query_case_shares_entry(self, model_path):
+        """Test that questions differing only in case share a cache entry."""
+        first = process_semantic_model(model_path, user_query=QUESTION)
+        
+        assert process_semantic_model(model_path, user_query=QUESTION.upper()) is first
+    
+    def test_different_query_or_options_not_shared(self, model_path):
+        """Test that another question or field limit is processed separately."""
+        first = process_semantic_model(model_path, user_query=QUESTION)
+        
+        assert process_semantic_model(model_path, user_query="delivery status") is not first
+        assert process_semantic_model(model_path, user_query=QUESTION, max_fields=5) is not first
+    
+    def test_parsed_text_is_memoized(self):
+        """Test that content from parse_semantic_model_text is memoized too."""
+        content = parse_semantic_model_text(MODEL_FILE.read_text())
+        
+        assert process_semantic_model(content, user_query=QUESTION) is process_semantic_model(
+            content, user_query=QUESTION
+        )
+    
+    def test_caller_dict_edited_in_place(self):
+        """Test that a caller's own dict is reprocessed after an in-place edit."""
+        content = yaml.safe_load(MODEL_FILE.read_text())
+        before = process_semantic_model(content, user_query=QUESTION)
+        
+        _reference_field(content)["description"] = "Edited description for the cache test"
+        after = process_semantic_model(content, user_query=QUESTION)
+        
+        assert "Edited description for the cache test" not in before[0]
+        assert "Edited description for the cache test" in after[0]
+    
+    def test_caller_business_rules_edited_in_place(self):
+        """Test that a caller's own business rules are re-indexed after an in-place edit."""
+        business_rules = {"domain_keywords": {"shipping": ["ship"]}}
+        before = loader._get_rules_index(business_rules)
+        
+        business_rules["domain_keywords"]["billing"] = ["invoice"]
+        after = loader._get_rules_index(business_rules)
+        
+        assert "invoice" not in before.keywords
+        assert "invoice" in after.keywords
+    
+    def test_loader_business_rules_index_shared(self, model_path):
+        """Test that the loader's own business rules share one index."""
+        business_rules = load_semantic_model(model_path)["business_rules"]
+        
+        assert loader._get_rules_index(business_rules) is loader._get_rules_index(business_rules)
+    
+    def test_file_change_invalidates(self, model_path):
+        """Test that rewriting the model file yields a freshly processed result."""
+        first = process_semantic_model(model_path, user_query=QUESTION)
+        
+        content = yaml.safe_load(MODEL_FILE.read_text())
+        _reference_field(content)["description"] = "Rewritten model file"
+        with open(model_path, "w") as file:
+            yaml.safe_dump(content, file, sort_keys=False)
+        stat = os.stat(model_path)
+        os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        second = process_semantic_model(model_path, user_query=QUESTION)
+        assert second is not first
+        assert "Rewritten model file" in second[0]
+    
+    def test_cache_disabled(self, model_path, monkeypatch):
+        """Test that PROCESSED_MODEL_CACHE_SIZE=0 processes on every call."""
+        monkeypatch.setattr(loader, "PROCESSED_MODEL_CACHE_SIZE", 0)
+        
+        first = process_semantic_model(model_path, user_query=QUESTION)
+        second = process_semantic_model(model_path, user_query=QUESTION)
+        
+        assert second is not first
+        assert second == first
+    
+    def test_results_and_input_not_mutated(self, model_path):
+        """Test that processing leaves the loaded model and earlier cached results unchanged."""
+        content = load_semantic_model(model_path)
+        original = copy.deepcopy(content)
+        
+        first = process_semantic_model(model_path, user_query=QUESTION)
+        snapshot = copy.deepcopy(first)
+        for question in ("delivery status", "count", None, QUESTION.upper()):
+            process_semantic_model(model_path, user_query=question, max_fields=5)
+        
+        assert content == original
+        assert process_semantic_model(model_path, user_query=QUESTION) == snapshot
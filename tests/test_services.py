@@ -0,0 +1,191 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2026 Cisco Systems, Inc. and its affiliates
+
+"""Tests for the service clients."""
+import dataclasses
+from datetime import datetime, timezone
+
+import pytest
+from unittest.mock import MagicMock
+
+from mongodb_agent.config import Config
+from mongodb_agent.services import registry
+
+direct_client = pytest.importorskip("mongodb_agent.services.direct_client")
+if not direct_client.PYMONGO_AVAILABLE:
+    pytest.skip("pymongo not installed", allow_module_level=True)
+
+PIPELINE = 'db.orders.aggregate([{"$match": {"created": {"$gte": ISODate("2024-01-01T00:00:00Z")}}}, {"$limit": 5}])'
+
+
+@pytest.fixture
+def direct_config():
+    """Config for a direct connection that is never actually opened."""
+    return dataclasses.replace(
+        Config(),
+        mongodb_connection_type="direct",
+        mongodb_uri="mongodb://localhost:1",
+        mongodb_database="test_db",
+    )
+
+
+@pytest.fixture
+def clean_registry():
+    """Start and end with no shared service instances."""
+    registry.close_all()
+    yield
+    registry.close_all()
+
+
+@pytest.fixture
+def mongo_client(direct_config):
+    """Direct client that never connects, with a mocked 'orders' collection."""
+    client = direct_client.DirectMongoClient(direct_config)
+    collection = MagicMock()
+    collection.aggregate.return_value = iter([{"_id": 1}])
+    client._collections["orders"] = collection
+    yield client
+    client.close()
+
+
+class TestParsePipeline:
+    """Test cases for the memoized aggregation pipeline parser."""
+    
+    def test_identical_strings_parsed_once(self):
+        """Test that the same pipeline string returns the same parsed stages."""
+        assert direct_client._parse_pipeline(PIPELINE) is direct_client._parse_pipeline(PIPELINE)
+    
+    def test_aggregate_call_and_isodate(self):
+        """Test that db.collection.aggregate([...]) text and ISODate literals are decoded."""
+        pipeline = direct_client._parse_pipeline(PIPELINE)
+        
+        assert pipeline[1] == {"$limit": 5}
+        assert pipeline[0]["$match"]["created"]["$gte"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    
+    def test_extended_json(self):
+        """Test that Extended JSON wrappers are decoded through bson."""
+        pipeline = direct_client._parse_pipeline('[{"$match": {"created": {"$date": "2024-01-01T00:00:00Z"}}}]')
+        
+        assert isinstance(pipeline[0]["$match"]["created"], datetime)
+    
+    def test_nan_falls_back_to_json(self):
+        """Test that input orjson rejects is still parsed by the stdlib decoder."""
+        pipeline = direct_client._parse_pipeline('[{"$match": {"x": NaN}}]')
+        
+        assert pipeline[0]["$match"]["x"] != pipeline[0]["$match"]["x"]
+    
+    def test_invalid_json(self):
+        """Test that malformed pipelines raise ValueError."""
+        with pytest.raises(ValueError):
+            direct_client._parse_pipeline('[{"$match": ')
+
+
+class TestDirectClientExecuteQuery:
+    """Test cases for DirectMongoClient.execute_query with a mocked collection."""
+    
+    def test_cached_pipeline_not_mutated(self, mongo_client):
+        """Test that changes made by the driver to the stage list do not reach the cache."""
+        collection = mongo_client._collections["orders"]
+        collection.aggregate.side_effect = lambda pipeline, **options: pipeline.append({"$skip": 1}) or iter([])
+        cached = direct_client._parse_pipeline(PIPELINE)
+        
+        for _ in range(2):
+            result = mongo_client.execute_query(PIPELINE, {"collection": "orders"})
+            assert result["success"] is True
+        
+        assert len(cached) == 2
+        assert [len(call.args[0]) for call in collection.aggregate.call_args_list] == [3, 3]
+    
+    def test_collection_handle_reused(self, mongo_client):
+        """Test that queries use the memoized collection handle."""
+        result = mongo_client.execute_query(PIPELINE, {"collection_name": "orders"})
+        
+        assert result == {"success": True, "data": [{"_id": 1}], "error": None}
+        mongo_client._collections["orders"].aggregate.assert_called_once()
+    
+    def test_missing_collection_name(self, mongo_client):
+        """Test that db_details without a collection name are rejected."""
+        result = mongo_client.execute_query(PIPELINE, {})
+        
+        assert result["success"] is False
+        assert "Collection name is required" in result["error"]
+
+
+class _Service:
+    """Minimal closable service for registry tests."""
+    
+    def __init__(self, fail_on_close=False):
+        self.closed = False
+        self.fail_on_close = fail_on_close
+    
+    def close(self):
+        self.closed = True
+        if self.fail_on_close:
+            raise RuntimeError("close failed")
+
+
+class TestServiceRegistry:
+    """Test cases for shared service instances."""
+    
+    def test_instance_shared_per_config(self, clean_registry):
+        """Test that the factory runs once per (service, config)."""
+        config = Config()
+        first = registry.get_shared_instance("service", config, _Service)
+        
+        assert registry.get_shared_instance("service", config, _Service) is first
+        assert registry.get_shared_instance("other", config, _Service) is not first
+        assert registry.get_shared_instance("service", Config(max_schema_fields=5), _Service) is not first
+    
+    def test_version_change_replaces_instance(self, clean_registry):
+        """Test that a different version (e.g. a new token) builds a new instance."""
+        config = Config()
+        first = registry.get_shared_instance("service", config, _Service, version="token-1")
+        
+        assert registry.get_shared_instance("service", config, _Service, version="token-1") is first
+        assert registry.get_shared_instance("service", config, _Service, version="token-2") is not first
+    
+    def test_closed_instance_replaced(self, clean_registry):
+        """Test that an instance closed by one holder is not handed out again."""
+        config = Config()
+        first = registry.get_shared_instance("service", config, _Service)
+        first.close()
+        
+        second = registry.get_shared_instance("service", config, _Service)
+        assert second is not first
+        assert second.closed is False
+        assert registry.get_shared_instance("service", config, _Service) is second
+    
+    def test_close_all(self, clean_registry):
+        """Test that close_all closes every instance, despite errors, and forgets them."""
+        config = Config()
+        failing = registry.get_shared_instance("failing", config, lambda: _Service(fail_on_close=True))
+        working = registry.get_shared_instance("working", config, _Service)
+        
+        registry.close_all()
+        
+        assert failing.closed and working.closed
+        assert registry.get_shared_instance("working", config, _Service) is not working
+    
+    def test_private_router_does_not_close_shared_client(self, clean_registry, direct_config):
+        """Test that closing a router built directly leaves the shared router usable."""
+        from mongodb_agent.services.mongodb_router import MongoDBRouter, get_mongodb_client
+        
+        shared = get_mongodb_client(direct_config)
+        with MongoDBRouter(direct_config) as private:
+            assert private.client is not shared.client
+        
+        assert private.closed is True
+        assert shared.closed is False
+        assert shared.client.closed is False
+        assert get_mongodb_client(direct_config) is shared
+    
+    def test_closed_shared_router_replaced(self, clean_registry, direct_config):
+        """Test that closing the shared router makes the next caller get a fresh one."""
+        from mongodb_agent.services.mongodb_router import get_mongodb_client
+        
+        shared = get_mongodb_client(direct_config)
+        shared.close()
+        
+        replacement = get_mongodb_client(direct_config)
+        assert replacement is not shared
+        assert replacement.closed is False
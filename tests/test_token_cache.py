@@ -0,0 +1,184 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2026 Cisco Systems, Inc. and its affiliates
+
+"""Tests for the OAuth2 token cache."""
+import threading
+
+import pytest
+from unittest.mock import MagicMock
+
+from mongodb_agent.utils import token_cache
+from mongodb_agent.utils.token_cache import TokenCache
+
+
+class FakeClock:
+    """Controllable replacement for time.time()."""
+    
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Patch the token cache's clock."""
+    fake = FakeClock()
+    monkeypatch.setattr(token_cache.time, "time", fake)
+    return fake
+
+
+def _token_response(access_token, expires_in=None):
+    """Successful token endpoint response."""
+    body = {"access_token": access_token}
+    if expires_in is not None:
+        body["expires_in"] = expires_in
+    response = MagicMock(status_code=200)
+    response.content = token_cache.orjson.dumps(body)
+    return response
+
+
+def _make_cache(responses, **options):
+    """TokenCache whose token endpoint returns the given responses in order."""
+    cache = TokenCache("https://auth.example.com/token", "client", "secret", **options)
+    cache._session = MagicMock()
+    cache._session.post.side_effect = list(responses)
+    return cache
+
+
+def _wait_for_refresh(cache):
+    """Block until a pending background refresh has finished."""
+    with cache._refresh_lock:
+        pass
+
+
+class TestTokenCacheTTL:
+    """Test cases for token lifetime handling."""
+    
+    def test_token_reused_within_ttl(self, clock):
+        """Test that a cached token is returned without another fetch."""
+        cache = _make_cache([_token_response("token-1")], ttl_seconds=300)
+        
+        assert cache.get_token() == "token-1"
+        clock.now += 100
+        assert cache.get_token() == "token-1"
+        assert cache._session.post.call_count == 1
+    
+    def test_expires_in_caps_ttl(self, clock):
+        """Test that the server's expires_in, minus the safety margin, caps the TTL."""
+        cache = _make_cache(
+            [_token_response("token-1", expires_in=600), _token_response("token-2", expires_in=600)],
+            ttl_seconds=3000,
+        )
+        
+        assert cache.get_token() == "token-1"
+        assert cache._cached[1] == clock.now + 600 - token_cache.EXPIRY_MARGIN_SECONDS
+        
+        clock.now += 600 - token_cache.EXPIRY_MARGIN_SECONDS
+        assert cache.get_token() == "token-2"
+    
+    def test_configured_ttl_when_shorter(self, clock):
+        """Test that a TTL shorter than expires_in is kept."""
+        cache = _make_cache([_token_response("token-1", expires_in=3600)], ttl_seconds=300)
+        
+        cache.get_token()
+        assert cache._cached[1] == clock.now + 300
+    
+    def test_invalidate_forces_fetch(self, clock):
+        """Test that invalidate() makes the next call fetch a new token."""
+        cache = _make_cache([_token_response("token-1"), _token_response("token-2")])
+        
+        cache.get_token()
+        cache.invalidate()
+        assert cache.get_token() == "token-2"
+    
+    def test_failed_fetch_raises(self, clock):
+        """Test that a failed token request is reported to the caller."""
+        cache = _make_cache([MagicMock(status_code=401)])
+        
+        with pytest.raises(Exception, match="HTTP 401"):
+            cache.get_token()
+
+
+class TestTokenCacheBackgroundRefresh:
+    """Test cases for refreshing tokens before they expire."""
+    
+    def test_refresh_near_expiry(self, clock):
+        """Test that a token near expiry is still returned while a new one is fetched."""
+        cache = _make_cache([_token_response("token-1"), _token_response("token-2")], ttl_seconds=300)
+        
+        cache.get_token()
+        clock.now += 300 - 30
+        assert cache.get_token() == "token-1"
+        _wait_for_refresh(cache)
+        
+        assert cache._session.post.call_count == 2
+        assert cache.get_token() == "token-2"
+    
+    def test_no_refresh_before_margin(self, clock):
+        """Test that a token outside the refresh margin is not refreshed."""
+        cache = _make_cache([_token_response("token-1")], ttl_seconds=300)
+        
+        cache.get_token()
+        clock.now += 300 - 61
+        cache.get_token()
+        _wait_for_refresh(cache)
+        
+        assert cache._session.post.call_count == 1
+    
+    @pytest.mark.parametrize("ttl_seconds", [30, 60, 120])
+    def test_short_ttl_fresh_token_not_refreshed(self, clock, ttl_seconds):
+        """Test that a TTL at or below the margin does not refresh a freshly fetched token."""
+        cache = _make_cache([_token_response("token-1"), _token_response("token-2")], ttl_seconds=ttl_seconds)
+        
+        for _ in range(50):
+            cache.get_token()
+        _wait_for_refresh(cache)
+        assert cache._session.post.call_count == 1
+        
+        # Past half the TTL the background refresh starts
+        clock.now += ttl_seconds / 2
+        assert cache.get_token() == "token-1"
+        _wait_for_refresh(cache)
+        assert cache._session.post.call_count == 2
+    
+    def test_short_expires_in_not_refreshed_immediately(self, clock):
+        """Test that a server expires_in near the margin does not refresh on every call."""
+        cache = _make_cache([_token_response("token-1", expires_in=90)])
+        
+        for _ in range(20):
+            cache.get_token()
+        _wait_for_refresh(cache)
+        
+        assert cache._session.post.call_count == 1
+    
+    def test_single_refresh_at_a_time(self, clock):
+        """Test that concurrent callers near expiry start only one background refresh."""
+        release = threading.Event()
+        cache = _make_cache([_token_response("token-1")], ttl_seconds=300)
+        
+        def slow_fetch(*args, **kwargs):
+            release.wait(5)
+            return _token_response("token-2")
+        
+        cache.get_token()
+        cache._session.post.side_effect = slow_fetch
+        clock.now += 300 - 10
+        tokens = [cache.get_token() for _ in range(10)]
+        release.set()
+        _wait_for_refresh(cache)
+        
+        assert tokens == ["token-1"] * 10
+        assert cache._session.post.call_count == 2
+    
+    def test_failed_refresh_keeps_token(self, clock):
+        """Test that a failed background refresh leaves the current token in place."""
+        cache = _make_cache([_token_response("token-1"), MagicMock(status_code=500)], ttl_seconds=300)
+        
+        cache.get_token()
+        clock.now += 300 - 10
+        cache.get_token()
+        _wait_for_refresh(cache)
+        
+        assert cache.get_token() == "token-1"